@@ -39,6 +39,7 @@ class ScreenshotPatternType(models.TextChoices):
 class DNSProvider(models.TextChoices):
     GEEKFLARE = "geekflare", "Geekflare"
     SECURITYTRAILS = "securitytrails", "SecurityTrails"
+    BUILTIN = "builtin", "Built-in Resolver"
 
 
 class SubdomainProvider(models.TextChoices):
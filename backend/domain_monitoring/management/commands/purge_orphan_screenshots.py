@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from domain_monitoring.services.screenshot_storage import collect_orphan_screenshots
+
+
+class Command(BaseCommand):
+    help = "Delete stored website screenshots that are no longer referenced by domains, alerts or patterns."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age-hours",
+            type=int,
+            default=24,
+            help="Only delete files older than this many hours so in-flight monitor runs keep their captures.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report unreferenced screenshots without deleting them.",
+        )
+
+    def handle(self, *args, **options):
+        min_age_hours = options["min_age_hours"]
+        if min_age_hours < 0:
+            raise CommandError("--min-age-hours must not be negative.")
+
+        dry_run = options["dry_run"]
+        deleted_count = collect_orphan_screenshots(min_age=timedelta(hours=min_age_hours), dry_run=dry_run)
+
+        action = "Found" if dry_run else "Deleted"
+        self.stdout.write(self.style.SUCCESS(f"{action} {deleted_count} unreferenced screenshot(s)."))
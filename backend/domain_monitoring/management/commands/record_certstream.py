@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from domain_monitoring.services.certstream import CERTSTREAM_URL
+from domain_monitoring.services.certstream_replay import record_certstream
+
+
+class Command(BaseCommand):
+    help = "Record raw certstream certificate updates to a gzip-compressed NDJSON file for replay."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Path of the recording, e.g. certstream.ndjson.gz.")
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Stop after this many certificate updates.",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=None,
+            help="Stop after this many seconds.",
+        )
+        parser.add_argument("--url", default=CERTSTREAM_URL, help="Certstream websocket URL.")
+
+    def handle(self, *args, **options):
+        if not options["limit"] and not options["duration"]:
+            raise CommandError("Pass --limit and/or --duration to bound the recording.")
+
+        recorded = record_certstream(
+            options["output"],
+            limit=options["limit"],
+            duration=options["duration"],
+            url=options["url"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Recorded {recorded} certificate updates to {options['output']}."))
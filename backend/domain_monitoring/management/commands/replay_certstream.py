@@ -0,0 +1,122 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from domain_monitoring.services.certstream import build_monitored_domain_index, get_active_monitored_domains_snapshot
+from domain_monitoring.services.certstream_replay import (
+    DEFAULT_REPLAY_WORKERS,
+    build_synthetic_watched_domains,
+    generate_synthetic_messages,
+    iter_recorded_messages,
+    replay_certstream_messages,
+)
+from domain_monitoring.services.domain_suffix_index import DomainSuffixIndex
+from domain_monitoring.services.ssl_certificate_writer import DEFAULT_FLUSH_INTERVAL_MS, DEFAULT_FLUSH_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a certstream recording or synthetic certificates through the monitor's matching and "
+        "write path and report throughput, match latency and database writes."
+    )
+
+    def add_arguments(self, parser):
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument("--input", help="Recording written by record_certstream.")
+        source.add_argument(
+            "--synthetic",
+            type=int,
+            metavar="COUNT",
+            help="Generate this many synthetic certificate updates instead of reading a recording.",
+        )
+        parser.add_argument(
+            "--sans",
+            type=int,
+            default=5,
+            help="SANs per synthetic certificate.",
+        )
+        parser.add_argument(
+            "--match-ratio",
+            type=float,
+            default=0.01,
+            help="Share of synthetic SANs that are subdomains of a watched domain.",
+        )
+        parser.add_argument(
+            "--domains",
+            type=int,
+            default=None,
+            help=(
+                "Match against this many synthetic watched domains instead of the active monitored "
+                "domains. Implies --dry-run."
+            ),
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Seed for synthetic data.")
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=0,
+            help="Target certificate updates per second (0 replays as fast as possible).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Count SSL certificate matches without writing them.",
+        )
+        parser.add_argument(
+            "--lookalikes",
+            action="store_true",
+            help="Also run lookalike detection, which writes lookalike matches with source 'certstream'.",
+        )
+        parser.add_argument("--workers", type=int, default=DEFAULT_REPLAY_WORKERS)
+        parser.add_argument("--flush-size", type=int, default=DEFAULT_FLUSH_SIZE)
+        parser.add_argument("--flush-interval-ms", type=int, default=DEFAULT_FLUSH_INTERVAL_MS)
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        if options["domains"] is not None:
+            watched_domains = build_synthetic_watched_domains(options["domains"], seed=options["seed"])
+            index = DomainSuffixIndex(watched_domains)
+            # Synthetic watched domains point at companies that may not exist.
+            dry_run = True
+        else:
+            watched_domains = get_active_monitored_domains_snapshot()
+            index = build_monitored_domain_index()
+
+        if options["lookalikes"] and dry_run:
+            raise CommandError("--lookalikes writes to the database and cannot be combined with a dry run.")
+
+        if options["input"]:
+            messages = iter_recorded_messages(options["input"])
+        else:
+            messages = generate_synthetic_messages(
+                options["synthetic"],
+                options["sans"],
+                [watched_domain.value for watched_domain in watched_domains],
+                match_ratio=options["match_ratio"],
+                seed=options["seed"],
+            )
+
+        report = replay_certstream_messages(
+            messages,
+            lambda: index,
+            rate=options["rate"],
+            max_workers=options["workers"],
+            flush_size=options["flush_size"],
+            flush_interval_ms=options["flush_interval_ms"],
+            dry_run=dry_run,
+            lookalikes=options["lookalikes"],
+        )
+
+        percentiles = ", ".join(
+            f"p{percentile} {latency:.3f} ms" for percentile, latency in report.latency_percentiles_ms().items()
+        )
+        writer_metrics = report.writer_metrics
+        self.stdout.write(
+            f"Replayed {report.messages} certificate updates against {len(index)} watched domains "
+            f"in {report.elapsed:.2f}s: {report.messages_per_second:.0f} messages/sec."
+        )
+        self.stdout.write(f"Match latency: {percentiles or 'n/a'}.")
+        self.stdout.write(
+            f"SSL certificate matches: {writer_metrics['flushed']} "
+            f"{'counted' if dry_run else 'written'} in {writer_metrics['flushes']} flushes "
+            f"({report.writes_per_second:.0f}/sec), {writer_metrics['dropped']} dropped, "
+            f"{writer_metrics['failed']} failed, max queue depth {writer_metrics['max_queue_depth']}."
+        )
@@ -1,6 +1,12 @@
 from django.core.management.base import BaseCommand
 
 from domain_monitoring.services import run_certstream_monitor
+from domain_monitoring.services.certstream import (
+    DEFAULT_FULL_REFRESH_INTERVAL,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_SHARD_QUEUE_SIZE,
+)
+from domain_monitoring.services.ssl_certificate_writer import DEFAULT_FLUSH_INTERVAL_MS, DEFAULT_FLUSH_SIZE
 
 
 class Command(BaseCommand):
@@ -10,8 +16,19 @@ class Command(BaseCommand):
         parser.add_argument(
             "--refresh-interval",
             type=int,
-            default=60,
-            help="Seconds between monitored-domain snapshot refreshes.",
+            default=DEFAULT_FULL_REFRESH_INTERVAL,
+            help="Seconds between full monitored-domain snapshot reloads, which also drop deleted domains.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=DEFAULT_POLL_INTERVAL,
+            help="Seconds between checks for added or modified monitored domains.",
+        )
+        parser.add_argument(
+            "--lookalikes",
+            action="store_true",
+            help="Also run certificate domains through lookalike detection and store matches with source 'certstream'.",
         )
         parser.add_argument(
             "--workers",
@@ -19,9 +36,39 @@ class Command(BaseCommand):
             default=100,
             help="Thread pool size for certificate comparisons.",
         )
+        parser.add_argument(
+            "--flush-size",
+            type=int,
+            default=DEFAULT_FLUSH_SIZE,
+            help="Number of buffered SSL certificate matches that triggers a bulk insert.",
+        )
+        parser.add_argument(
+            "--flush-interval-ms",
+            type=int,
+            default=DEFAULT_FLUSH_INTERVAL_MS,
+            help="Maximum milliseconds a buffered SSL certificate match waits before being written.",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=0,
+            help="Number of matcher processes fed by one reader process (0 matches in threads of this process).",
+        )
+        parser.add_argument(
+            "--queue-size",
+            type=int,
+            default=DEFAULT_SHARD_QUEUE_SIZE,
+            help="Bounded queue size per matcher process; certificates are dropped and reported when all are full.",
+        )
 
     def handle(self, *args, **options):
         run_certstream_monitor(
             refresh_interval=options["refresh_interval"],
             max_workers=options["workers"],
+            flush_size=options["flush_size"],
+            flush_interval_ms=options["flush_interval_ms"],
+            processes=options["processes"],
+            queue_size=options["queue_size"],
+            poll_interval=options["poll_interval"],
+            lookalikes=options["lookalikes"],
         )
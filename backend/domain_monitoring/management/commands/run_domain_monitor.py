@@ -1,7 +1,8 @@
 from django.core.management.base import BaseCommand, CommandError
 
 from domain_monitoring.models import MonitoredDomain
-from domain_monitoring.services.monitoring import run_domain_monitor
+from domain_monitoring.services.monitor_leases import DEFAULT_CLAIM_BATCH_SIZE, DEFAULT_LEASE_SECONDS
+from domain_monitoring.services.monitoring import run_distributed_domain_monitor, run_domain_monitor
 
 
 class Command(BaseCommand):
@@ -21,12 +22,42 @@ class Command(BaseCommand):
             default=4,
             help="Number of worker threads to use for scheduled runs",
         )
+        parser.add_argument(
+            "--distributed",
+            action="store_true",
+            help="Claim due domains in leased batches so several workers can share one run",
+        )
+        parser.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            type=int,
+            default=DEFAULT_CLAIM_BATCH_SIZE,
+            help="Number of due domains to claim per batch in distributed mode",
+        )
+        parser.add_argument(
+            "--lease-seconds",
+            dest="lease_seconds",
+            type=int,
+            default=DEFAULT_LEASE_SECONDS,
+            help="Lease duration in distributed mode; expired leases are picked up by other workers",
+        )
 
     def handle(self, *args, **options):
         domain = options["domain"]
         company = options.get("company")
         workers = options["workers"]
 
+        if options["distributed"]:
+            if domain:
+                raise CommandError("--distributed cannot be combined with --domain")
+            processed = run_distributed_domain_monitor(
+                max_workers=workers,
+                batch_size=options["batch_size"],
+                lease_seconds=options["lease_seconds"],
+            )
+            self.stdout.write(self.style.SUCCESS(f"Processed {processed} monitored domain(s)."))
+            return
+
         monitored_domains = None
         if domain:
             monitored_domains = MonitoredDomain.objects.select_related("company").filter(
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domain_monitoring', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monitoreddomain',
+            name='website_screenshot_phash',
+            field=models.CharField(blank=True, max_length=16),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domain_monitoring', '0002_monitoreddomain_website_screenshot_phash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monitoreddomain',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='monitoreddomain',
+            name='lease_owner',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='monitoreddomain',
+            index=models.Index(fields=['lease_expires_at'], name='domain_moni_lease_e_51a917_idx'),
+        ),
+    ]
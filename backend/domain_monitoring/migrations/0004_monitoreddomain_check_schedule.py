@@ -0,0 +1,32 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domain_monitoring', '0003_monitoreddomain_lease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monitoreddomain',
+            name='change_history',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='monitoreddomain',
+            name='next_check_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='monitoreddomain',
+            name='stable_check_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='monitoreddomain',
+            index=models.Index(fields=['status', 'next_check_at'], name='domain_moni_status_144eeb_idx'),
+        ),
+    ]
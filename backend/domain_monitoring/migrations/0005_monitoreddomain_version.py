@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domain_monitoring', '0004_monitoreddomain_check_schedule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monitoreddomain',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
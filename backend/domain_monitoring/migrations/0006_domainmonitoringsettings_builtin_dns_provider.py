@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domain_monitoring', '0005_monitoreddomain_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='domainmonitoringsettings',
+            name='dns_provider',
+            field=models.CharField(choices=[('geekflare', 'Geekflare'), ('securitytrails', 'SecurityTrails'), ('builtin', 'Built-in Resolver')], default='geekflare', max_length=20),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-19 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domain_monitoring', '0006_domainmonitoringsettings_builtin_dns_provider'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='monitoreddomain',
+            index=models.Index(fields=['last_modified'], name='domain_moni_last_mo_96156a_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-19 12:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domain_monitoring', '0007_monitoreddomain_last_modified_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['last_modified'], name='domain_moni_last_mo_a2a956_idx'),
+        ),
+    ]
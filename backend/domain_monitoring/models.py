@@ -30,6 +30,7 @@ class Company(models.Model):
         verbose_name_plural = "Companies"
         indexes = [
             models.Index(fields=["status"]),
+            models.Index(fields=["last_modified"]),
         ]
 
     def __str__(self):
@@ -115,8 +116,15 @@ class MonitoredDomain(models.Model):
     website_status_code = models.CharField(max_length=3, blank=True)
     website_screenshot = models.CharField(max_length=500, blank=True)
     website_screenshot_hash = models.CharField(max_length=64, blank=True)
+    website_screenshot_phash = models.CharField(max_length=16, blank=True)
     website_certificate = models.JSONField(default=list, blank=True)
     last_checked = models.DateField(null=True, blank=True)
+    next_check_at = models.DateTimeField(null=True, blank=True)
+    stable_check_count = models.PositiveIntegerField(default=0)
+    change_history = models.JSONField(default=list, blank=True)
+    lease_owner = models.CharField(max_length=255, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    version = models.PositiveIntegerField(default=0)
 
     class Meta:
         unique_together = ("value", "company")
@@ -124,11 +132,21 @@ class MonitoredDomain(models.Model):
             models.Index(fields=["company", "status"]),
             models.Index(fields=["last_checked"]),
             models.Index(fields=["value"]),
+            models.Index(fields=["lease_expires_at"]),
+            models.Index(fields=["status", "next_check_at"]),
+            models.Index(fields=["last_modified"]),
         ]
 
     def __str__(self):
         return f"{self.value} ({self.company.name})"
 
+    def save(self, *args, **kwargs):
+        # The monitor writes results without row locks and discards them when the version has moved on.
+        self.version += 1
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+        super().save(*args, **kwargs)
+
 
 class MonitoredDomainAlert(models.Model):
     created = models.DateTimeField(auto_now_add=True)
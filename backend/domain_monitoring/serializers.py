@@ -42,6 +42,14 @@ class MonitoredDomainSerializer(serializers.ModelSerializer):
     class Meta:
         model = MonitoredDomain
         fields = "__all__"
+        read_only_fields = [
+            "next_check_at",
+            "stable_check_count",
+            "change_history",
+            "lease_owner",
+            "lease_expires_at",
+            "version",
+        ]
 
 
 class MonitoredDomainAlertCommentSerializer(serializers.ModelSerializer):
@@ -10,8 +10,13 @@ from .provider_adapters import (
     fetch_website_screenshot,
     fetch_website_status,
 )
-from .provider_registry import get_dns_provider, get_screenshot_provider, get_subdomain_provider
-from .settings import get_domain_monitoring_settings
+from .provider_registry import (
+    get_dns_provider,
+    get_screenshot_provider,
+    get_subdomain_provider,
+    resolve_monitoring_providers,
+)
+from .settings import get_domain_monitoring_settings, invalidate_domain_monitoring_settings_cache
 
 __all__ = [
     "fetch_dns_records",
@@ -23,7 +28,9 @@ __all__ = [
     "get_dns_provider",
     "get_screenshot_provider",
     "get_subdomain_provider",
+    "resolve_monitoring_providers",
     "get_domain_monitoring_settings",
+    "invalidate_domain_monitoring_settings_cache",
     "ingest_and_scan_newly_registered_domains",
     "ingest_newly_registered_domains",
     "run_certstream_monitor",
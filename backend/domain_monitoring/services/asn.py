@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import ipaddress
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterable
+
+from ipwhois import IPWhois
+
+
+logger = logging.getLogger(__name__)
+
+# Optional pyasn-style table: one "<prefix>/<length> <asn>" entry per line, ";" or "#" comments.
+ASN_PREFIX_TABLE = os.getenv("ASN_PREFIX_TABLE", "")
+ASN_CACHE_TTL_SECONDS = 24 * 60 * 60
+ASN_CACHE_MAX_ENTRIES = 100_000
+
+
+class PrefixTable:
+    """Longest-prefix-match table of network prefixes to ASNs, one hash map per prefix length."""
+
+    def __init__(self):
+        self._networks: dict[int, dict[int, dict[int, str]]] = {4: {}, 6: {}}
+        self._lengths: dict[int, list[int]] = {4: [], 6: []}
+
+    def __len__(self) -> int:
+        return sum(len(networks) for by_length in self._networks.values() for networks in by_length.values())
+
+    def add(self, prefix: str, asn: str) -> None:
+        network = ipaddress.ip_network(prefix, strict=False)
+        by_length = self._networks[network.version]
+        if network.prefixlen not in by_length:
+            by_length[network.prefixlen] = {}
+            self._lengths[network.version] = sorted(by_length, reverse=True)
+        by_length[network.prefixlen][int(network.network_address)] = asn
+
+    def lookup(self, ip: str) -> str:
+        address = ipaddress.ip_address(ip)
+        address_int = int(address)
+        max_length = address.max_prefixlen
+        by_length = self._networks[address.version]
+        for prefix_length in self._lengths[address.version]:
+            network_int = address_int >> (max_length - prefix_length) << (max_length - prefix_length)
+            asn = by_length[prefix_length].get(network_int)
+            if asn:
+                return asn
+        return ""
+
+
+def load_prefix_table(path: str) -> PrefixTable:
+    table = PrefixTable()
+    with open(path, encoding="utf-8") as file_handle:
+        for line in file_handle:
+            line = line.strip()
+            if not line or line.startswith((";", "#")):
+                continue
+            parts = line.split()
+            if len(parts) < 2:
+                continue
+            try:
+                table.add(parts[0], parts[1].upper().removeprefix("AS"))
+            except ValueError:
+                logger.debug("Skipping invalid ASN prefix table line: %s", line)
+    return table
+
+
+_prefix_table: PrefixTable | None = None
+_prefix_table_loaded = False
+_asn_cache: dict[str, tuple[str, float]] = {}
+_asn_lock = threading.Lock()
+
+
+def get_prefix_table() -> PrefixTable | None:
+    global _prefix_table, _prefix_table_loaded
+    with _asn_lock:
+        if not _prefix_table_loaded:
+            _prefix_table_loaded = True
+            if ASN_PREFIX_TABLE:
+                try:
+                    _prefix_table = load_prefix_table(ASN_PREFIX_TABLE)
+                    logger.info("Loaded %s ASN prefixes from %s", len(_prefix_table), ASN_PREFIX_TABLE)
+                except OSError as exc:
+                    logger.warning("Error loading ASN prefix table %s: %s", ASN_PREFIX_TABLE, exc)
+        return _prefix_table
+
+
+def _get_cached_asn(ip: str) -> str | None:
+    with _asn_lock:
+        cached = _asn_cache.get(ip)
+        if cached is None:
+            return None
+        asn, expires_at = cached
+        if expires_at < time.monotonic():
+            _asn_cache.pop(ip, None)
+            return None
+        return asn
+
+
+def _cache_asn(ip: str, asn: str) -> None:
+    with _asn_lock:
+        _asn_cache.pop(ip, None)
+        if len(_asn_cache) >= ASN_CACHE_MAX_ENTRIES:
+            _asn_cache.pop(next(iter(_asn_cache)))
+        _asn_cache[ip] = (asn, time.monotonic() + ASN_CACHE_TTL_SECONDS)
+
+
+def _lookup_rdap_asn(ip: str) -> str | None:
+    try:
+        results = IPWhois(ip).lookup_rdap()
+    except Exception as exc:
+        logger.warning("Error looking up ASN for IP %s: %s", ip, exc)
+        return None
+    return str(results.get("asn", "") or "")
+
+
+def resolve_ip_asn(ip: str) -> str:
+    """Return the ASN number for an IP from the prefix table, the TTL cache or RDAP, in that order."""
+    prefix_table = get_prefix_table()
+    if prefix_table is not None:
+        try:
+            asn = prefix_table.lookup(ip)
+        except ValueError:
+            asn = ""
+        if asn:
+            return asn
+
+    cached_asn = _get_cached_asn(ip)
+    if cached_asn is not None:
+        return cached_asn
+
+    asn = _lookup_rdap_asn(ip)
+    if asn is None:
+        return ""
+    _cache_asn(ip, asn)
+    return asn
+
+
+def get_asns_from_ip_list(ip_list: Iterable[str]) -> list[str]:
+    asn_list: list[str] = []
+    for ip in ip_list:
+        asn = resolve_ip_asn(ip)
+        if asn:
+            asn_list.append(f"AS{asn}")
+    return asn_list
@@ -1,34 +1,176 @@
 from __future__ import annotations
 
 import concurrent.futures
+import contextlib
 import logging
-import re
+import multiprocessing
+import queue
+import signal
 import threading
 import time
+from collections.abc import Callable, Iterator
+from datetime import datetime, timedelta
 
-import certstream
+from certstream.core import CertStreamClient
+from django.db import connections
+from django.utils import timezone
 
-from domain_monitoring.models import MonitoredDomain, SSLCertificate
+from domain_monitoring.models import Company, MonitoredDomain, SSLCertificate
+from domain_monitoring.services.certstream_lookalikes import CertstreamLookalikeDetector
+from domain_monitoring.services.domain_suffix_index import DomainSuffixIndex, WatchedDomain
+from domain_monitoring.services.ssl_certificate_writer import (
+    DEFAULT_FLUSH_INTERVAL_MS,
+    DEFAULT_FLUSH_SIZE,
+    SSLCertificateMatch,
+    SSLCertificateWriter,
+)
 
 logger = logging.getLogger(__name__)
 
+CERTSTREAM_URL = "wss://certstream.calidog.io/"
+CERTSTREAM_STATS_INTERVAL_SECONDS = 30
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_FULL_REFRESH_INTERVAL = 3600
+WATERMARK_OVERLAP_SECONDS = 30
+DEFAULT_SHARD_QUEUE_SIZE = 10_000
+RECONNECT_DELAY_SECONDS = 5
+# After SIGTERM a matcher keeps draining its queue until the reader's sentinel, an empty queue,
+# or this many seconds, so the reader's last certificates are matched before the final flush.
+MATCHER_STOP_DRAIN_SECONDS = 5
+MATCHER_QUEUE_POLL_SECONDS = 1.0
 
-def get_active_monitored_domains_snapshot() -> list[dict]:
+
+@contextlib.contextmanager
+def stop_on_signals(stop: Callable[[], None], signals=(signal.SIGTERM, signal.SIGINT)) -> Iterator[None]:
+    """
+    Call `stop` on any of `signals` instead of dying, so docker or systemd stops shut down like
+    Ctrl-C and buffered matches are flushed. Only the main thread can install signal handlers;
+    elsewhere this does nothing.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def handle(signum, _frame):
+        logger.info("Received %s; stopping certstream monitor", signal.Signals(signum).name)
+        stop()
+
+    previous_handlers = {signum: signal.signal(signum, handle) for signum in signals}
+    try:
+        yield
+    finally:
+        for signum, previous_handler in previous_handlers.items():
+            signal.signal(signum, previous_handler)
+
+
+class CertstreamListener:
+    """
+    Feeds certstream messages to `callback` until stop() is called, reconnecting after dropped
+    connections.
+
+    certstream.listen_for_events() only exits on a KeyboardInterrupt, which websocket-client
+    swallows while a connection is open, so the client is driven directly. stop() may be called
+    from another thread or from a signal handler.
+    """
+
+    def __init__(self, callback: Callable[[dict, object], object], url: str = CERTSTREAM_URL):
+        self.url = url
+        self._callback = callback
+        self._client: CertStreamClient | None = None
+        self._stopped = threading.Event()
+        # Reentrant because a signal handler calling stop() can interrupt the main thread inside run().
+        self._lock = threading.RLock()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped.is_set()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopped.set()
+            self._stop_client()
+
+    def _on_open(self) -> None:
+        # run_forever() resets keep_running when it starts, undoing a stop() that came first.
+        with self._lock:
+            if self.stopped:
+                self._stop_client()
+
+    def _stop_client(self) -> None:
+        if self._client is None:
+            return
+        self._client.keep_running = False
+        if self._client.sock is not None:
+            # close() from another thread can leave the reader blocked in select() until its
+            # timeout; abort() wakes it, and it closes the connection once it sees keep_running.
+            self._client.sock.abort()
+
+    def run(self) -> None:
+        while True:
+            client = CertStreamClient(self._callback, self.url, skip_heartbeats=True, on_open=self._on_open)
+            with self._lock:
+                if self.stopped:
+                    return
+                self._client = client
+            client.run_forever(ping_interval=15)
+            if self.stopped:
+                return
+            logger.warning("Certstream connection closed; reconnecting in %ss", RECONNECT_DELAY_SECONDS)
+            if self._stopped.wait(RECONNECT_DELAY_SECONDS):
+                return
+
+
+def get_active_monitored_domains_snapshot() -> list[WatchedDomain]:
     monitored_domains = (
         MonitoredDomain.objects.select_related("company")
         .filter(status="active", company__status="active")
-        .values("value", "company_id", "company__name")
+        .values("id", "value", "company_id", "company__name")
     )
     return [
-        {
-            "value": item["value"],
-            "company_id": item["company_id"],
-            "company_name": item["company__name"],
-        }
+        WatchedDomain(
+            value=item["value"],
+            company_id=item["company_id"],
+            company_name=item["company__name"],
+            monitored_domain_id=item["id"],
+        )
         for item in monitored_domains
     ]
 
 
+def get_monitored_domain_changes(since: datetime) -> list[dict]:
+    """Monitored domains whose row or company row was modified at or after `since`, active or not."""
+    fields = ("id", "value", "status", "company_id", "company__name", "company__status")
+    # Two queries rather than an OR across the company join, so each can use its last_modified
+    # index and a poll reads only the changed rows.
+    changes = {item["id"]: item for item in MonitoredDomain.objects.filter(last_modified__gte=since).values(*fields)}
+    changed_company_ids = list(Company.objects.filter(last_modified__gte=since).values_list("id", flat=True))
+    if changed_company_ids:
+        changes.update(
+            (item["id"], item)
+            for item in MonitoredDomain.objects.filter(company_id__in=changed_company_ids).values(*fields)
+        )
+    return list(changes.values())
+
+
+def apply_monitored_domain_changes(monitored_domain_index: DomainSuffixIndex, changes: list[dict]) -> None:
+    for item in changes:
+        if item["status"] == "active" and item["company__status"] == "active":
+            monitored_domain_index.add(
+                WatchedDomain(
+                    value=item["value"],
+                    company_id=item["company_id"],
+                    company_name=item["company__name"],
+                    monitored_domain_id=item["id"],
+                )
+            )
+        else:
+            monitored_domain_index.remove(item["id"])
+
+
+def build_monitored_domain_index() -> DomainSuffixIndex:
+    return DomainSuffixIndex(get_active_monitored_domains_snapshot())
+
+
 def save_ssl_certificate(cert_index: int, cert_domain: str, watched_domain: str, company_id: int) -> None:
     SSLCertificate.objects.get_or_create(
         cert_index=cert_index,
@@ -38,7 +180,12 @@ def save_ssl_certificate(cert_index: int, cert_domain: str, watched_domain: str,
     )
 
 
-def process_certificate_update(message: dict, monitored_domains: list[dict]) -> None:
+def process_certificate_update(
+    message: dict,
+    monitored_domain_index: DomainSuffixIndex,
+    writer: SSLCertificateWriter | None = None,
+    lookalike_detector: CertstreamLookalikeDetector | None = None,
+) -> None:
     cert_domains = message["data"]["leaf_cert"]["all_domains"]
     cert_index = message["data"]["cert_index"]
 
@@ -46,45 +193,307 @@ def process_certificate_update(message: dict, monitored_domains: list[dict]) ->
         if cert_domain.startswith("www."):
             continue
 
-        for monitored_domain in monitored_domains:
-            watched_domain = monitored_domain["value"]
-            pattern = r"(.*\.)?" + re.escape(watched_domain) + "$"
-            if re.match(pattern, cert_domain):
-                logger.info(
-                    "Matched certstream domain %s against watched domain %s",
-                    cert_domain,
-                    watched_domain,
-                )
+        for watched_domain in monitored_domain_index.match(cert_domain):
+            logger.info(
+                "Matched certstream domain %s against watched domain %s",
+                cert_domain,
+                watched_domain.value,
+            )
+            if writer is None:
                 save_ssl_certificate(
                     cert_index=cert_index,
                     cert_domain=cert_domain,
-                    watched_domain=watched_domain,
-                    company_id=monitored_domain["company_id"],
+                    watched_domain=watched_domain.value,
+                    company_id=watched_domain.company_id,
                 )
+            else:
+                writer.submit(
+                    SSLCertificateMatch(
+                        cert_index=cert_index,
+                        cert_domain=cert_domain,
+                        watched_domain=watched_domain.value,
+                        company_id=watched_domain.company_id,
+                    )
+                )
+
+    if lookalike_detector is not None:
+        try:
+            lookalike_detector.process(cert_domains)
+        except Exception:
+            logger.exception("Error running lookalike detection for certificate %s", cert_index)
+
+
+class MonitoredDomainIndexRefresher:
+    """
+    Keeps `index` current from a background thread.
+
+    Rows modified since the last poll (with an overlap for transactions that commit late) are
+    applied to the index every `poll_interval` seconds. A full reload every `refresh_interval`
+    seconds swaps in a new index, which also drops deleted domains.
+    """
 
+    def __init__(
+        self,
+        refresh_interval: int = DEFAULT_FULL_REFRESH_INTERVAL,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+    ):
+        self.refresh_interval = refresh_interval
+        self.poll_interval = poll_interval
+        self._reload()
+        self._thread = threading.Thread(target=self._run, name="certstream-index-refresh", daemon=True)
 
-def run_certstream_monitor(refresh_interval: int = 60, max_workers: int = 100) -> None:
-    monitored_domains = get_active_monitored_domains_snapshot()
-    monitored_domains_lock = threading.Lock()
+    def start(self) -> MonitoredDomainIndexRefresher:
+        self._thread.start()
+        return self
 
-    def refresh_monitored_domains_snapshot() -> None:
-        nonlocal monitored_domains
+    def _reload(self) -> None:
+        loaded_at = timezone.now()
+        self.index = build_monitored_domain_index()
+        self._watermark = loaded_at
+        self._next_reload = time.monotonic() + self.refresh_interval
+
+    def _poll(self) -> None:
+        polled_at = timezone.now()
+        changes = get_monitored_domain_changes(self._watermark - timedelta(seconds=WATERMARK_OVERLAP_SECONDS))
+        apply_monitored_domain_changes(self.index, changes)
+        self._watermark = polled_at
+
+    def _run(self) -> None:
         while True:
-            updated_domains = get_active_monitored_domains_snapshot()
-            with monitored_domains_lock:
-                monitored_domains = updated_domains
-            time.sleep(refresh_interval)
+            time.sleep(self.poll_interval)
+            try:
+                if time.monotonic() >= self._next_reload:
+                    self._reload()
+                else:
+                    self._poll()
+            except Exception:
+                logger.exception("Error refreshing monitored domain snapshot for certstream")
 
-    refresh_thread = threading.Thread(target=refresh_monitored_domains_snapshot, daemon=True)
-    refresh_thread.start()
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+class CertstreamCallback:
+    """Threaded-mode certstream callback; also driven directly by the replay harness."""
 
-        def certstream_callback(message, _context):
-            if message["message_type"] != "certificate_update":
-                return
-            with monitored_domains_lock:
-                snapshot = list(monitored_domains)
-            executor.submit(process_certificate_update, message, snapshot)
+    def __init__(
+        self,
+        executor: concurrent.futures.Executor,
+        get_index: Callable[[], DomainSuffixIndex],
+        writer: SSLCertificateWriter | None = None,
+        lookalike_detector: CertstreamLookalikeDetector | None = None,
+        on_processed: Callable[[float], None] | None = None,
+    ):
+        self._executor = executor
+        self._get_index = get_index
+        self._writer = writer
+        self._lookalike_detector = lookalike_detector
+        self._on_processed = on_processed
+
+    def __call__(self, message: dict, _context) -> concurrent.futures.Future | None:
+        if message["message_type"] != "certificate_update":
+            return None
+        return self._executor.submit(self._process, message)
+
+    def _process(self, message: dict) -> None:
+        started = time.perf_counter()
+        try:
+            process_certificate_update(message, self._get_index(), self._writer, self._lookalike_detector)
+        except Exception:
+            logger.exception("Error processing certificate update %s", message["data"].get("cert_index"))
+        if self._on_processed:
+            self._on_processed(time.perf_counter() - started)
+
+
+def build_certificate_payload(message: dict) -> dict:
+    """Strip a certstream message down to the fields the matchers use before it crosses a process boundary."""
+    data = message["data"]
+    return {
+        "data": {
+            "cert_index": data["cert_index"],
+            "seen": data.get("seen"),
+            "leaf_cert": {"all_domains": data["leaf_cert"]["all_domains"]},
+        }
+    }
+
+
+class CertstreamShardDispatcher:
+    """Certstream callback that spreads certificates over bounded per-process queues without blocking the reader."""
+
+    def __init__(self, queues: list):
+        self._queues = queues
+        self._next_shard = 0
+        self.dispatched = 0
+        self.dropped = 0
+        self._next_report = time.monotonic() + CERTSTREAM_STATS_INTERVAL_SECONDS
+
+    def __call__(self, message: dict, _context) -> None:
+        if message["message_type"] != "certificate_update":
+            return
+
+        payload = build_certificate_payload(message)
+        for offset in range(len(self._queues)):
+            shard = (self._next_shard + offset) % len(self._queues)
+            try:
+                self._queues[shard].put_nowait(payload)
+            except queue.Full:
+                continue
+            self._next_shard = (shard + 1) % len(self._queues)
+            self.dispatched += 1
+            break
+        else:
+            self.dropped += 1
+
+        if time.monotonic() >= self._next_report:
+            self.report()
+
+    def queue_depths(self) -> list[int | None]:
+        depths = []
+        for message_queue in self._queues:
+            try:
+                depths.append(message_queue.qsize())
+            except NotImplementedError:
+                depths.append(None)
+        return depths
+
+    def report(self) -> None:
+        log = logger.warning if self.dropped else logger.info
+        log(
+            "Certstream reader: dispatched=%s dropped=%s queue_depths=%s",
+            self.dispatched,
+            self.dropped,
+            self.queue_depths(),
+        )
+        self._next_report = time.monotonic() + CERTSTREAM_STATS_INTERVAL_SECONDS
+
+
+def run_certstream_matcher(
+    shard: int,
+    message_queue,
+    refresh_interval: int,
+    poll_interval: float,
+    flush_size: int,
+    flush_interval_ms: int,
+    lookalikes: bool = False,
+) -> None:
+    """
+    Matcher process: consume certificates from one shard queue until the None sentinel arrives.
+
+    On SIGTERM the matcher drains its queue for up to MATCHER_STOP_DRAIN_SECONDS before its
+    writer's final flush.
+    """
+    # The reader handles Ctrl-C and sends the sentinel, so matchers can drain their queues and flush.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    stop_requested = threading.Event()
+    refresher = MonitoredDomainIndexRefresher(refresh_interval, poll_interval).start()
+    lookalike_detector = CertstreamLookalikeDetector() if lookalikes else None
+    processed = 0
+    max_lag = 0.0
+    next_report = time.monotonic() + CERTSTREAM_STATS_INTERVAL_SECONDS
+    drain_deadline = None
+
+    try:
+        with (
+            stop_on_signals(stop_requested.set, (signal.SIGTERM,)),
+            SSLCertificateWriter(flush_size=flush_size, flush_interval_ms=flush_interval_ms) as writer,
+        ):
+            while True:
+                if stop_requested.is_set():
+                    drain_deadline = drain_deadline or time.monotonic() + MATCHER_STOP_DRAIN_SECONDS
+                    if time.monotonic() >= drain_deadline:
+                        logger.warning("Certstream matcher %s stopped before draining its queue", shard)
+                        break
+                try:
+                    payload = message_queue.get(timeout=MATCHER_QUEUE_POLL_SECONDS)
+                except queue.Empty:
+                    if stop_requested.is_set():
+                        break
+                    continue
+                if payload is None:
+                    break
+
+                try:
+                    process_certificate_update(payload, refresher.index, writer, lookalike_detector)
+                except Exception:
+                    logger.exception("Error processing certificate update in certstream matcher %s", shard)
+                processed += 1
+                if payload["data"].get("seen"):
+                    max_lag = max(max_lag, time.time() - payload["data"]["seen"])
+
+                if time.monotonic() >= next_report:
+                    logger.info("Certstream matcher %s: processed=%s max_lag=%.1fs", shard, processed, max_lag)
+                    max_lag = 0.0
+                    next_report = time.monotonic() + CERTSTREAM_STATS_INTERVAL_SECONDS
+    finally:
+        connections.close_all()
+
+
+def run_sharded_certstream_monitor(
+    processes: int,
+    queue_size: int = DEFAULT_SHARD_QUEUE_SIZE,
+    refresh_interval: int = DEFAULT_FULL_REFRESH_INTERVAL,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    flush_size: int = DEFAULT_FLUSH_SIZE,
+    flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS,
+    lookalikes: bool = False,
+) -> None:
+    """Read certstream in this process and match certificates in `processes` forked matcher processes."""
+    context = multiprocessing.get_context("fork")
+    queues = [context.Queue(maxsize=queue_size) for _ in range(processes)]
+
+    # Forked children must not share the parent's database connections.
+    connections.close_all()
+    matchers = [
+        context.Process(
+            target=run_certstream_matcher,
+            args=(shard, message_queue, refresh_interval, poll_interval, flush_size, flush_interval_ms, lookalikes),
+            name=f"certstream-matcher-{shard}",
+        )
+        for shard, message_queue in enumerate(queues)
+    ]
+    for matcher in matchers:
+        matcher.start()
+
+    dispatcher = CertstreamShardDispatcher(queues)
+    listener = CertstreamListener(dispatcher)
+    try:
+        with stop_on_signals(listener.stop):
+            listener.run()
+    finally:
+        dispatcher.report()
+        for message_queue in queues:
+            message_queue.put(None)
+        for matcher in matchers:
+            matcher.join()
+
+
+def run_certstream_monitor(
+    refresh_interval: int = DEFAULT_FULL_REFRESH_INTERVAL,
+    max_workers: int = 100,
+    flush_size: int = DEFAULT_FLUSH_SIZE,
+    flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS,
+    processes: int = 0,
+    queue_size: int = DEFAULT_SHARD_QUEUE_SIZE,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    lookalikes: bool = False,
+) -> None:
+    if processes > 0:
+        run_sharded_certstream_monitor(
+            processes,
+            queue_size=queue_size,
+            refresh_interval=refresh_interval,
+            poll_interval=poll_interval,
+            flush_size=flush_size,
+            flush_interval_ms=flush_interval_ms,
+            lookalikes=lookalikes,
+        )
+        return
+
+    refresher = MonitoredDomainIndexRefresher(refresh_interval, poll_interval).start()
+    lookalike_detector = CertstreamLookalikeDetector() if lookalikes else None
 
-        certstream.listen_for_events(certstream_callback, url="wss://certstream.calidog.io/")
+    # The executor is shut down before the writer, so the writer's final flush sees every match.
+    with (
+        SSLCertificateWriter(flush_size=flush_size, flush_interval_ms=flush_interval_ms) as writer,
+        concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor,
+    ):
+        listener = CertstreamListener(CertstreamCallback(executor, lambda: refresher.index, writer, lookalike_detector))
+        with stop_on_signals(listener.stop):
+            listener.run()
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+import idna
+import tldextract
+from django.utils import timezone
+from unidecode import unidecode
+
+from domain_monitoring.models import CompanyDomain, LookalikeDomain, WatchedResource
+from domain_monitoring.services.lookalikes import (
+    DISTANCE_RATIO,
+    QUERY_LENGTH_THRESHOLD,
+    CandidateDomain,
+    identify_lookalike_matches,
+)
+
+
+logger = logging.getLogger(__name__)
+
+CERTSTREAM_LOOKALIKE_SOURCE = "certstream"
+RESOURCE_INDEX_REFRESH_SECONDS = 300
+RECENT_DOMAINS_MAX_ENTRIES = 200_000
+
+
+TYPO_TRANSLATION = str.maketrans("glw", "qiv")
+
+
+def _normalize_for_typos(value: str) -> str:
+    # Removing hyphens and folding g/l/w never increases the edit distance between two strings,
+    # so one comparison on this form bounds every typo variation the matcher tries.
+    return value.replace("-", "").translate(TYPO_TRANSLATION)
+
+
+def _strip_separators(value: str) -> str:
+    return value.replace("-", "").replace(".", "")
+
+
+def _bigrams(value: str) -> Counter[str]:
+    return Counter(value[index : index + 2] for index in range(len(value) - 1))
+
+
+class LookalikeQueryIndex:
+    """
+    Picks the watched resources that could match a domain, so the matcher skips the rest.
+
+    Every check is a necessary condition for identify_lookalike_matches to score the pair at
+    all, so matching the returned queries gives the same result as matching all of them:
+
+    - domain resources without typo_match only match on an equal name;
+    - typo_match domain resources need an edit distance within a quarter of the name's length,
+      which by the q-gram lemma leaves at least max(len) - 1 - 2 * distance shared bigrams,
+      unless the lengths differ by QUERY_LENGTH_THRESHOLD or more and the matcher skips the
+      distance check;
+    - plain keywords must appear in the domain once separators are removed, so all of their
+      bigrams must too.
+
+    Wildcard keywords, substring_typo_match keywords and names too short for bigrams are
+    always returned.
+    """
+
+    def __init__(self, queries: list[dict]):
+        self.queries = queries
+        self._exact_names: dict[str, list[int]] = defaultdict(list)
+        self._always: list[int] = []
+        # query id -> (typo-normalized name, raw name, raw name without hyphens, max edit distance)
+        self._typo_names: dict[int, tuple[str, str, str, int]] = {}
+        self._typo_postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self._typo_ids_by_length: dict[tuple[int, int], list[int]] = defaultdict(list)
+        self._keywords: dict[int, str] = {}
+        self._keyword_postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+
+        for query_id, query in enumerate(queries):
+            value = query.get("value", "").lower()
+            resource_type = query.get("resource_type", "")
+            properties = query.get("properties", [])
+            if resource_type == "domain":
+                name = value.split(".", 1)[0]
+                if "typo_match" not in properties:
+                    self._exact_names[name].append(query_id)
+                    continue
+                normalized = _normalize_for_typos(name)
+                if len(normalized) < 2:
+                    self._always.append(query_id)
+                    continue
+                max_distance = math.floor(len(name) / DISTANCE_RATIO)
+                self._typo_names[query_id] = (normalized, name, name.replace("-", ""), max_distance)
+                self._typo_ids_by_length[(len(name), len(name.replace("-", "")))].append(query_id)
+                for bigram, count in _bigrams(normalized).items():
+                    self._typo_postings[bigram].append((query_id, count))
+            elif resource_type == "keyword":
+                stripped = _strip_separators(value)
+                if "*" in value or "substring_typo_match" in properties or len(stripped) < 2:
+                    self._always.append(query_id)
+                    continue
+                self._keywords[query_id] = stripped
+                for bigram, count in _bigrams(stripped).items():
+                    self._keyword_postings[bigram].append((query_id, count))
+
+    @staticmethod
+    def _shared_bigrams(bigrams: Counter[str], postings: dict[str, list[tuple[int, int]]]) -> Counter[int]:
+        shared: Counter[int] = Counter()
+        for bigram, count in bigrams.items():
+            for query_id, query_count in postings.get(bigram, ()):
+                shared[query_id] += min(count, query_count)
+        return shared
+
+    def _typo_candidates(self, domain_name: str, domain_without_dots: str) -> set[int]:
+        query_ids = set()
+        normalized_name = _normalize_for_typos(domain_name)
+        normalized_without_dots = _normalize_for_typos(domain_without_dots)
+        name_shared = self._shared_bigrams(_bigrams(normalized_name), self._typo_postings)
+        without_dots_shared = self._shared_bigrams(_bigrams(normalized_without_dots), self._typo_postings)
+
+        for query_id in name_shared.keys() | without_dots_shared.keys():
+            normalized, name, _, max_distance = self._typo_names[query_id]
+            # Name variations: distance to the domain name within max_distance.
+            if (
+                abs(len(normalized_name) - len(normalized)) <= max_distance
+                and name_shared[query_id] >= max(len(normalized_name), len(normalized)) - 1 - 2 * max_distance
+            ):
+                query_ids.add(query_id)
+            # Name-with-TLD variation: only scores when the name appears in the dotless domain.
+            elif without_dots_shared[query_id] >= len(normalized) - 1 and name in domain_without_dots:
+                query_ids.add(query_id)
+
+        name_length = len(domain_name)
+        name_without_hyphens_length = len(domain_name.replace("-", ""))
+        for (query_length, query_without_hyphens_length), length_ids in self._typo_ids_by_length.items():
+            if (
+                abs(name_length - query_length) >= QUERY_LENGTH_THRESHOLD
+                or abs(name_without_hyphens_length - query_without_hyphens_length) >= QUERY_LENGTH_THRESHOLD
+                or abs(len(domain_without_dots) - query_length) >= QUERY_LENGTH_THRESHOLD
+            ):
+                query_ids.update(length_ids)
+        return query_ids
+
+    def candidate_queries(self, domain: str) -> list[dict]:
+        """The queries that could match `domain`, in their original order."""
+        try:
+            unidecoded_domain = unidecode(idna.decode(domain.lower()))
+        except Exception:
+            # The matcher skips domains it cannot decode.
+            return []
+        domain_name = unidecoded_domain.split(".")[0]
+
+        query_ids = set(self._always)
+        query_ids.update(self._exact_names.get(domain_name, ()))
+        if self._typo_names:
+            query_ids.update(self._typo_candidates(domain_name, unidecoded_domain.replace(".", "")))
+        if self._keywords:
+            stripped_domain = _strip_separators(unidecoded_domain)
+            shared = self._shared_bigrams(_bigrams(stripped_domain), self._keyword_postings)
+            query_ids.update(
+                query_id
+                for query_id, count in shared.items()
+                if count >= len(self._keywords[query_id]) - 1 and self._keywords[query_id] in stripped_domain
+            )
+        return [self.queries[query_id] for query_id in sorted(query_ids)]
+
+
+@dataclass(frozen=True)
+class CompanyResources:
+    company_id: int
+    queries: list[dict]
+    # Registered domains the company owns; certificates for these are never lookalikes.
+    own_domains: frozenset[str]
+    index: LookalikeQueryIndex = field(repr=False, compare=False)
+
+
+def build_company_resources() -> list[CompanyResources]:
+    """Active watched resources grouped by active company, normalized and indexed once for the matcher."""
+    queries_by_company: dict[int, list[dict]] = {}
+    own_domains_by_company: dict[int, set[str]] = {}
+    resources = WatchedResource.objects.filter(status="active", company__status="active").values(
+        "company_id",
+        "value",
+        "resource_type",
+        "lookalike_match_from",
+        "properties",
+        "exclude_keywords",
+    )
+    for resource in resources:
+        value = resource["value"].strip().lower()
+        queries_by_company.setdefault(resource["company_id"], []).append(
+            {
+                "value": value,
+                "resource_type": resource["resource_type"],
+                "lookalike_match_from": resource["lookalike_match_from"],
+                "properties": resource["properties"] or [],
+                "exclude_keywords": resource["exclude_keywords"] or [],
+            }
+        )
+        if resource["resource_type"] == "domain":
+            own_domains_by_company.setdefault(resource["company_id"], set()).add(value)
+
+    company_domains = CompanyDomain.objects.filter(
+        status="active",
+        company_id__in=list(queries_by_company),
+    ).values_list("company_id", "value")
+    for company_id, value in company_domains:
+        own_domains_by_company.setdefault(company_id, set()).add(value.strip().lower())
+
+    return [
+        CompanyResources(
+            company_id=company_id,
+            queries=queries,
+            own_domains=frozenset(own_domains_by_company.get(company_id, ())),
+            index=LookalikeQueryIndex(queries),
+        )
+        for company_id, queries in queries_by_company.items()
+    ]
+
+
+def get_registered_domain(cert_domain: str) -> str:
+    return tldextract.extract(cert_domain.lstrip("*.").lower()).registered_domain
+
+
+class CertstreamLookalikeDetector:
+    """
+    Runs certificate SANs through the lookalike engine as they arrive.
+
+    SANs are reduced to their registered domain and each registered domain is scored once
+    per RECENT_DOMAINS_MAX_ENTRIES window, since CT logs repeat the same domains across
+    renewals and multi-SAN certificates. Watched resources are reloaded and indexed every
+    RESOURCE_INDEX_REFRESH_SECONDS, and each domain is only scored against the resources
+    its LookalikeQueryIndex says could match it.
+    """
+
+    def __init__(self, refresh_interval: int = RESOURCE_INDEX_REFRESH_SECONDS):
+        self.refresh_interval = refresh_interval
+        self._companies = build_company_resources()
+        self._next_refresh = time.monotonic() + refresh_interval
+        self._refresh_lock = threading.Lock()
+        self._recent_domains: OrderedDict[str, None] = OrderedDict()
+        self._recent_domains_lock = threading.Lock()
+
+    def _refresh_if_due(self) -> None:
+        if time.monotonic() < self._next_refresh or not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            self._companies = build_company_resources()
+        except Exception:
+            logger.exception("Error refreshing watched resources for certstream lookalike detection")
+        finally:
+            self._next_refresh = time.monotonic() + self.refresh_interval
+            self._refresh_lock.release()
+
+    def _claim_new_domains(self, domains: Iterable[str]) -> list[str]:
+        new_domains = []
+        with self._recent_domains_lock:
+            for domain in domains:
+                if domain in self._recent_domains:
+                    self._recent_domains.move_to_end(domain)
+                    continue
+                self._recent_domains[domain] = None
+                new_domains.append(domain)
+            while len(self._recent_domains) > RECENT_DOMAINS_MAX_ENTRIES:
+                self._recent_domains.popitem(last=False)
+        return new_domains
+
+    def process(self, cert_domains: Iterable[str]) -> int:
+        self._refresh_if_due()
+        companies = self._companies
+        if not companies:
+            return 0
+
+        registered_domains = {get_registered_domain(cert_domain) for cert_domain in cert_domains}
+        registered_domains.discard("")
+        new_domains = self._claim_new_domains(sorted(registered_domains))
+        if not new_domains:
+            return 0
+
+        now = timezone.now()
+        source_date = now.date()
+        lookalikes = []
+        for company in companies:
+            matches = []
+            for domain in new_domains:
+                if domain in company.own_domains:
+                    continue
+                queries = company.index.candidate_queries(domain)
+                if not queries:
+                    continue
+                candidate = CandidateDomain(
+                    value=domain,
+                    created=now,
+                    source_date=source_date,
+                    source=CERTSTREAM_LOOKALIKE_SOURCE,
+                )
+                matches.extend(identify_lookalike_matches(queries, [candidate]))
+            for match in matches:
+                logger.info(
+                    "Certstream lookalike %s matched watched resource %s",
+                    match.domain_name,
+                    match.resource_value,
+                )
+                lookalikes.append(
+                    LookalikeDomain(
+                        source_date=match.source_date,
+                        value=match.domain_name,
+                        source=match.source,
+                        watched_resource=match.resource_value,
+                        potential_risk=match.risk,
+                        company_id=company.company_id,
+                    )
+                )
+
+        if lookalikes:
+            # A domain already recorded today keeps its triage status.
+            LookalikeDomain.objects.bulk_create(lookalikes, ignore_conflicts=True)
+        return len(lookalikes)
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import concurrent.futures
+import gzip
+import json
+import logging
+import random
+import statistics
+import string
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+
+from domain_monitoring.services.certstream import (
+    CERTSTREAM_URL,
+    CertstreamCallback,
+    CertstreamListener,
+    stop_on_signals,
+)
+from domain_monitoring.services.certstream_lookalikes import CertstreamLookalikeDetector
+from domain_monitoring.services.domain_suffix_index import DomainSuffixIndex, WatchedDomain
+from domain_monitoring.services.ssl_certificate_writer import (
+    DEFAULT_FLUSH_INTERVAL_MS,
+    DEFAULT_FLUSH_SIZE,
+    SSLCertificateWriter,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPLAY_WORKERS = 100
+# Submissions in flight per worker; bounds memory when a large recording is replayed at max speed.
+MAX_PENDING_PER_WORKER = 4
+SYNTHETIC_TLDS = ("com", "net", "org", "io", "co", "de", "co.uk")
+LATENCY_PERCENTILES = (50, 90, 95, 99)
+
+
+class CertstreamRecorder:
+    """Certstream callback that appends each raw message as one line of a gzip-compressed NDJSON file."""
+
+    def __init__(self, path: str, limit: int | None = None, on_limit: Callable[[], None] | None = None):
+        self.path = path
+        self.limit = limit
+        self.recorded = 0
+        self._on_limit = on_limit
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+
+    @property
+    def finished(self) -> bool:
+        return bool(self.limit) and self.recorded >= self.limit
+
+    def __call__(self, message: dict, _context) -> None:
+        if self.finished or message.get("message_type") != "certificate_update":
+            return
+        self._file.write(json.dumps(message, separators=(",", ":")))
+        self._file.write("\n")
+        self.recorded += 1
+        if self.finished and self._on_limit is not None:
+            self._on_limit()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def record_certstream(
+    path: str,
+    limit: int | None = None,
+    duration: float | None = None,
+    url: str = CERTSTREAM_URL,
+) -> int:
+    """Record certificate updates from the stream until `limit` messages or `duration` seconds."""
+    recorder = CertstreamRecorder(path, limit=limit, on_limit=lambda: listener.stop())
+    listener = CertstreamListener(recorder, url)
+    timer = threading.Timer(duration, listener.stop) if duration else None
+    try:
+        if timer is not None:
+            timer.daemon = True
+            timer.start()
+        with stop_on_signals(listener.stop):
+            listener.run()
+    finally:
+        if timer is not None:
+            timer.cancel()
+        recorder.close()
+    logger.info("Recorded %s certstream message(s) to %s", recorder.recorded, path)
+    return recorder.recorded
+
+
+def iter_recorded_messages(path: str) -> Iterator[dict]:
+    with gzip.open(path, "rt", encoding="utf-8") as recording:
+        for line in recording:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _random_label(rng: random.Random, length: int) -> str:
+    return "".join(rng.choices(string.ascii_lowercase + string.digits, k=length))
+
+
+def build_synthetic_watched_domains(count: int, seed: int = 0) -> list[WatchedDomain]:
+    rng = random.Random(seed)
+    return [
+        WatchedDomain(
+            value=f"{_random_label(rng, rng.randint(5, 12))}.{rng.choice(SYNTHETIC_TLDS)}",
+            company_id=index % 50 + 1,
+            company_name=f"Synthetic company {index % 50 + 1}",
+            monitored_domain_id=index + 1,
+        )
+        for index in range(count)
+    ]
+
+
+def generate_synthetic_messages(
+    count: int,
+    sans_per_cert: int,
+    watched_domains: list[str],
+    match_ratio: float = 0.01,
+    seed: int = 0,
+) -> Iterator[dict]:
+    """
+    Certificate updates shaped like certstream's, with `sans_per_cert` SANs each.
+
+    Roughly `match_ratio` of the SANs are subdomains of a watched domain; the rest are random.
+    """
+    rng = random.Random(seed)
+    for cert_index in range(count):
+        sans = []
+        for _ in range(max(1, sans_per_cert)):
+            if watched_domains and rng.random() < match_ratio:
+                sans.append(f"{_random_label(rng, 6)}.{rng.choice(watched_domains)}")
+            else:
+                sans.append(f"{_random_label(rng, rng.randint(4, 14))}.{rng.choice(SYNTHETIC_TLDS)}")
+        yield {
+            "message_type": "certificate_update",
+            "data": {
+                "cert_index": cert_index,
+                "seen": time.time(),
+                "leaf_cert": {"all_domains": sans},
+            },
+        }
+
+
+@dataclass
+class ReplayReport:
+    messages: int = 0
+    elapsed: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+    writer_metrics: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.messages / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def writes_per_second(self) -> float:
+        return self.writer_metrics.get("flushed", 0) / self.elapsed if self.elapsed else 0.0
+
+    def latency_percentiles_ms(self) -> dict[int, float]:
+        if not self.latencies:
+            return {}
+        if len(self.latencies) == 1:
+            return {percentile: self.latencies[0] * 1000 for percentile in LATENCY_PERCENTILES}
+        cut_points = statistics.quantiles(self.latencies, n=100, method="inclusive")
+        return {percentile: cut_points[percentile - 1] * 1000 for percentile in LATENCY_PERCENTILES}
+
+
+def replay_certstream_messages(
+    messages: Iterable[dict],
+    get_index: Callable[[], DomainSuffixIndex],
+    rate: float = 0,
+    max_workers: int = DEFAULT_REPLAY_WORKERS,
+    flush_size: int = DEFAULT_FLUSH_SIZE,
+    flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS,
+    dry_run: bool = False,
+    lookalikes: bool = False,
+) -> ReplayReport:
+    """
+    Feed messages through the live monitor's threaded callback, as fast as possible or at
+    `rate` messages per second.
+
+    Latency is the time spent matching each certificate, excluding time queued for a worker.
+    Elapsed time includes the writer's final flush, so writes per second reflects the whole run.
+    """
+    report = ReplayReport()
+    lookalike_detector = CertstreamLookalikeDetector() if lookalikes else None
+    pending = threading.BoundedSemaphore(max(1, max_workers) * MAX_PENDING_PER_WORKER)
+
+    started = time.perf_counter()
+    with (
+        SSLCertificateWriter(flush_size=flush_size, flush_interval_ms=flush_interval_ms, dry_run=dry_run) as writer,
+        concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor,
+    ):
+        callback = CertstreamCallback(executor, get_index, writer, lookalike_detector, report.latencies.append)
+        for message in messages:
+            if rate > 0:
+                delay = started + report.messages / rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            pending.acquire()
+            future = callback(message, None)
+            if future is None:
+                pending.release()
+                continue
+            future.add_done_callback(lambda _future: pending.release())
+            report.messages += 1
+
+    report.elapsed = time.perf_counter() - started
+    report.writer_metrics = writer.metrics()
+    return report
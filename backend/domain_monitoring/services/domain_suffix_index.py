@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class WatchedDomain:
+    value: str
+    company_id: int
+    company_name: str
+    monitored_domain_id: int
+
+
+def reversed_labels(domain: str) -> tuple[str, ...]:
+    return tuple(reversed(domain.strip().lower().rstrip(".").split(".")))
+
+
+class DomainSuffixIndex:
+    """
+    Watched domains keyed by their reversed label sequence.
+
+    A certificate domain matches a watched domain when it equals it or is a subdomain of it,
+    so matching walks the certificate domain's labels from the TLD down and checks each
+    prefix; the cost depends on the number of labels, not on the number of watched domains.
+    """
+
+    def __init__(self, watched_domains: Iterable[WatchedDomain] = ()):
+        self._domains: dict[tuple[str, ...], list[WatchedDomain]] = {}
+        self._by_id: dict[int, WatchedDomain] = {}
+        for watched_domain in watched_domains:
+            self.add(watched_domain)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    # Updates replace per-suffix lists instead of mutating them, so concurrent match() calls
+    # from other threads always see a consistent list; only one thread may update at a time.
+    def add(self, watched_domain: WatchedDomain) -> None:
+        self.remove(watched_domain.monitored_domain_id)
+        key = reversed_labels(watched_domain.value)
+        self._domains[key] = [*self._domains.get(key, []), watched_domain]
+        self._by_id[watched_domain.monitored_domain_id] = watched_domain
+
+    def remove(self, monitored_domain_id: int) -> None:
+        watched_domain = self._by_id.pop(monitored_domain_id, None)
+        if watched_domain is None:
+            return
+        key = reversed_labels(watched_domain.value)
+        remaining = [entry for entry in self._domains.get(key, []) if entry.monitored_domain_id != monitored_domain_id]
+        if remaining:
+            self._domains[key] = remaining
+        else:
+            self._domains.pop(key, None)
+
+    def match(self, cert_domain: str) -> list[WatchedDomain]:
+        matches: list[WatchedDomain] = []
+        labels = reversed_labels(cert_domain)
+        for depth in range(1, len(labels) + 1):
+            entries = self._domains.get(labels[:depth])
+            if entries:
+                matches.extend(entries)
+        return matches
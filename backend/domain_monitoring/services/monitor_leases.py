@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import uuid
+from collections.abc import Iterable
+from datetime import timedelta
+
+from django.db import connections, transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from domain_monitoring.models import MonitoredDomain
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_SECONDS = 600
+DEFAULT_CLAIM_BATCH_SIZE = 50
+
+
+def build_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def claim_monitored_domains(
+    due_domains: QuerySet,
+    worker_id: str,
+    batch_size: int = DEFAULT_CLAIM_BATCH_SIZE,
+    lease_seconds: int = DEFAULT_LEASE_SECONDS,
+) -> list[int]:
+    """Lease up to batch_size unleased due domains to worker_id, skipping rows other workers are claiming."""
+    now = timezone.now()
+    with transaction.atomic():
+        claimed_ids = list(
+            due_domains.select_for_update(skip_locked=True)
+            .filter(Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=now))
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if claimed_ids:
+            MonitoredDomain.objects.filter(pk__in=claimed_ids).update(
+                lease_owner=worker_id,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+            )
+    return claimed_ids
+
+
+def extend_monitored_domain_leases(worker_id: str, lease_seconds: int = DEFAULT_LEASE_SECONDS) -> int:
+    return MonitoredDomain.objects.filter(lease_owner=worker_id).update(
+        lease_expires_at=timezone.now() + timedelta(seconds=lease_seconds),
+    )
+
+
+def release_monitored_domain_leases(worker_id: str, monitored_domain_ids: Iterable[int], succeeded: bool) -> None:
+    leased_domains = MonitoredDomain.objects.filter(pk__in=list(monitored_domain_ids), lease_owner=worker_id)
+    if succeeded:
+        leased_domains.update(lease_owner="", lease_expires_at=None)
+    else:
+        # Keep the expiry so failed domains are retried by any worker only after the lease lapses.
+        leased_domains.update(lease_owner="")
+
+
+class LeaseHeartbeat:
+    """Background thread that keeps a worker's leases alive while its domains are being processed."""
+
+    def __init__(self, worker_id: str, lease_seconds: int = DEFAULT_LEASE_SECONDS):
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="domain-monitor-heartbeat", daemon=True)
+
+    def __enter__(self) -> LeaseHeartbeat:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        interval = max(1, self.lease_seconds // 3)
+        try:
+            while not self._stopped.wait(interval):
+                try:
+                    extend_monitored_domain_leases(self.worker_id, self.lease_seconds)
+                except Exception:
+                    logger.exception("Error extending monitor leases for worker %s", self.worker_id)
+        finally:
+            connections.close_all()
@@ -1,37 +1,64 @@
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
-from datetime import timedelta
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from functools import partial
 from typing import Any, Callable, Iterable
 
-from django.db import transaction
+from django.db import connections, transaction
+from django.db.models import Case, IntegerField, Value, When
 from django.utils import timezone
-from ipwhois import IPWhois
 import tldextract
 
 from domain_monitoring.models import (
     MonitoredDomain,
     MonitoredDomainAlert,
-    MonitoredDomainScreenshotPattern,
     SSLCertificate,
 )
+from domain_monitoring.services.asn import get_asns_from_ip_list
+from domain_monitoring.services.monitor_leases import (
+    DEFAULT_CLAIM_BATCH_SIZE,
+    DEFAULT_LEASE_SECONDS,
+    LeaseHeartbeat,
+    build_worker_id,
+    claim_monitored_domains,
+    release_monitored_domain_leases,
+)
 from domain_monitoring.services.provider_adapters import (
     fetch_dns_records,
     fetch_subdomains,
     fetch_website_screenshot,
     fetch_website_status,
 )
-from domain_monitoring.services.screenshot_compare import (
-    are_screenshots_similar,
-    compute_screenshot_phash,
-    matches_screenshot_image,
-    matches_screenshot_phash,
+from domain_monitoring.services.provider_registry import MonitoringProviders, resolve_monitoring_providers
+from domain_monitoring.services.scheduling import (
+    MAX_CHECK_INTERVAL_DAYS,
+    apply_check_schedule,
+    get_due_monitored_domains,
 )
-from domain_monitoring.services.screenshot_storage import delete_screenshot_file
+from domain_monitoring.services.screenshot_compare import are_screenshots_similar
+from domain_monitoring.services.screenshot_patterns import ScreenshotPatternIndex
+from scripts.utils.rate_limiter import provider_slot_deadline
 
 
 logger = logging.getLogger(__name__)
 
+FETCH_STAGE_TIMEOUTS = {
+    "dns": 60,
+    "subdomains": 60,
+    "website_status": 60,
+    "website_screenshot": 120,
+}
+FETCH_STAGE_MAX_WORKERS = 32
+# Stage timeouts run from when a worker picks the stage up; this bounds the wait for a worker.
+FETCH_STAGE_QUEUE_TIMEOUT_SECONDS = 300
+MONITOR_COMMIT_CHUNK_SIZE = 200
+
+_fetch_stage_executor: ThreadPoolExecutor | None = None
+_fetch_stage_executor_lock = threading.Lock()
+
 
 @dataclass(frozen=True)
 class DomainMonitoringData:
@@ -44,6 +71,7 @@ class DomainMonitoringData:
     website_screenshot_hash: str
     subdomains: list[str]
     website_certificate: list[str]
+    website_screenshot_phash: str = ""
 
     def as_dict(self) -> dict[str, Any]:
         return {
@@ -54,11 +82,55 @@ class DomainMonitoringData:
             "website_status_code": self.website_status_code,
             "website_screenshot": self.website_screenshot,
             "website_screenshot_hash": self.website_screenshot_hash,
+            "website_screenshot_phash": self.website_screenshot_phash,
             "subdomains": self.subdomains,
             "website_certificate": self.website_certificate,
         }
 
 
+@dataclass
+class FetchStage:
+    stage: str
+    domain: str
+    started: threading.Event = field(default_factory=threading.Event)
+    # time.monotonic() deadline, set when a worker starts the stage.
+    deadline: float | None = None
+    future: Future | None = None
+
+    @property
+    def timeout(self) -> int:
+        return FETCH_STAGE_TIMEOUTS[self.stage]
+
+
+@dataclass(frozen=True)
+class MonitoringRun:
+    providers: MonitoringProviders
+    screenshot_patterns: ScreenshotPatternIndex
+    # Certificate domains issued since each domain's last check, keyed by (watched_domain, company_id);
+    # None means query per domain.
+    ssl_certificates: dict[tuple[str, int], list[str]] | None = None
+
+
+@dataclass(frozen=True)
+class MonitoringResult:
+    # Domain with the fresh data applied in memory, the version it was read at and the changes to alert on.
+    monitored_domain: MonitoredDomain
+    expected_version: int
+    alert_changes: dict[str, Any]
+
+
+def build_monitoring_run(monitored_domain_ids: Iterable[int] | None = None) -> MonitoringRun:
+    if monitored_domain_ids is not None:
+        monitored_domain_ids = list(monitored_domain_ids)
+    return MonitoringRun(
+        providers=resolve_monitoring_providers(),
+        screenshot_patterns=ScreenshotPatternIndex.build(monitored_domain_ids),
+        ssl_certificates=(
+            prefetch_ssl_certificates(monitored_domain_ids) if monitored_domain_ids is not None else None
+        ),
+    )
+
+
 MONITORED_DOMAIN_UPDATE_FIELDS = [
     "a_record",
     "mx_record",
@@ -67,9 +139,13 @@ MONITORED_DOMAIN_UPDATE_FIELDS = [
     "website_status_code",
     "website_screenshot",
     "website_screenshot_hash",
+    "website_screenshot_phash",
     "subdomains",
     "website_certificate",
     "last_checked",
+    "next_check_at",
+    "stable_check_count",
+    "change_history",
     "last_modified",
 ]
 
@@ -91,8 +167,15 @@ def get_changed_list_fields(
     changes: dict[str, list[str]] = {}
 
     for field_name in fields:
-        existing_list = normalize_list(existing_data.get(field_name, []), transformations.get(field_name))
-        new_list = normalize_list(new_data.get(field_name, []), transformations.get(field_name))
+        existing_list = normalize_list(existing_data.get(field_name, []))
+        new_list = normalize_list(new_data.get(field_name, []))
+        if set(existing_list) == set(new_list):
+            continue
+
+        transformation = transformations.get(field_name)
+        if transformation:
+            existing_list = transformation(existing_list)
+            new_list = transformation(new_list)
 
         if set(existing_list) != set(new_list):
             changes[field_name] = new_data.get(field_name, [])
@@ -100,21 +183,6 @@ def get_changed_list_fields(
     return changes
 
 
-def get_asns_from_ip_list(ip_list: Iterable[str]) -> list[str]:
-    asn_list: list[str] = []
-    for ip in ip_list:
-        try:
-            results = IPWhois(ip).lookup_rdap()
-        except Exception as exc:
-            logger.warning("Error looking up ASN for IP %s: %s", ip, exc)
-            results = {"asn": ""}
-
-        asn = results.get("asn", "")
-        if asn:
-            asn_list.append(f"AS{asn}")
-    return asn_list
-
-
 def get_domains_from_fqdn_list(fqdn_list: Iterable[str]) -> list[str]:
     domain_list: list[str] = []
     for fqdn in fqdn_list:
@@ -198,56 +266,167 @@ def matches_sponsored_listing_pattern(
     monitored_domain: MonitoredDomain,
     screenshot_filename: str,
     screenshot_hash: str,
+    screenshot_phash: str = "",
+    pattern_index: ScreenshotPatternIndex | None = None,
 ) -> bool:
-    patterns = MonitoredDomainScreenshotPattern.objects.filter(
-        monitored_domain=monitored_domain,
-        active=True,
-    ).only("screenshot_hash", "screenshot_phash")
+    if pattern_index is None:
+        pattern_index = ScreenshotPatternIndex.build([monitored_domain.pk])
+    return pattern_index.matches(monitored_domain.pk, screenshot_filename, screenshot_hash, screenshot_phash)
 
-    if screenshot_hash and patterns.filter(screenshot_hash=screenshot_hash).exists():
-        return True
 
-    for pattern in patterns:
-        if pattern.screenshot_phash and matches_screenshot_phash(
-            screenshot_filename, pattern.screenshot_phash
-        ):
-            return True
-        if pattern.screenshot and matches_screenshot_image(screenshot_filename, pattern.screenshot):
-            return True
+def get_ssl_certificate_window(last_checked: date | None, today: date | None = None) -> tuple[date, date]:
+    """
+    Days whose certificates a check should report: from the previous check through yesterday.
 
-    return False
+    The previous check read up to the day before it ran, so starting at last_checked leaves no
+    gap however long backoff deferred this check. Today is left for the next check.
+    """
+    today = today or timezone.now().date()
+    yesterday = today - timedelta(days=1)
+    if last_checked is None:
+        return yesterday, yesterday
+    earliest = today - timedelta(days=MAX_CHECK_INTERVAL_DAYS)
+    return max(min(last_checked, yesterday), earliest), yesterday
 
 
-def get_ssl_certificates_for_domain_and_company(domain, company):
-    yesterday = timezone.now().date() - timedelta(days=1)
+def get_ssl_certificates_for_domain_and_company(domain, company, last_checked: date | None = None):
+    window_start, window_end = get_ssl_certificate_window(last_checked)
     certificates = SSLCertificate.objects.filter(
-        created=yesterday,
+        created__range=(window_start, window_end),
         watched_domain=domain,
         company=company,
     ).values_list("cert_domain", flat=True)
     return list(certificates)
 
 
-def fetch_domain_monitoring_data(domain: str, company) -> DomainMonitoringData:
-    logger.info("Fetching DNS records for domain: %s", domain)
-    dns_records = fetch_dns_records(domain)
-    logger.info("Fetching SSL certificates for domain: %s", domain)
-    website_certificate = get_ssl_certificates_for_domain_and_company(domain, company)
-    logger.info("Fetching subdomains for domain: %s", domain)
-    subdomains = fetch_subdomains(domain)
+def prefetch_ssl_certificates(monitored_domain_ids: Iterable[int]) -> dict[tuple[str, int], list[str]]:
+    today = timezone.now().date()
+    windows = {
+        (value, company_id): get_ssl_certificate_window(last_checked, today)
+        for value, company_id, last_checked in MonitoredDomain.objects.filter(
+            pk__in=list(monitored_domain_ids)
+        ).values_list("value", "company_id", "last_checked")
+    }
+    if not windows:
+        return {}
+
+    certificates = SSLCertificate.objects.filter(
+        created__range=(min(start for start, _ in windows.values()), today - timedelta(days=1)),
+        watched_domain__in={value for value, _ in windows},
+        company_id__in={company_id for _, company_id in windows},
+    ).values_list("watched_domain", "company_id", "created", "cert_domain")
+
+    certificates_by_domain: dict[tuple[str, int], list[str]] = {}
+    for watched_domain, company_id, created, cert_domain in certificates:
+        window = windows.get((watched_domain, company_id))
+        if window and window[0] <= created <= window[1]:
+            certificates_by_domain.setdefault((watched_domain, company_id), []).append(cert_domain)
+    return certificates_by_domain
+
+
+def get_fetch_stage_executor() -> ThreadPoolExecutor:
+    global _fetch_stage_executor
+    with _fetch_stage_executor_lock:
+        if _fetch_stage_executor is None:
+            _fetch_stage_executor = ThreadPoolExecutor(
+                max_workers=FETCH_STAGE_MAX_WORKERS,
+                thread_name_prefix="domain-monitor-stage",
+            )
+        return _fetch_stage_executor
+
+
+def _run_fetch_stage(fetch_stage: FetchStage, func: Callable[[str], Any]) -> Any:
+    fetch_stage.deadline = time.monotonic() + fetch_stage.timeout
+    fetch_stage.started.set()
+    logger.info("Running %s stage for domain: %s", fetch_stage.stage, fetch_stage.domain)
+    try:
+        # Provider rate limit waits count against the stage's own budget.
+        with provider_slot_deadline(fetch_stage.deadline):
+            return func(fetch_stage.domain)
+    finally:
+        connections.close_all()
+
+
+def _submit_fetch_stage(stage: str, domain: str, func: Callable[[str], Any]) -> FetchStage:
+    fetch_stage = FetchStage(stage, domain)
+    fetch_stage.future = get_fetch_stage_executor().submit(_run_fetch_stage, fetch_stage, func)
+    return fetch_stage
+
+
+def _wait_for_fetch_stage(fetch_stage: FetchStage) -> Any:
+    if not fetch_stage.started.wait(FETCH_STAGE_QUEUE_TIMEOUT_SECONDS):
+        if fetch_stage.future.cancel():
+            logger.warning(
+                "Stage %s waited over %ss for a worker for domain: %s",
+                fetch_stage.stage,
+                FETCH_STAGE_QUEUE_TIMEOUT_SECONDS,
+                fetch_stage.domain,
+            )
+            raise TimeoutError
+        # A worker picked the stage up just as the wait ended.
+        fetch_stage.started.wait()
+    try:
+        return fetch_stage.future.result(timeout=max(0.0, fetch_stage.deadline - time.monotonic()))
+    except TimeoutError:
+        logger.warning(
+            "Stage %s timed out after %ss for domain: %s",
+            fetch_stage.stage,
+            fetch_stage.timeout,
+            fetch_stage.domain,
+        )
+        raise
+
+
+def fetch_domain_monitoring_data(
+    domain: str,
+    company,
+    run: MonitoringRun | None = None,
+    last_checked: date | None = None,
+) -> DomainMonitoringData:
+    providers = run.providers if run else resolve_monitoring_providers()
+
+    # DNS and subdomains are independent provider calls; status -> screenshot depends on DNS.
+    dns_stage = _submit_fetch_stage("dns", domain, partial(fetch_dns_records, dns_provider=providers.dns))
+    subdomains_stage = _submit_fetch_stage(
+        "subdomains",
+        domain,
+        partial(fetch_subdomains, subdomain_provider=providers.subdomains),
+    )
 
-    website_status = {"url": "", "code": ""}
-    website_screenshot = ""
-    website_screenshot_hash = ""
+    try:
+        if run and run.ssl_certificates is not None:
+            website_certificate = list(run.ssl_certificates.get((domain, company.pk), []))
+        else:
+            logger.info("Fetching SSL certificates for domain: %s", domain)
+            website_certificate = get_ssl_certificates_for_domain_and_company(domain, company, last_checked)
+
+        dns_records = _wait_for_fetch_stage(dns_stage)
+
+        website_status = {"url": "", "code": ""}
+        website_screenshot = ""
+        website_screenshot_hash = ""
+        website_screenshot_phash = ""
+
+        if dns_records.get("a"):
+            website_status = _wait_for_fetch_stage(
+                _submit_fetch_stage("website_status", domain, fetch_website_status),
+            )
+            if website_status.get("code") in {"200", 200}:
+                screenshot_result = _wait_for_fetch_stage(
+                    _submit_fetch_stage(
+                        "website_screenshot",
+                        domain,
+                        partial(fetch_website_screenshot, screenshot_provider=providers.screenshot),
+                    ),
+                )
+                website_screenshot = screenshot_result.get("filename", "")
+                website_screenshot_hash = screenshot_result.get("hash", "")
+                website_screenshot_phash = screenshot_result.get("phash", "")
 
-    if dns_records.get("a"):
-        logger.info("Fetching website status for domain: %s", domain)
-        website_status = fetch_website_status(domain)
-        if website_status.get("code") in {"200", 200}:
-            logger.info("Fetching website screenshot for domain: %s", domain)
-            screenshot_result = fetch_website_screenshot(domain)
-            website_screenshot = screenshot_result.get("filename", "")
-            website_screenshot_hash = screenshot_result.get("hash", "")
+        subdomains = _wait_for_fetch_stage(subdomains_stage)
+    finally:
+        dns_stage.future.cancel()
+        subdomains_stage.future.cancel()
 
     return DomainMonitoringData(
         a_record=dns_records.get("a", []),
@@ -259,6 +438,7 @@ def fetch_domain_monitoring_data(domain: str, company) -> DomainMonitoringData:
         website_screenshot_hash=website_screenshot_hash,
         subdomains=subdomains,
         website_certificate=website_certificate,
+        website_screenshot_phash=website_screenshot_phash,
     )
 
 
@@ -287,95 +467,171 @@ def suppress_screenshot_related_changes(changes: dict[str, Any]) -> None:
         changes.pop(field, None)
 
 
-def update_or_create_alert(monitored_domain, changes):
-    if not changes:
-        return
+def build_alert(monitored_domain: MonitoredDomain, changes: dict[str, Any]) -> MonitoredDomainAlert:
+    return MonitoredDomainAlert(domain_name=monitored_domain.value, company_id=monitored_domain.company_id, **changes)
 
-    payload = {**changes, "domain_name": monitored_domain.value, "company": monitored_domain.company}
-    MonitoredDomainAlert.objects.update_or_create(
-        domain_name=monitored_domain.value,
-        company=monitored_domain.company,
-        defaults=payload,
-    )
 
+def upsert_alerts(results: Iterable[MonitoringResult]) -> None:
+    # One upsert per distinct set of changed fields, so unchanged alert fields keep their values.
+    alerts_by_fields: dict[tuple[str, ...], list[MonitoredDomainAlert]] = {}
+    for result in results:
+        if result.alert_changes:
+            alerts_by_fields.setdefault(tuple(sorted(result.alert_changes)), []).append(
+                build_alert(result.monitored_domain, result.alert_changes)
+            )
 
-def persist_monitored_domain_update(
+    for fields, alerts in alerts_by_fields.items():
+        MonitoredDomainAlert.objects.bulk_create(
+            alerts,
+            update_conflicts=True,
+            unique_fields=["domain_name", "company"],
+            update_fields=[*fields, "last_modified"],
+        )
+
+
+def apply_monitored_domain_update(
     monitored_domain: MonitoredDomain,
     data: DomainMonitoringData,
     changes: dict[str, Any],
-) -> None:
+) -> dict[str, Any]:
+    """Apply fresh data to the in-memory domain and return the changes to raise an alert for."""
     old_screenshot = monitored_domain.website_screenshot
     old_screenshot_hash = monitored_domain.website_screenshot_hash
+    old_screenshot_phash = monitored_domain.website_screenshot_phash
     new_screenshot = changes.get("website_screenshot", "")
     data_dict = data.as_dict()
 
     if old_screenshot and not new_screenshot:
         data_dict["website_screenshot"] = old_screenshot
         data_dict["website_screenshot_hash"] = old_screenshot_hash
+        data_dict["website_screenshot_phash"] = old_screenshot_phash
 
-    if monitored_domain.last_checked and changes:
-        update_or_create_alert(monitored_domain, changes)
+    alert_changes = changes if monitored_domain.last_checked and changes else {}
 
     for field, value in data_dict.items():
         setattr(monitored_domain, field, value)
-    monitored_domain.last_checked = timezone.now().date()
-    monitored_domain.save(update_fields=MONITORED_DOMAIN_UPDATE_FIELDS)
-    logger.info("Domain %s updated", monitored_domain.value)
+    checked_on = timezone.now().date()
+    apply_check_schedule(
+        monitored_domain,
+        changed=bool(changes) and monitored_domain.last_checked is not None,
+        checked_on=checked_on,
+    )
+    monitored_domain.last_checked = checked_on
+    return alert_changes
 
 
-def monitor_monitored_domain(monitored_domain):
+def collect_monitoring_result(
+    monitored_domain: MonitoredDomain,
+    run: MonitoringRun | None = None,
+) -> MonitoringResult | None:
     if monitored_domain.status != "active":
-        return
+        return None
+
+    expected_version = monitored_domain.version
+    fresh_data = fetch_domain_monitoring_data(
+        monitored_domain.value,
+        monitored_domain.company,
+        run,
+        last_checked=monitored_domain.last_checked,
+    )
+    existing = build_existing_domain_data(monitored_domain)
+    changes = build_domain_changes(existing, fresh_data.as_dict())
+
+    if fresh_data.website_screenshot and fresh_data.website_screenshot_hash:
+        if matches_sponsored_listing_pattern(
+            monitored_domain,
+            fresh_data.website_screenshot,
+            fresh_data.website_screenshot_hash,
+            fresh_data.website_screenshot_phash,
+            run.screenshot_patterns if run else None,
+        ):
+            suppress_screenshot_related_changes(changes)
+            fresh_data = DomainMonitoringData(
+                **{
+                    **fresh_data.as_dict(),
+                    "website_screenshot": monitored_domain.website_screenshot,
+                    "website_screenshot_hash": monitored_domain.website_screenshot_hash,
+                    "website_screenshot_phash": monitored_domain.website_screenshot_phash,
+                }
+            )
+
+    alert_changes = apply_monitored_domain_update(monitored_domain, fresh_data, changes)
+    return MonitoringResult(monitored_domain, expected_version, alert_changes)
+
+
+def collect_monitoring_result_safely(
+    monitored_domain: MonitoredDomain,
+    run: MonitoringRun | None = None,
+) -> tuple[MonitoringResult | None, bool]:
+    try:
+        return collect_monitoring_result(monitored_domain, run), True
+    except Exception:
+        logger.exception("Error monitoring domain id %s", monitored_domain.pk)
+        return None, False
+
+
+def commit_monitoring_results(results: list[MonitoringResult]) -> set[int]:
+    """
+    Write monitor results with one bulk update and one alert upsert per changed-field set.
+
+    Domains deactivated or edited since they were read are left untouched; the ids actually
+    written are returned.
+    """
+    if not results:
+        return set()
+
+    results_by_id = {result.monitored_domain.pk: result for result in results}
+    modified_at = timezone.now()
+    for result in results:
+        result.monitored_domain.version = result.expected_version + 1
+        result.monitored_domain.last_modified = modified_at
 
-    fresh_data = fetch_domain_monitoring_data(monitored_domain.value, monitored_domain.company)
+    unchanged_since_read = Case(
+        *[When(pk=pk, then=Value(result.expected_version)) for pk, result in results_by_id.items()],
+        output_field=IntegerField(),
+    )
     with transaction.atomic():
-        locked_domain = MonitoredDomain.objects.select_for_update().select_related("company").get(
-            pk=monitored_domain.pk
+        updated = MonitoredDomain.objects.filter(status="active", version=unchanged_since_read).bulk_update(
+            [result.monitored_domain for result in results],
+            [*MONITORED_DOMAIN_UPDATE_FIELDS, "version"],
         )
-        if locked_domain.status != "active":
-            return
-
-        existing = build_existing_domain_data(locked_domain)
-        changes = build_domain_changes(existing, fresh_data.as_dict())
-
-        if fresh_data.website_screenshot and fresh_data.website_screenshot_hash:
-            if matches_sponsored_listing_pattern(
-                locked_domain,
-                fresh_data.website_screenshot,
-                fresh_data.website_screenshot_hash,
-            ):
-                suppress_screenshot_related_changes(changes)
-                delete_screenshot_file(fresh_data.website_screenshot)
-                fresh_data = DomainMonitoringData(
-                    **{
-                        **fresh_data.as_dict(),
-                        "website_screenshot": locked_domain.website_screenshot,
-                        "website_screenshot_hash": locked_domain.website_screenshot_hash,
-                    }
+        committed_ids = set(results_by_id)
+        if updated != len(results):
+            committed_ids = set(
+                MonitoredDomain.objects.filter(
+                    pk__in=committed_ids,
+                    last_modified=modified_at,
+                    version=Case(
+                        *[When(pk=pk, then=Value(result.expected_version + 1)) for pk, result in results_by_id.items()],
+                        output_field=IntegerField(),
+                    ),
+                ).values_list("id", flat=True)
+            )
+            for skipped_id in set(results_by_id) - committed_ids:
+                logger.info(
+                    "Domain %s changed while it was being checked; result discarded",
+                    results_by_id[skipped_id].monitored_domain.value,
                 )
 
-        persist_monitored_domain_update(locked_domain, fresh_data, changes)
+        upsert_alerts(results_by_id[pk] for pk in committed_ids)
 
+    logger.info("Committed %s monitored domain update(s)", len(committed_ids))
+    return committed_ids
 
-def monitor_monitored_domain_by_id(monitored_domain_id):
-    monitored_domain = MonitoredDomain.objects.select_related("company").get(pk=monitored_domain_id)
-    monitor_monitored_domain(monitored_domain)
 
+def monitor_monitored_domain(monitored_domain, run: MonitoringRun | None = None):
+    result = collect_monitoring_result(monitored_domain, run)
+    if result is not None:
+        commit_monitoring_results([result])
 
-def monitor_monitored_domain_safely(monitored_domain_id: int) -> bool:
-    try:
-        monitor_monitored_domain_by_id(monitored_domain_id)
-        return True
-    except Exception:
-        logger.exception("Error monitoring domain id %s", monitored_domain_id)
-        return False
+
+def monitor_monitored_domain_by_id(monitored_domain_id, run: MonitoringRun | None = None):
+    monitored_domain = MonitoredDomain.objects.select_related("company").get(pk=monitored_domain_id)
+    monitor_monitored_domain(monitored_domain, run)
 
 
 def get_due_monitored_domain_ids() -> list[int]:
-    today = timezone.now().date()
-    return list(
-        MonitoredDomain.objects.filter(status="active").exclude(last_checked=today).values_list("id", flat=True)
-    )
+    return list(get_due_monitored_domains().values_list("id", flat=True))
 
 
 def normalize_monitored_domain_ids(monitored_domains: Iterable[MonitoredDomain] | Iterable[int]) -> list[int]:
@@ -388,6 +644,56 @@ def normalize_monitored_domain_ids(monitored_domains: Iterable[MonitoredDomain]
     return monitored_domain_ids
 
 
+def _commit_monitoring_results_safely(results: list[MonitoringResult]) -> set[int]:
+    try:
+        return commit_monitoring_results(results)
+    except Exception:
+        logger.exception("Error committing %s monitored domain update(s)", len(results))
+        return set()
+
+
+def _monitor_monitored_domain_batch(
+    executor: ThreadPoolExecutor,
+    monitored_domain_ids: list[int],
+    on_complete: Callable[[list[int], bool], None] | None = None,
+) -> None:
+    """Check a batch on the executor; this thread is the single writer, committing results in chunks."""
+    run = build_monitoring_run(monitored_domain_ids)
+    monitored_domains = MonitoredDomain.objects.select_related("company").in_bulk(monitored_domain_ids)
+    if run.providers.dns_prefetch:
+        try:
+            run.providers.dns_prefetch([monitored_domain.value for monitored_domain in monitored_domains.values()])
+        except Exception:
+            logger.exception("Error prefetching DNS records for %s monitored domain(s)", len(monitored_domains))
+    futures = {
+        executor.submit(collect_monitoring_result_safely, monitored_domain, run): domain_id
+        for domain_id, monitored_domain in monitored_domains.items()
+    }
+
+    pending: list[MonitoringResult] = []
+    finished: dict[bool, list[int]] = {True: [], False: []}
+
+    def flush() -> None:
+        committed_ids = _commit_monitoring_results_safely(pending)
+        for result in pending:
+            finished[result.monitored_domain.pk in committed_ids].append(result.monitored_domain.pk)
+        pending.clear()
+        for succeeded, domain_ids in finished.items():
+            if on_complete and domain_ids:
+                on_complete(list(domain_ids), succeeded)
+            domain_ids.clear()
+
+    for future in as_completed(futures):
+        result, succeeded = future.result()
+        if result is None:
+            finished[succeeded].append(futures[future])
+        else:
+            pending.append(result)
+        if len(pending) >= MONITOR_COMMIT_CHUNK_SIZE:
+            flush()
+    flush()
+
+
 def run_domain_monitor(monitored_domains=None, max_workers=4):
     monitored_domain_ids = (
         normalize_monitored_domain_ids(monitored_domains)
@@ -399,8 +705,34 @@ def run_domain_monitor(monitored_domains=None, max_workers=4):
 
     worker_count = max(1, min(max_workers, len(monitored_domain_ids)))
     with ThreadPoolExecutor(max_workers=worker_count) as executor:
-        futures = {executor.submit(monitor_monitored_domain_safely, domain_id): domain_id for domain_id in monitored_domain_ids}
-        for future in as_completed(futures):
-            future.result()
+        _monitor_monitored_domain_batch(executor, monitored_domain_ids)
 
     return len(monitored_domain_ids)
+
+
+def run_distributed_domain_monitor(
+    max_workers=4,
+    batch_size=DEFAULT_CLAIM_BATCH_SIZE,
+    lease_seconds=DEFAULT_LEASE_SECONDS,
+) -> int:
+    """Pull leased batches of due domains until none are left; safe to run in many processes at once."""
+    worker_id = build_worker_id()
+    processed = 0
+
+    release_leases = partial(release_monitored_domain_leases, worker_id)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor, LeaseHeartbeat(worker_id, lease_seconds):
+        while True:
+            monitored_domain_ids = claim_monitored_domains(
+                get_due_monitored_domains(),
+                worker_id,
+                batch_size=batch_size,
+                lease_seconds=lease_seconds,
+            )
+            if not monitored_domain_ids:
+                break
+
+            logger.info("Worker %s claimed %s monitored domain(s)", worker_id, len(monitored_domain_ids))
+            _monitor_monitored_domain_batch(executor, monitored_domain_ids, release_leases)
+            processed += len(monitored_domain_ids)
+
+    return processed
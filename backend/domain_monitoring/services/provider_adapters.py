@@ -1,5 +1,6 @@
 import logging
 import base64
+from collections.abc import Callable
 from typing import Any
 
 import requests
@@ -10,16 +11,21 @@ from domain_monitoring.services.provider_registry import (
     get_screenshot_provider,
     get_subdomain_provider,
 )
+from domain_monitoring.services.screenshot_compare import compute_screenshot_phash
 from domain_monitoring.services.screenshot_storage import save_screenshot_bytes
 from scripts.providers.geekflare import get_screenshot_url, get_web_redirects
 from scripts.providers.screenshotmachine import get_website_screenshot as get_screenshotmachine_screenshot
+from scripts.utils.rate_limiter import ProviderRateLimitTimeout, provider_slot
 
 
 logger = logging.getLogger(__name__)
 
 
-def fetch_dns_records(domain: str) -> dict[str, Any]:
-    response = get_dns_provider()(domain)
+def fetch_dns_records(
+    domain: str,
+    dns_provider: Callable[[str], dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    response = (dns_provider or get_dns_provider())(domain)
 
     return {
         "a": list(response.get("a", []) or []),
@@ -28,14 +34,22 @@ def fetch_dns_records(domain: str) -> dict[str, Any]:
     }
 
 
-def fetch_subdomains(domain: str) -> list[str]:
-    response = get_subdomain_provider()(domain)
+def fetch_subdomains(
+    domain: str,
+    subdomain_provider: Callable[[str], dict[str, Any]] | None = None,
+) -> list[str]:
+    response = (subdomain_provider or get_subdomain_provider())(domain)
 
     return list(response.get("subdomains", []) or [])
 
 
 def fetch_website_status(domain: str) -> dict[str, str]:
-    redirect_result = get_web_redirects(domain)
+    try:
+        with provider_slot(ScreenshotProvider.GEEKFLARE):
+            redirect_result = get_web_redirects(domain)
+    except ProviderRateLimitTimeout as exc:
+        logger.warning("Error fetching website status for domain %s: %s", domain, exc)
+        return {"url": "", "code": ""}
     if redirect_result.get("error"):
         return {"url": "", "code": ""}
 
@@ -47,39 +61,49 @@ def fetch_website_status(domain: str) -> dict[str, str]:
 
 def _store_screenshot_response(content: bytes) -> dict[str, str]:
     filename, screenshot_hash = save_screenshot_bytes(content)
-    return {"filename": filename, "hash": screenshot_hash}
+    return {"filename": filename, "hash": screenshot_hash, "phash": compute_screenshot_phash(filename)}
 
 
 def fetch_geekflare_website_screenshot(domain: str) -> dict[str, str]:
-    screenshot_url = get_screenshot_url(domain)
+    try:
+        with provider_slot(ScreenshotProvider.GEEKFLARE):
+            screenshot_url = get_screenshot_url(domain)
+    except ProviderRateLimitTimeout as exc:
+        logger.warning("Error fetching screenshot for domain %s: %s", domain, exc)
+        return {"filename": "", "hash": "", "phash": ""}
     if not screenshot_url:
-        return {"filename": "", "hash": ""}
+        return {"filename": "", "hash": "", "phash": ""}
 
     try:
         response = requests.get(screenshot_url, timeout=30)
         response.raise_for_status()
     except requests.RequestException as exc:
         logger.warning("Error fetching screenshot bytes for domain %s: %s", domain, exc)
-        return {"filename": "", "hash": ""}
+        return {"filename": "", "hash": "", "phash": ""}
 
     return _store_screenshot_response(response.content)
 
 
 def fetch_screenshotmachine_website_screenshot(domain: str) -> dict[str, str]:
-    encoded_image = get_screenshotmachine_screenshot(domain)
+    try:
+        with provider_slot(ScreenshotProvider.SCREENSHOTMACHINE):
+            encoded_image = get_screenshotmachine_screenshot(domain)
+    except ProviderRateLimitTimeout as exc:
+        logger.warning("Error fetching screenshot for domain %s: %s", domain, exc)
+        return {"filename": "", "hash": "", "phash": ""}
     if not encoded_image:
-        return {"filename": "", "hash": ""}
+        return {"filename": "", "hash": "", "phash": ""}
 
     try:
         image_bytes = base64.b64decode(encoded_image)
     except Exception as exc:
         logger.warning("Error decoding ScreenshotMachine response for domain %s: %s", domain, exc)
-        return {"filename": "", "hash": ""}
+        return {"filename": "", "hash": "", "phash": ""}
 
     return _store_screenshot_response(image_bytes)
 
 
-def fetch_website_screenshot(domain: str) -> dict[str, str]:
-    if get_screenshot_provider() == ScreenshotProvider.SCREENSHOTMACHINE:
+def fetch_website_screenshot(domain: str, screenshot_provider: str | None = None) -> dict[str, str]:
+    if (screenshot_provider or get_screenshot_provider()) == ScreenshotProvider.SCREENSHOTMACHINE:
         return fetch_screenshotmachine_website_screenshot(domain)
     return fetch_geekflare_website_screenshot(domain)
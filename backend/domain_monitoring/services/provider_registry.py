@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
 from typing import Any
 
 from domain_monitoring.choices import DNSProvider, ScreenshotProvider, SubdomainProvider
@@ -9,11 +11,20 @@ from scripts.providers.geekflare import get_dns_records as geekflare_get_dns_rec
 from scripts.providers.securitytrails import get_dns_records as securitytrails_get_dns_records
 from scripts.providers.securitytrails import get_subdomains as securitytrails_get_subdomains
 from scripts.providers.virustotal import get_subdomains as virustotal_get_subdomains
+from scripts.aggregators.base import call_rate_limited
+from scripts.domain_monitoring.dns_lookup import get_bulk_dns_records
+from scripts.domain_monitoring.dns_lookup import get_dns_records as builtin_get_dns_records
 
 
 DNS_ADAPTERS: dict[str, Callable[[str], dict[str, Any]]] = {
     DNSProvider.GEEKFLARE: geekflare_get_dns_records,
     DNSProvider.SECURITYTRAILS: securitytrails_get_dns_records,
+    DNSProvider.BUILTIN: builtin_get_dns_records,
+}
+
+# Providers that can resolve a whole batch up front; later per-domain calls are served from their cache.
+DNS_BULK_PREFETCHERS: dict[str, Callable[[list[str]], Any]] = {
+    DNSProvider.BUILTIN: get_bulk_dns_records,
 }
 
 SUBDOMAIN_ADAPTERS: dict[str, Callable[[str], dict[str, Any]]] = {
@@ -22,15 +33,44 @@ SUBDOMAIN_ADAPTERS: dict[str, Callable[[str], dict[str, Any]]] = {
 }
 
 
+@dataclass(frozen=True)
+class MonitoringProviders:
+    dns: Callable[[str], dict[str, Any]]
+    subdomains: Callable[[str], dict[str, Any]]
+    screenshot: str
+    dns_prefetch: Callable[[list[str]], Any] | None = None
+
+
+def _rate_limited(provider: str, adapter: Callable[[str], dict[str, Any]]) -> Callable[[str], dict[str, Any]]:
+    return partial(call_rate_limited, str(provider), adapter)
+
+
 def get_dns_provider() -> Callable[[str], dict[str, Any]]:
     provider = get_domain_monitoring_settings().dns_provider
-    return DNS_ADAPTERS.get(provider, geekflare_get_dns_records)
+    if provider not in DNS_ADAPTERS:
+        provider = DNSProvider.GEEKFLARE
+    return _rate_limited(provider, DNS_ADAPTERS[provider])
+
+
+def get_dns_prefetcher() -> Callable[[list[str]], Any] | None:
+    return DNS_BULK_PREFETCHERS.get(get_domain_monitoring_settings().dns_provider)
 
 
 def get_subdomain_provider() -> Callable[[str], dict[str, Any]]:
     provider = get_domain_monitoring_settings().subdomain_provider
-    return SUBDOMAIN_ADAPTERS.get(provider, virustotal_get_subdomains)
+    if provider not in SUBDOMAIN_ADAPTERS:
+        provider = SubdomainProvider.VIRUSTOTAL
+    return _rate_limited(provider, SUBDOMAIN_ADAPTERS[provider])
 
 
 def get_screenshot_provider() -> str:
     return get_domain_monitoring_settings().screenshot_provider or ScreenshotProvider.GEEKFLARE
+
+
+def resolve_monitoring_providers() -> MonitoringProviders:
+    return MonitoringProviders(
+        dns=get_dns_provider(),
+        subdomains=get_subdomain_provider(),
+        screenshot=get_screenshot_provider(),
+        dns_prefetch=get_dns_prefetcher(),
+    )
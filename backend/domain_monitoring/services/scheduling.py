@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from domain_monitoring.models import MonitoredDomain
+
+
+MIN_CHECK_INTERVAL_DAYS = 1
+MAX_CHECK_INTERVAL_DAYS = 30
+CHANGE_HISTORY_LENGTH = 10
+VOLATILITY_WINDOW_DAYS = 30
+VOLATILE_CHANGE_COUNT = 2
+
+
+def get_due_monitored_domains(now: datetime | None = None):
+    now = now or timezone.now()
+    return MonitoredDomain.objects.filter(status="active").filter(
+        Q(next_check_at__isnull=True) | Q(next_check_at__lte=now)
+    )
+
+
+def record_change(change_history: list[str], checked_on: date) -> list[str]:
+    history = [*change_history, checked_on.isoformat()]
+    return history[-CHANGE_HISTORY_LENGTH:]
+
+
+def count_recent_changes(change_history: list[str], checked_on: date) -> int:
+    window_start = checked_on - timedelta(days=VOLATILITY_WINDOW_DAYS)
+    recent_changes = 0
+    for changed_on in change_history:
+        try:
+            if date.fromisoformat(changed_on) >= window_start:
+                recent_changes += 1
+        except (TypeError, ValueError):
+            continue
+    return recent_changes
+
+
+def compute_check_interval_days(stable_check_count: int, change_history: list[str], checked_on: date) -> int:
+    """Back off exponentially while a domain stays unchanged; check volatile domains at the minimum interval."""
+    if count_recent_changes(change_history, checked_on) >= VOLATILE_CHANGE_COUNT:
+        return MIN_CHECK_INTERVAL_DAYS
+    return min(MAX_CHECK_INTERVAL_DAYS, MIN_CHECK_INTERVAL_DAYS * 2 ** min(stable_check_count, 16))
+
+
+def apply_check_schedule(monitored_domain: MonitoredDomain, changed: bool, checked_on: date) -> None:
+    if changed:
+        monitored_domain.change_history = record_change(monitored_domain.change_history or [], checked_on)
+        monitored_domain.stable_check_count = 0
+    elif monitored_domain.last_checked is not None:
+        monitored_domain.stable_check_count += 1
+
+    interval_days = compute_check_interval_days(
+        monitored_domain.stable_check_count,
+        monitored_domain.change_history or [],
+        checked_on,
+    )
+    # Schedule on day boundaries so a daily run never skips a domain that is due later the same day.
+    monitored_domain.next_check_at = timezone.make_aware(
+        datetime.combine(checked_on + timedelta(days=interval_days), time.min),
+        timezone.get_current_timezone(),
+    )
@@ -1,57 +1,43 @@
-import pathlib
 import logging
+import pathlib
 
 import cv2
 import numpy as np
 from skimage.metrics import structural_similarity
 
-from domain_monitoring.services.screenshot_storage import delete_screenshot_file
+from domain_monitoring.services.screenshot_features import load_screenshot_features
 from scripts.domain_monitoring.config import SCREENSHOT_DIRECTORY
 
 
 logger = logging.getLogger(__name__)
 
+# Threshold for SSIM of the full-resolution grayscale screenshots.
 SSIM_THRESHOLD = 0.96
+# Thumbnail SSIM does not track full-resolution SSIM closely: downsampling hides small text
+# changes and averages out pixel noise. Outside this band the thumbnail decides on its own;
+# inside it the full-resolution images are compared. On sample page pairs (text edits,
+# banners, shifted layouts, unrelated pages) every thumbnail score outside the band agreed
+# with the full-resolution decision.
+THUMBNAIL_SSIM_RECHECK_BAND = (0.93, 0.985)
 PHASH_DISTANCE_THRESHOLD = 10
 
 
-def _get_screenshot_path(filename: str) -> pathlib.Path:
-    return pathlib.Path.joinpath(SCREENSHOT_DIRECTORY, filename)
+def _get_image_similarity(thumbnail1: np.ndarray, thumbnail2: np.ndarray) -> float:
+    return float(structural_similarity(thumbnail1, thumbnail2))
 
 
-def _load_screenshot_image(filename: str) -> np.ndarray | None:
-    screenshot_path = _get_screenshot_path(filename)
-    image = cv2.imread(str(screenshot_path))
+def _load_grayscale_screenshot(filename: str) -> np.ndarray | None:
+    image = cv2.imread(str(pathlib.Path.joinpath(SCREENSHOT_DIRECTORY, filename)), cv2.IMREAD_GRAYSCALE)
     return image if isinstance(image, np.ndarray) else None
 
 
-def _prepare_images_for_similarity(img1: np.ndarray, img2: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
-    grayscale1 = cv2.cvtColor(img1, cv2.COLOR_BGR2GRAY)
-    grayscale2 = cv2.cvtColor(img2, cv2.COLOR_BGR2GRAY)
-
-    target_width = min(grayscale1.shape[1], grayscale2.shape[1])
-    target_height = min(grayscale1.shape[0], grayscale2.shape[0])
-    target_size = (target_width, target_height)
-
-    resized1 = cv2.resize(grayscale1, target_size)
-    resized2 = cv2.resize(grayscale2, target_size)
-    return resized1, resized2
-
-
-def _get_image_similarity(img1: np.ndarray, img2: np.ndarray) -> float:
-    prepared1, prepared2 = _prepare_images_for_similarity(img1, img2)
-    similarity, _ = structural_similarity(prepared1, prepared2, full=True)
-    return float(similarity)
-
-
-def _compute_image_phash(image: np.ndarray) -> str:
-    grayscale = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    resized = cv2.resize(grayscale, (32, 32))
-    dct = cv2.dct(np.float32(resized))
-    dct_low_freq = dct[:8, :8]
-    median = float(np.median(dct_low_freq[1:, 1:]))
-    bits = (dct_low_freq > median).flatten()
-    return f"{int(''.join('1' if bit else '0' for bit in bits), 2):016x}"
+def _get_full_resolution_similarity(filename1: str, filename2: str) -> float | None:
+    grayscale1 = _load_grayscale_screenshot(filename1)
+    grayscale2 = _load_grayscale_screenshot(filename2)
+    if grayscale1 is None or grayscale2 is None:
+        return None
+    target_size = (min(grayscale1.shape[1], grayscale2.shape[1]), min(grayscale1.shape[0], grayscale2.shape[0]))
+    return _get_image_similarity(cv2.resize(grayscale1, target_size), cv2.resize(grayscale2, target_size))
 
 
 def _get_phash_distance(hash1: str, hash2: str) -> int:
@@ -59,10 +45,8 @@ def _get_phash_distance(hash1: str, hash2: str) -> int:
 
 
 def compute_screenshot_phash(filename: str) -> str:
-    image = _load_screenshot_image(filename)
-    if image is None:
-        return ""
-    return _compute_image_phash(image)
+    features = load_screenshot_features(filename)
+    return features.phash if features else ""
 
 
 def matches_screenshot_phash(filename: str, pattern_phash: str) -> bool:
@@ -82,25 +66,36 @@ def matches_screenshot_phash(filename: str, pattern_phash: str) -> bool:
 
 
 def matches_screenshot_image(filename: str, pattern_filename: str) -> bool:
-    candidate_image = _load_screenshot_image(filename)
-    pattern_image = _load_screenshot_image(pattern_filename)
-    if candidate_image is None or pattern_image is None:
+    candidate_features = load_screenshot_features(filename)
+    pattern_features = load_screenshot_features(pattern_filename)
+    if candidate_features is None or pattern_features is None:
         return False
 
-    similarity = _get_image_similarity(pattern_image, candidate_image)
+    similarity = _get_image_similarity(pattern_features.thumbnail, candidate_features.thumbnail)
+    recheck_low, recheck_high = THUMBNAIL_SSIM_RECHECK_BAND
+    if similarity < recheck_low or similarity >= recheck_high:
+        logger.debug(
+            "Screenshot thumbnail SSIM comparison for %s against %s: score=%.4f",
+            filename,
+            pattern_filename,
+            similarity,
+        )
+        return similarity >= recheck_high
+
+    full_similarity = _get_full_resolution_similarity(pattern_filename, filename)
+    if full_similarity is None:
+        # The images are gone; the thumbnail score is all there is.
+        return similarity >= SSIM_THRESHOLD
     logger.debug(
-        "Screenshot SSIM comparison for %s against %s: score=%.4f threshold=%.2f",
+        "Screenshot SSIM comparison for %s against %s: thumbnail=%.4f full=%.4f threshold=%.2f",
         filename,
         pattern_filename,
         similarity,
+        full_similarity,
         SSIM_THRESHOLD,
     )
-    return similarity >= SSIM_THRESHOLD
+    return full_similarity >= SSIM_THRESHOLD
 
 
 def are_screenshots_similar(old_screenshot_filename: str, new_screenshot_filename: str) -> bool:
-    if matches_screenshot_image(new_screenshot_filename, old_screenshot_filename):
-        delete_screenshot_file(new_screenshot_filename)
-        return True
-
-    return False
+    return matches_screenshot_image(new_screenshot_filename, old_screenshot_filename)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import logging
+import os
+import pathlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+from scripts.domain_monitoring.config import SCREENSHOT_DIRECTORY
+
+
+logger = logging.getLogger(__name__)
+
+FEATURES_SUFFIX = ".features.npz"
+THUMBNAIL_SIZE = (320, 180)
+FEATURES_CACHE_MAX_ENTRIES = 256
+
+
+@dataclass(frozen=True)
+class ScreenshotFeatures:
+    thumbnail: np.ndarray
+    phash: str
+    dhash: str
+
+
+_features_cache: OrderedDict[str, ScreenshotFeatures] = OrderedDict()
+_features_cache_lock = threading.Lock()
+
+
+def _get_features_path(filename: str) -> pathlib.Path:
+    return pathlib.Path.joinpath(SCREENSHOT_DIRECTORY, f"{filename}{FEATURES_SUFFIX}")
+
+
+def _bits_to_hex(bits: np.ndarray) -> str:
+    return f"{int(''.join('1' if bit else '0' for bit in bits.flatten()), 2):016x}"
+
+
+def _compute_phash(grayscale: np.ndarray) -> str:
+    resized = cv2.resize(grayscale, (32, 32))
+    dct = cv2.dct(np.float32(resized))
+    dct_low_freq = dct[:8, :8]
+    median = float(np.median(dct_low_freq[1:, 1:]))
+    return _bits_to_hex(dct_low_freq > median)
+
+
+def _compute_dhash(grayscale: np.ndarray) -> str:
+    resized = cv2.resize(grayscale, (9, 8), interpolation=cv2.INTER_AREA)
+    return _bits_to_hex(resized[:, 1:] > resized[:, :-1])
+
+
+def compute_image_features(image: np.ndarray) -> ScreenshotFeatures:
+    grayscale = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return ScreenshotFeatures(
+        thumbnail=cv2.resize(grayscale, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA),
+        phash=_compute_phash(grayscale),
+        dhash=_compute_dhash(grayscale),
+    )
+
+
+def compute_screenshot_bytes_features(content: bytes) -> ScreenshotFeatures | None:
+    image = cv2.imdecode(np.frombuffer(content, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if not isinstance(image, np.ndarray):
+        return None
+    return compute_image_features(image)
+
+
+def _remember_features(filename: str, features: ScreenshotFeatures) -> None:
+    with _features_cache_lock:
+        _features_cache[filename] = features
+        _features_cache.move_to_end(filename)
+        while len(_features_cache) > FEATURES_CACHE_MAX_ENTRIES:
+            _features_cache.popitem(last=False)
+
+
+def save_screenshot_features(filename: str, features: ScreenshotFeatures) -> None:
+    with open(_get_features_path(filename), "wb") as file_handle:
+        np.savez_compressed(
+            file_handle,
+            thumbnail=features.thumbnail,
+            phash=np.array(features.phash),
+            dhash=np.array(features.dhash),
+        )
+    _remember_features(filename, features)
+
+
+def _read_screenshot_features(filename: str) -> ScreenshotFeatures | None:
+    features_path = _get_features_path(filename)
+    if not features_path.exists():
+        return None
+    try:
+        with np.load(features_path) as stored:
+            return ScreenshotFeatures(
+                thumbnail=stored["thumbnail"],
+                phash=str(stored["phash"]),
+                dhash=str(stored["dhash"]),
+            )
+    except (OSError, ValueError, KeyError) as exc:
+        logger.warning("Error reading screenshot features for %s: %s", filename, exc)
+        return None
+
+
+def load_screenshot_features(filename: str) -> ScreenshotFeatures | None:
+    """Return cached features for a stored screenshot, backfilling them from the image if missing."""
+    if not filename:
+        return None
+
+    with _features_cache_lock:
+        features = _features_cache.get(filename)
+        if features is not None:
+            _features_cache.move_to_end(filename)
+            return features
+
+    features = _read_screenshot_features(filename)
+    if features is not None:
+        _remember_features(filename, features)
+        return features
+
+    image = cv2.imread(str(pathlib.Path.joinpath(SCREENSHOT_DIRECTORY, filename)))
+    if not isinstance(image, np.ndarray):
+        return None
+
+    features = compute_image_features(image)
+    try:
+        save_screenshot_features(filename, features)
+    except OSError as exc:
+        logger.warning("Error saving screenshot features for %s: %s", filename, exc)
+        _remember_features(filename, features)
+    return features
+
+
+def delete_screenshot_features(filename: str) -> None:
+    with _features_cache_lock:
+        _features_cache.pop(filename, None)
+    features_path = _get_features_path(filename)
+    if features_path.exists():
+        os.remove(features_path)
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from domain_monitoring.models import MonitoredDomainScreenshotPattern
+from domain_monitoring.services.screenshot_compare import (
+    PHASH_DISTANCE_THRESHOLD,
+    compute_screenshot_phash,
+    matches_screenshot_image,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# pHash distances just above the threshold are ambiguous; only those fall back to SSIM.
+PHASH_SSIM_TIEBREAK_MARGIN = 6
+
+
+@dataclass(frozen=True)
+class ScreenshotPatternEntry:
+    monitored_domain_id: int
+    screenshot: str
+    screenshot_hash: str
+    screenshot_phash: str
+
+
+class BKTree:
+    """Burkhard-Keller tree over 64-bit pHashes using Hamming distance."""
+
+    def __init__(self):
+        self._root: tuple[int, list[ScreenshotPatternEntry], dict[int, tuple]] | None = None
+
+    def add(self, phash: int, entry: ScreenshotPatternEntry) -> None:
+        if self._root is None:
+            self._root = (phash, [entry], {})
+            return
+
+        node = self._root
+        while True:
+            node_hash, entries, children = node
+            distance = (node_hash ^ phash).bit_count()
+            if distance == 0:
+                entries.append(entry)
+                return
+            if distance not in children:
+                children[distance] = (phash, [entry], {})
+                return
+            node = children[distance]
+
+    def search(self, phash: int, radius: int) -> list[tuple[int, ScreenshotPatternEntry]]:
+        results: list[tuple[int, ScreenshotPatternEntry]] = []
+        if self._root is None:
+            return results
+
+        pending = [self._root]
+        while pending:
+            node_hash, entries, children = pending.pop()
+            distance = (node_hash ^ phash).bit_count()
+            if distance <= radius:
+                results.extend((distance, entry) for entry in entries)
+            for child_distance, child in children.items():
+                if distance - radius <= child_distance <= distance + radius:
+                    pending.append(child)
+        return sorted(results, key=lambda item: item[0])
+
+
+class ScreenshotPatternIndex:
+    """Active sponsored-listing patterns indexed by exact SHA-256 and by pHash per monitored domain."""
+
+    def __init__(self, entries: Iterable[ScreenshotPatternEntry]):
+        self._hashes: set[tuple[int, str]] = set()
+        self._trees: dict[int, BKTree] = {}
+        self._unhashed: dict[int, list[ScreenshotPatternEntry]] = {}
+
+        for entry in entries:
+            if entry.screenshot_hash:
+                self._hashes.add((entry.monitored_domain_id, entry.screenshot_hash))
+            phash = _parse_phash(entry.screenshot_phash)
+            if phash is not None:
+                self._trees.setdefault(entry.monitored_domain_id, BKTree()).add(phash, entry)
+            elif entry.screenshot:
+                self._unhashed.setdefault(entry.monitored_domain_id, []).append(entry)
+
+    @classmethod
+    def build(cls, monitored_domain_ids: Iterable[int] | None = None) -> ScreenshotPatternIndex:
+        patterns = MonitoredDomainScreenshotPattern.objects.filter(active=True)
+        if monitored_domain_ids is not None:
+            patterns = patterns.filter(monitored_domain_id__in=list(monitored_domain_ids))
+        return cls(
+            ScreenshotPatternEntry(
+                monitored_domain_id=row["monitored_domain_id"],
+                screenshot=row["screenshot"],
+                screenshot_hash=row["screenshot_hash"],
+                screenshot_phash=row["screenshot_phash"],
+            )
+            for row in patterns.values("monitored_domain_id", "screenshot", "screenshot_hash", "screenshot_phash")
+        )
+
+    def matches(
+        self,
+        monitored_domain_id: int,
+        screenshot_filename: str,
+        screenshot_hash: str,
+        screenshot_phash: str = "",
+    ) -> bool:
+        if screenshot_hash and (monitored_domain_id, screenshot_hash) in self._hashes:
+            return True
+
+        tree = self._trees.get(monitored_domain_id)
+        if tree is not None:
+            phash = _parse_phash(screenshot_phash or compute_screenshot_phash(screenshot_filename))
+            if phash is not None:
+                radius = PHASH_DISTANCE_THRESHOLD + PHASH_SSIM_TIEBREAK_MARGIN
+                for distance, entry in tree.search(phash, radius):
+                    logger.debug(
+                        "Screenshot pHash comparison for %s: distance=%s threshold=%s",
+                        screenshot_filename,
+                        distance,
+                        PHASH_DISTANCE_THRESHOLD,
+                    )
+                    if distance <= PHASH_DISTANCE_THRESHOLD:
+                        return True
+                    if entry.screenshot and matches_screenshot_image(screenshot_filename, entry.screenshot):
+                        return True
+
+        for entry in self._unhashed.get(monitored_domain_id, []):
+            if matches_screenshot_image(screenshot_filename, entry.screenshot):
+                return True
+
+        return False
+
+
+def _parse_phash(phash: str) -> int | None:
+    if not phash:
+        return None
+    try:
+        return int(phash, 16)
+    except ValueError:
+        return None
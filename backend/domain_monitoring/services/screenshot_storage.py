@@ -1,31 +1,126 @@
 import hashlib
+import logging
 import os
 import pathlib
-import uuid
+import tempfile
+import time
+from collections.abc import Iterator
+from datetime import timedelta
 
+from domain_monitoring.models import MonitoredDomain, MonitoredDomainAlert, MonitoredDomainScreenshotPattern
+from domain_monitoring.services.screenshot_features import (
+    FEATURES_SUFFIX,
+    compute_screenshot_bytes_features,
+    delete_screenshot_features,
+    save_screenshot_features,
+)
 from scripts.domain_monitoring.config import SCREENSHOT_DIRECTORY
 
 
-def _build_screenshot_path(extension: str = ".png") -> tuple[str, pathlib.Path]:
-    os.makedirs(SCREENSHOT_DIRECTORY, exist_ok=True)
+logger = logging.getLogger(__name__)
 
-    while True:
-        filename = f"{uuid.uuid4()}{extension}"
-        filepath = pathlib.Path.joinpath(SCREENSHOT_DIRECTORY, filename)
-        if not filepath.exists():
-            return filename, filepath
+SCREENSHOT_GC_MIN_AGE = timedelta(hours=24)
 
 
-def save_screenshot_bytes(content: bytes, extension: str = ".png") -> tuple[str, str]:
-    filename, filepath = _build_screenshot_path(extension)
-    with open(filepath, "wb") as file_handle:
-        file_handle.write(content)
+def _build_screenshot_filename(screenshot_hash: str, extension: str = ".png") -> str:
+    # Content-addressed, fanned out over two directory levels to keep directories small.
+    return f"{screenshot_hash[:2]}/{screenshot_hash[2:4]}/{screenshot_hash}{extension}"
+
+
+def _get_screenshot_path(filename: str) -> pathlib.Path:
+    return pathlib.Path.joinpath(SCREENSHOT_DIRECTORY, filename)
+
+
+def _write_file_atomically(filepath: pathlib.Path, content: bytes) -> None:
+    os.makedirs(filepath.parent, exist_ok=True)
+    file_descriptor, temp_path = tempfile.mkstemp(dir=filepath.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(file_descriptor, "wb") as file_handle:
+            file_handle.write(content)
+        os.replace(temp_path, filepath)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
 
+
+def save_screenshot_bytes(content: bytes, extension: str = ".png") -> tuple[str, str]:
     screenshot_hash = hashlib.sha256(content).hexdigest()
+    filename = _build_screenshot_filename(screenshot_hash, extension)
+    filepath = _get_screenshot_path(filename)
+    try:
+        # Touch the existing capture so orphan collection treats it as fresh until the run that
+        # re-captured it has committed its reference.
+        os.utime(filepath)
+        return filename, screenshot_hash
+    except FileNotFoundError:
+        pass
+
+    _write_file_atomically(filepath, content)
+
+    features = compute_screenshot_bytes_features(content)
+    if features is not None:
+        try:
+            save_screenshot_features(filename, features)
+        except OSError as exc:
+            logger.warning("Error saving screenshot features for %s: %s", filename, exc)
+
     return filename, screenshot_hash
 
 
 def delete_screenshot_file(filename: str) -> None:
-    filepath = pathlib.Path.joinpath(SCREENSHOT_DIRECTORY, filename)
+    delete_screenshot_features(filename)
+    filepath = _get_screenshot_path(filename)
     if filepath.exists():
         os.remove(filepath)
+
+
+def get_referenced_screenshot_filenames() -> set[str]:
+    referenced: set[str] = set()
+    referenced.update(
+        MonitoredDomain.objects.exclude(website_screenshot="").values_list("website_screenshot", flat=True)
+    )
+    referenced.update(
+        MonitoredDomainAlert.objects.exclude(website_screenshot="").values_list("website_screenshot", flat=True)
+    )
+    referenced.update(
+        MonitoredDomainScreenshotPattern.objects.exclude(screenshot="").values_list("screenshot", flat=True)
+    )
+    return referenced
+
+
+def iter_stored_screenshot_filenames() -> Iterator[str]:
+    if not SCREENSHOT_DIRECTORY.exists():
+        return
+    for filepath in SCREENSHOT_DIRECTORY.rglob("*"):
+        if not filepath.is_file() or filepath.name.startswith(".tmp-"):
+            continue
+        filename = filepath.relative_to(SCREENSHOT_DIRECTORY).as_posix()
+        if filename.endswith(FEATURES_SUFFIX):
+            if not _get_screenshot_path(filename.removesuffix(FEATURES_SUFFIX)).exists():
+                yield filename.removesuffix(FEATURES_SUFFIX)
+            continue
+        yield filename
+
+
+def collect_orphan_screenshots(min_age: timedelta = SCREENSHOT_GC_MIN_AGE, dry_run: bool = False) -> int:
+    """Delete stored screenshots that no domain, alert or pattern references and that are older than min_age."""
+    referenced = get_referenced_screenshot_filenames()
+    cutoff = time.time() - min_age.total_seconds()
+    deleted_count = 0
+
+    for filename in iter_stored_screenshot_filenames():
+        if filename in referenced:
+            continue
+        filepath = _get_screenshot_path(filename)
+        if filepath.exists() and filepath.stat().st_mtime > cutoff:
+            continue
+
+        deleted_count += 1
+        if dry_run:
+            logger.info("Would delete unreferenced screenshot %s", filename)
+            continue
+        delete_screenshot_file(filename)
+        logger.info("Deleted unreferenced screenshot %s", filename)
+
+    return deleted_count
@@ -1,7 +1,34 @@
 from __future__ import annotations
 
+import threading
+import time
+
 from domain_monitoring.models import DomainMonitoringSettings
 
 
+# Fallback for other processes, which do not see this process's post_save invalidation.
+SETTINGS_CACHE_TTL_SECONDS = 30
+
+_cached_settings: DomainMonitoringSettings | None = None
+_cached_settings_expires_at = 0.0
+_cached_settings_lock = threading.Lock()
+
+
 def get_domain_monitoring_settings() -> DomainMonitoringSettings:
-    return DomainMonitoringSettings.get_solo()
+    global _cached_settings, _cached_settings_expires_at
+    with _cached_settings_lock:
+        if _cached_settings is not None and _cached_settings_expires_at > time.monotonic():
+            return _cached_settings
+
+    settings = DomainMonitoringSettings.get_solo()
+    with _cached_settings_lock:
+        _cached_settings = settings
+        _cached_settings_expires_at = time.monotonic() + SETTINGS_CACHE_TTL_SECONDS
+    return settings
+
+
+def invalidate_domain_monitoring_settings_cache() -> None:
+    global _cached_settings, _cached_settings_expires_at
+    with _cached_settings_lock:
+        _cached_settings = None
+        _cached_settings_expires_at = 0.0
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+
+from django.db import connections
+
+from domain_monitoring.models import SSLCertificate
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL_MS = 500
+DEFAULT_MAX_QUEUE_SIZE = 100_000
+ENQUEUE_TIMEOUT_SECONDS = 1.0
+FLUSH_ATTEMPTS = 3
+FLUSH_RETRY_BACKOFF_SECONDS = 0.5
+METRICS_LOG_INTERVAL_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class SSLCertificateMatch:
+    cert_index: int
+    cert_domain: str
+    watched_domain: str
+    company_id: int
+
+
+class SSLCertificateWriter:
+    """
+    Write-behind buffer for certstream matches.
+
+    Matching threads enqueue matches; a single writer thread inserts them with one
+    bulk_create per flush, every flush_size matches or flush_interval_ms, whichever comes
+    first. Duplicates are skipped by the (cert_index, cert_domain, watched_domain, company)
+    unique constraint, so a failed insert is retried up to FLUSH_ATTEMPTS times with backoff
+    before its batch is counted as failed. Pending matches are flushed when the writer stops.
+    With dry_run the writer only counts what it would have written.
+    """
+
+    def __init__(
+        self,
+        flush_size: int = DEFAULT_FLUSH_SIZE,
+        flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        dry_run: bool = False,
+    ):
+        self.flush_size = max(1, flush_size)
+        self.dry_run = dry_run
+        self.flush_interval = max(1, flush_interval_ms) / 1000
+        self._queue: queue.Queue[SSLCertificateMatch] = queue.Queue(maxsize=max_queue_size)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ssl-certificate-writer", daemon=True)
+        self._metrics_lock = threading.Lock()
+        self._enqueued = 0
+        self._dropped = 0
+        self._flushed = 0
+        self._flushes = 0
+        self._failed = 0
+        self._max_queue_depth = 0
+
+    def __enter__(self) -> SSLCertificateWriter:
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+        logger.info("SSL certificate writer stopped: %s", self.metrics())
+
+    def submit(self, match: SSLCertificateMatch) -> bool:
+        try:
+            self._queue.put(match, timeout=ENQUEUE_TIMEOUT_SECONDS)
+        except queue.Full:
+            with self._metrics_lock:
+                self._dropped += 1
+            logger.warning("SSL certificate write queue full; dropped match %s", match.cert_domain)
+            return False
+
+        with self._metrics_lock:
+            self._enqueued += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+        return True
+
+    def metrics(self) -> dict[str, int]:
+        with self._metrics_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "enqueued": self._enqueued,
+                "dropped": self._dropped,
+                "flushed": self._flushed,
+                "failed": self._failed,
+                "flushes": self._flushes,
+            }
+
+    def _drain(self, deadline: float) -> list[SSLCertificateMatch]:
+        batch: list[SSLCertificateMatch] = []
+        while len(batch) < self.flush_size:
+            timeout = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch: list[SSLCertificateMatch]) -> None:
+        if not batch:
+            return
+        for attempt in range(1, FLUSH_ATTEMPTS + 1):
+            try:
+                if not self.dry_run:
+                    self._write(batch)
+                break
+            except Exception:
+                if attempt == FLUSH_ATTEMPTS:
+                    logger.exception("Error writing %s SSL certificate match(es)", len(batch))
+                    with self._metrics_lock:
+                        self._failed += len(batch)
+                    return
+                backoff = FLUSH_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+                logger.warning(
+                    "Error writing %s SSL certificate match(es); retrying in %ss",
+                    len(batch),
+                    backoff,
+                    exc_info=True,
+                )
+                # A broken connection would fail every retry; the next attempt reconnects.
+                connections.close_all()
+                time.sleep(backoff)
+
+        with self._metrics_lock:
+            self._flushed += len(batch)
+            self._flushes += 1
+
+    def _write(self, batch: list[SSLCertificateMatch]) -> None:
+        SSLCertificate.objects.bulk_create(
+            [
+                SSLCertificate(
+                    cert_index=match.cert_index,
+                    cert_domain=match.cert_domain,
+                    watched_domain=match.watched_domain,
+                    company_id=match.company_id,
+                )
+                for match in dict.fromkeys(batch)
+            ],
+            ignore_conflicts=True,
+        )
+
+    def _run(self) -> None:
+        next_metrics_log = time.monotonic() + METRICS_LOG_INTERVAL_SECONDS
+        try:
+            while not self._stopped.is_set():
+                self._flush(self._drain(time.monotonic() + self.flush_interval))
+                if time.monotonic() >= next_metrics_log:
+                    logger.info("SSL certificate writer: %s", self.metrics())
+                    next_metrics_log = time.monotonic() + METRICS_LOG_INTERVAL_SECONDS
+
+            while not self._queue.empty():
+                self._flush(self._drain(time.monotonic()))
+        finally:
+            connections.close_all()
@@ -7,9 +7,10 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.utils import timezone
 
-from domain_monitoring.models import MonitoredDomain, WatchedResource
+from domain_monitoring.models import DomainMonitoringSettings, MonitoredDomain, WatchedResource
 from domain_monitoring.services.lookalikes import run_lookalike_scan_since
 from domain_monitoring.services.monitoring import monitor_monitored_domain_by_id
+from domain_monitoring.services.settings import invalidate_domain_monitoring_settings_cache
 
 
 logger = logging.getLogger(__name__)
@@ -46,6 +47,11 @@ def _should_trigger_watched_resource_scan(created: bool, status: str, update_fie
     return bool(set(update_fields) & relevant_fields)
 
 
+@receiver(post_save, sender=DomainMonitoringSettings)
+def invalidate_cached_domain_monitoring_settings(sender, instance, **kwargs):
+    invalidate_domain_monitoring_settings_cache()
+
+
 @receiver(post_save, sender=MonitoredDomain)
 def trigger_monitoring_for_new_domain(sender, instance, created, **kwargs):
     if not created or instance.status != "active":
@@ -0,0 +1,147 @@
+import os
+import queue
+import signal
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.db import OperationalError
+from django.db.models.signals import post_save
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from domain_monitoring import signals
+from domain_monitoring.models import Company, MonitoredDomain
+from domain_monitoring.services import certstream, ssl_certificate_writer
+from domain_monitoring.services.certstream import (
+    CertstreamListener,
+    get_monitored_domain_changes,
+    run_certstream_matcher,
+    stop_on_signals,
+)
+from domain_monitoring.services.ssl_certificate_writer import SSLCertificateMatch, SSLCertificateWriter
+from domain_monitoring.tests.test_certstream_replay import FakeCertstreamServer
+
+
+class MonitoredDomainChangesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Creating a domain would otherwise start a monitoring thread.
+        post_save.disconnect(signals.trigger_monitoring_for_new_domain, sender=MonitoredDomain)
+
+    @classmethod
+    def tearDownClass(cls):
+        post_save.connect(signals.trigger_monitoring_for_new_domain, sender=MonitoredDomain)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.companies = [Company.objects.create(name=f"Company {index}") for index in range(3)]
+        self.domains = {
+            f"{company_index}-{domain_index}.com": MonitoredDomain.objects.create(
+                value=f"{company_index}-{domain_index}.com",
+                company=company,
+            )
+            for company_index, company in enumerate(self.companies)
+            for domain_index in range(3)
+        }
+        long_ago = timezone.now() - timedelta(days=1)
+        MonitoredDomain.objects.update(last_modified=long_ago)
+        Company.objects.update(last_modified=long_ago)
+
+    def test_returns_only_changed_domains_and_domains_of_changed_companies(self):
+        since = timezone.now() - timedelta(minutes=1)
+        changed_domain = self.domains["0-1.com"]
+        changed_domain.status = "inactive"
+        changed_domain.save()
+        self.companies[2].save()
+
+        with self.assertNumQueries(3):
+            changes = get_monitored_domain_changes(since)
+
+        self.assertEqual(
+            sorted((item["value"], item["status"]) for item in changes),
+            [("0-1.com", "inactive"), ("2-0.com", "active"), ("2-1.com", "active"), ("2-2.com", "active")],
+        )
+
+    def test_no_changes_skips_the_company_query(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(get_monitored_domain_changes(timezone.now() - timedelta(minutes=1)), [])
+
+
+class CertstreamShutdownTests(SimpleTestCase):
+    def send_sigterm_after(self, delay: float) -> None:
+        timer = threading.Timer(delay, os.kill, args=(os.getpid(), signal.SIGTERM))
+        timer.daemon = True
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+    def test_sigterm_stops_the_listener(self):
+        server = FakeCertstreamServer(count=3)
+        server.start()
+        self.addCleanup(server.close)
+        received = []
+        listener = CertstreamListener(lambda message, _context: received.append(message), server.url)
+        # Fails the test instead of hanging it if the signal does not stop the listener.
+        safety_stop = threading.Timer(5, listener.stop)
+        safety_stop.daemon = True
+        safety_stop.start()
+        self.addCleanup(safety_stop.cancel)
+        previous_handler = signal.getsignal(signal.SIGTERM)
+
+        self.send_sigterm_after(0.5)
+        started = time.monotonic()
+        with stop_on_signals(listener.stop):
+            listener.run()
+
+        self.assertLess(time.monotonic() - started, 3)
+        self.assertEqual(len(received), 3)
+        self.assertIs(signal.getsignal(signal.SIGTERM), previous_handler)
+
+    def test_matcher_drains_its_queue_after_sigterm(self):
+        self.addCleanup(signal.signal, signal.SIGINT, signal.getsignal(signal.SIGINT))
+        message_queue = queue.Queue()
+        for cert_index in range(3):
+            message_queue.put({"data": {"cert_index": cert_index, "leaf_cert": {"all_domains": []}}})
+        processed = []
+
+        def process(payload, *args):
+            if not processed:
+                os.kill(os.getpid(), signal.SIGTERM)
+            processed.append(payload["data"]["cert_index"])
+
+        with (
+            mock.patch.object(certstream, "MonitoredDomainIndexRefresher"),
+            mock.patch.object(certstream, "process_certificate_update", process),
+            mock.patch.object(certstream, "MATCHER_QUEUE_POLL_SECONDS", 0.05),
+        ):
+            run_certstream_matcher(0, message_queue, 3600, 1.0, 500, 500)
+
+        self.assertEqual(processed, [0, 1, 2])
+
+
+class SSLCertificateWriterFlushTests(SimpleTestCase):
+    def setUp(self):
+        for patcher in (
+            mock.patch.object(ssl_certificate_writer, "FLUSH_RETRY_BACKOFF_SECONDS", 0),
+            mock.patch.object(ssl_certificate_writer, "connections"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.writer = SSLCertificateWriter()
+        self.batch = [SSLCertificateMatch(1, "a.example.com", "example.com", 1)]
+
+    def test_retries_a_failed_write(self):
+        with mock.patch.object(self.writer, "_write", side_effect=[OperationalError("gone away"), None]) as write:
+            self.writer._flush(self.batch)
+
+        self.assertEqual(write.call_count, 2)
+        self.assertEqual((self.writer.metrics()["flushed"], self.writer.metrics()["failed"]), (1, 0))
+
+    def test_counts_the_batch_as_failed_after_the_last_attempt(self):
+        with mock.patch.object(self.writer, "_write", side_effect=OperationalError("gone away")) as write:
+            self.writer._flush(self.batch)
+
+        self.assertEqual(write.call_count, ssl_certificate_writer.FLUSH_ATTEMPTS)
+        self.assertEqual((self.writer.metrics()["flushed"], self.writer.metrics()["failed"]), (0, 1))
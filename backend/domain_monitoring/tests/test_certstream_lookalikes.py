@@ -0,0 +1,110 @@
+import random
+import string
+from datetime import date
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from domain_monitoring.services.certstream_lookalikes import (
+    CERTSTREAM_LOOKALIKE_SOURCE,
+    LookalikeQueryIndex,
+)
+from domain_monitoring.services.lookalikes import CandidateDomain, identify_lookalike_matches
+
+BRANDS = ("paypal", "google", "globalwire", "my-bank", "wells-fargo", "ab", "go", "x", "contoso-payments-online")
+TLDS = ("com", "net", "co.uk", "shop", "xn--p1ai")
+
+
+def build_queries() -> list[dict]:
+    queries = []
+    for brand in BRANDS:
+        for properties in ([], ["typo_match"], ["typo_match", "noise_reduction"]):
+            queries.append({"value": f"{brand}.com", "resource_type": "domain", "properties": properties})
+        queries.append({"value": brand, "resource_type": "keyword", "properties": []})
+    queries.extend(
+        [
+            {"value": "paypal", "resource_type": "keyword", "properties": ["substring_typo_match"]},
+            {"value": "pay*", "resource_type": "keyword", "properties": []},
+            {"value": "secure.login", "resource_type": "keyword", "properties": []},
+            {"value": "bank", "resource_type": "keyword", "properties": [], "exclude_keywords": ["banking"]},
+            {"value": "wellsfargo.com", "resource_type": "domain", "properties": ["typo_match"]},
+        ]
+    )
+    return queries
+
+
+def mutate(rng: random.Random, value: str) -> str:
+    characters = list(value)
+    for _ in range(rng.randint(0, 3)):
+        operation = rng.choice(("insert", "delete", "replace", "hyphen", "homoglyph"))
+        position = rng.randrange(len(characters) + 1)
+        if operation == "insert":
+            characters.insert(position, rng.choice(string.ascii_lowercase))
+        elif operation == "hyphen":
+            characters.insert(position, "-")
+        elif characters and position < len(characters):
+            if operation == "delete":
+                del characters[position]
+            elif operation == "replace":
+                characters[position] = rng.choice(string.ascii_lowercase)
+            else:
+                characters[position] = {"g": "q", "l": "i", "w": "v"}.get(characters[position], "ä")
+    return "".join(characters).strip("-") or "a"
+
+
+def build_domains(seed: int = 7, count: int = 400) -> list[str]:
+    rng = random.Random(seed)
+    domains = []
+    for _ in range(count):
+        brand = rng.choice(BRANDS)
+        shape = rng.random()
+        if shape < 0.4:
+            name = mutate(rng, brand)
+        elif shape < 0.6:
+            name = f"{rng.choice(('secure-', 'login', ''))}{mutate(rng, brand)}{rng.choice(('-login', 'app', ''))}"
+        elif shape < 0.7:
+            name = brand + "".join(rng.choices(string.ascii_lowercase, k=rng.randint(18, 30)))
+        else:
+            name = "".join(rng.choices(string.ascii_lowercase + "-", k=rng.randint(1, 16))).strip("-") or "b"
+        domains.append(f"{name}.{rng.choice(TLDS)}")
+    return domains
+
+
+class LookalikeQueryIndexTests(SimpleTestCase):
+    def test_candidate_queries_match_the_full_scan(self):
+        queries = build_queries()
+        index = LookalikeQueryIndex(queries)
+        now = timezone.now()
+        checked = 0
+        matched = 0
+        for domain in build_domains():
+            candidate = CandidateDomain(
+                value=domain,
+                created=now,
+                source_date=date(2026, 1, 1),
+                source=CERTSTREAM_LOOKALIKE_SOURCE,
+            )
+            candidate_queries = index.candidate_queries(domain)
+            expected = identify_lookalike_matches(queries, [candidate])
+            self.assertEqual(identify_lookalike_matches(candidate_queries, [candidate]), expected, domain)
+            checked += len(candidate_queries)
+            matched += bool(expected)
+
+        self.assertGreater(matched, 40)
+        # Most of the queries never reach the matcher.
+        self.assertLess(checked, len(queries) * 400 / 3)
+
+    def test_unrelated_domain_skips_indexed_queries(self):
+        index = LookalikeQueryIndex(
+            [
+                {"value": "paypal.com", "resource_type": "domain", "properties": ["typo_match"]},
+                {"value": "paypal", "resource_type": "keyword", "properties": []},
+                {"value": "pay*", "resource_type": "keyword", "properties": []},
+            ]
+        )
+
+        self.assertEqual([query["value"] for query in index.candidate_queries("weather.com")], ["pay*"])
+        self.assertEqual(
+            [query["value"] for query in index.candidate_queries("paypa1.com")],
+            ["paypal.com", "pay*"],
+        )
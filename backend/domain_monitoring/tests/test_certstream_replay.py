@@ -0,0 +1,119 @@
+import base64
+import gzip
+import hashlib
+import json
+import os
+import socket
+import tempfile
+import threading
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from domain_monitoring.services.certstream_replay import iter_recorded_messages
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class FakeCertstreamServer(threading.Thread):
+    """Minimal websocket server that sends `count` certificate updates and then holds the connection open."""
+
+    def __init__(self, count: int):
+        super().__init__(daemon=True)
+        self.count = count
+        self.connections = 0
+        self._socket = socket.socket()
+        self._socket.bind(("127.0.0.1", 0))
+        self._socket.listen()
+        self.url = f"ws://127.0.0.1:{self._socket.getsockname()[1]}"
+
+    def run(self):
+        while True:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection: socket.socket):
+        with connection:
+            request = b""
+            while b"\r\n\r\n" not in request:
+                request += connection.recv(4096)
+            key = next(
+                line.split(":", 1)[1].strip()
+                for line in request.decode().split("\r\n")
+                if line.lower().startswith("sec-websocket-key:")
+            )
+            accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+            connection.sendall(
+                (
+                    "HTTP/1.1 101 Switching Protocols\r\n"
+                    "Upgrade: websocket\r\n"
+                    "Connection: Upgrade\r\n"
+                    f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+                ).encode()
+            )
+            for cert_index in range(self.count):
+                connection.sendall(self._frame({
+                    "message_type": "certificate_update",
+                    "data": {"cert_index": cert_index, "leaf_cert": {"all_domains": [f"host{cert_index}.example.com"]}},
+                }))
+            # Hold the connection open until the client sends a close frame, then acknowledge it.
+            try:
+                while data := connection.recv(4096):
+                    if data[0] & 0x0F == 0x8:
+                        connection.sendall(bytes([0x88, 0]))
+                        return
+            except OSError:
+                pass
+
+    @staticmethod
+    def _frame(message: dict) -> bytes:
+        payload = json.dumps(message).encode()
+        if len(payload) < 126:
+            header = bytes([0x81, len(payload)])
+        else:
+            header = bytes([0x81, 126]) + len(payload).to_bytes(2, "big")
+        return header + payload
+
+    def close(self):
+        self._socket.close()
+
+
+class RecordCertstreamCommandTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "recording.ndjson.gz")
+
+    def _run_command(self, server: FakeCertstreamServer, *args: str) -> threading.Thread:
+        server.start()
+        self.addCleanup(server.close)
+        command = threading.Thread(
+            target=call_command,
+            args=("record_certstream", self.path, "--url", server.url, *args),
+            kwargs={"stdout": open(os.devnull, "w")},
+            daemon=True,
+        )
+        command.start()
+        command.join(timeout=5)
+        return command
+
+    def test_returns_after_limit_messages(self):
+        server = FakeCertstreamServer(count=10)
+        command = self._run_command(server, "--limit", "5")
+
+        self.assertFalse(command.is_alive(), "record_certstream did not return after --limit messages")
+        recorded = list(iter_recorded_messages(self.path))
+        self.assertEqual([message["data"]["cert_index"] for message in recorded], [0, 1, 2, 3, 4])
+        self.assertEqual(server.connections, 1)
+
+    def test_returns_after_duration(self):
+        server = FakeCertstreamServer(count=3)
+        command = self._run_command(server, "--duration", "1")
+
+        self.assertFalse(command.is_alive(), "record_certstream did not return after --duration")
+        with gzip.open(self.path, "rt") as recording:
+            self.assertEqual(len(recording.read().splitlines()), 3)
@@ -0,0 +1,281 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db.models.signals import post_save
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from domain_monitoring import signals
+from domain_monitoring.models import Company, MonitoredDomain, MonitoredDomainAlert, SSLCertificate
+from domain_monitoring.serializers import MonitoredDomainSerializer
+from domain_monitoring.services import monitoring
+from domain_monitoring.services.monitor_leases import (
+    LeaseHeartbeat,
+    claim_monitored_domains,
+    extend_monitored_domain_leases,
+    release_monitored_domain_leases,
+)
+from domain_monitoring.services.monitoring import (
+    DomainMonitoringData,
+    MonitoringResult,
+    _submit_fetch_stage,
+    _wait_for_fetch_stage,
+    apply_monitored_domain_update,
+    build_domain_changes,
+    build_existing_domain_data,
+    commit_monitoring_results,
+    get_ssl_certificate_window,
+    get_ssl_certificates_for_domain_and_company,
+    prefetch_ssl_certificates,
+)
+from domain_monitoring.services.scheduling import MAX_CHECK_INTERVAL_DAYS
+from scripts.utils import rate_limiter
+from scripts.utils.rate_limiter import ProviderLimit, ProviderRateLimitTimeout, provider_slot
+
+
+class MonitoringTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Creating a domain would otherwise start a monitoring thread.
+        post_save.disconnect(signals.trigger_monitoring_for_new_domain, sender=MonitoredDomain)
+
+    @classmethod
+    def tearDownClass(cls):
+        post_save.connect(signals.trigger_monitoring_for_new_domain, sender=MonitoredDomain)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(name="Example")
+        cls.today = timezone.now().date()
+
+
+class SSLCertificateWindowTests(MonitoringTestCase):
+    def add_certificate(self, cert_domain: str, created: date, watched_domain: str = "example.com"):
+        certificate = SSLCertificate.objects.create(
+            cert_index=SSLCertificate.objects.count(),
+            cert_domain=cert_domain,
+            watched_domain=watched_domain,
+            company=self.company,
+        )
+        SSLCertificate.objects.filter(pk=certificate.pk).update(created=created)
+
+    def test_window_covers_days_skipped_by_backoff(self):
+        today = date(2026, 3, 20)
+        self.assertEqual(get_ssl_certificate_window(None, today), (date(2026, 3, 19), date(2026, 3, 19)))
+        self.assertEqual(get_ssl_certificate_window(date(2026, 3, 4), today), (date(2026, 3, 4), date(2026, 3, 19)))
+        self.assertEqual(get_ssl_certificate_window(today, today), (date(2026, 3, 19), date(2026, 3, 19)))
+        self.assertEqual(
+            get_ssl_certificate_window(date(2025, 1, 1), today),
+            (today - timedelta(days=MAX_CHECK_INTERVAL_DAYS), date(2026, 3, 19)),
+        )
+
+    def test_reads_certificates_since_last_check(self):
+        last_checked = self.today - timedelta(days=8)
+        self.add_certificate("before.example.com", last_checked - timedelta(days=1))
+        self.add_certificate("first.example.com", last_checked)
+        self.add_certificate("middle.example.com", self.today - timedelta(days=4))
+        self.add_certificate("yesterday.example.com", self.today - timedelta(days=1))
+        self.add_certificate("today.example.com", self.today)
+        expected = ["first.example.com", "middle.example.com", "yesterday.example.com"]
+
+        self.assertCountEqual(
+            get_ssl_certificates_for_domain_and_company("example.com", self.company, last_checked), expected
+        )
+
+        backed_off = MonitoredDomain.objects.create(
+            value="example.com",
+            company=self.company,
+            last_checked=last_checked,
+        )
+        MonitoredDomain.objects.create(value="other.com", company=self.company, last_checked=self.today)
+        self.add_certificate("middle.other.com", self.today - timedelta(days=4), watched_domain="other.com")
+        self.add_certificate("yesterday.other.com", self.today - timedelta(days=1), watched_domain="other.com")
+
+        prefetched = prefetch_ssl_certificates(MonitoredDomain.objects.values_list("pk", flat=True))
+        self.assertCountEqual(prefetched[("example.com", backed_off.company_id)], expected)
+        self.assertEqual(prefetched[("other.com", self.company.pk)], ["yesterday.other.com"])
+
+
+class CommitMonitoringResultsTests(MonitoringTestCase):
+    def setUp(self):
+        self.domains = [
+            MonitoredDomain.objects.create(
+                value=f"domain{index}.com",
+                company=self.company,
+                subdomains=["www"],
+                last_checked=self.today - timedelta(days=1),
+            )
+            for index in range(3)
+        ]
+
+    def collect(self, monitored_domain: MonitoredDomain, subdomains: list[str]) -> MonitoringResult:
+        monitored_domain = MonitoredDomain.objects.get(pk=monitored_domain.pk)
+        expected_version = monitored_domain.version
+        data = DomainMonitoringData(
+            a_record=[],
+            mx_record=[],
+            spf_record="",
+            website_url="",
+            website_status_code="",
+            website_screenshot="",
+            website_screenshot_hash="",
+            subdomains=subdomains,
+            website_certificate=[],
+        )
+        changes = build_domain_changes(build_existing_domain_data(monitored_domain), data.as_dict())
+        alert_changes = apply_monitored_domain_update(monitored_domain, data, changes)
+        return MonitoringResult(monitored_domain, expected_version, alert_changes)
+
+    def test_commits_results_and_alerts_in_bulk(self):
+        results = [self.collect(domain, ["www", "mail"]) for domain in self.domains]
+        versions = {domain.pk: domain.version for domain in self.domains}
+
+        with self.assertNumQueries(4):
+            committed = commit_monitoring_results(results)
+
+        self.assertEqual(committed, {domain.pk for domain in self.domains})
+        for domain in MonitoredDomain.objects.filter(pk__in=committed):
+            self.assertEqual(domain.version, versions[domain.pk] + 1)
+            self.assertEqual(domain.last_checked, self.today)
+            self.assertEqual(domain.subdomains, ["www", "mail"])
+        alerts = MonitoredDomainAlert.objects.order_by("domain_name")
+        self.assertEqual([alert.domain_name for alert in alerts], [domain.value for domain in self.domains])
+        self.assertEqual(alerts[0].subdomains, ["www", "mail"])
+
+    def test_discards_results_for_domains_changed_since_they_were_read(self):
+        edited, deactivated, untouched = self.domains
+        results = [self.collect(domain, ["www", "mail"]) for domain in self.domains]
+
+        edited.spf_record = "v=spf1 -all"
+        edited.save()
+        MonitoredDomain.objects.filter(pk=deactivated.pk).update(status="inactive")
+
+        self.assertEqual(commit_monitoring_results(results), {untouched.pk})
+        edited.refresh_from_db()
+        self.assertEqual(edited.subdomains, ["www"])
+        self.assertEqual(edited.spf_record, "v=spf1 -all")
+        self.assertEqual(MonitoredDomain.objects.get(pk=deactivated.pk).subdomains, ["www"])
+        self.assertEqual(MonitoredDomain.objects.get(pk=untouched.pk).subdomains, ["www", "mail"])
+        self.assertEqual(list(MonitoredDomainAlert.objects.values_list("domain_name", flat=True)), [untouched.value])
+
+    def test_api_cannot_set_version(self):
+        domain = self.domains[0]
+        serializer = MonitoredDomainSerializer(domain, data={"version": 100}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+
+        domain.refresh_from_db()
+        self.assertEqual(domain.version, 2)
+
+
+class FetchStageTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        for patcher in (
+            mock.patch.object(monitoring, "get_fetch_stage_executor", return_value=executor),
+            mock.patch.dict(monitoring.FETCH_STAGE_TIMEOUTS, {"dns": 0.4, "subdomains": 0.4}),
+            mock.patch.dict(
+                rate_limiter.PROVIDER_LIMITS,
+                {"testprovider": ProviderLimit(requests_per_second=100, max_in_flight=1)},
+            ),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_timeout_starts_when_the_stage_runs(self):
+        def fetch(domain):
+            time.sleep(0.25)
+            return domain
+
+        # The queued stage finishes 0.5s after submission, within 0.4s of starting.
+        busy_stage = _submit_fetch_stage("subdomains", "busy.example.com", fetch)
+        queued_stage = _submit_fetch_stage("dns", "example.com", fetch)
+
+        self.assertEqual(_wait_for_fetch_stage(queued_stage), "example.com")
+        self.assertEqual(_wait_for_fetch_stage(busy_stage), "busy.example.com")
+
+    def test_stage_times_out_when_it_runs_too_long(self):
+        stage = _submit_fetch_stage("dns", "example.com", lambda domain: time.sleep(0.6))
+
+        with self.assertRaises(TimeoutError):
+            _wait_for_fetch_stage(stage)
+
+    def test_rate_limiter_wait_is_bounded_by_the_stage_budget(self):
+        def fetch(domain):
+            with provider_slot("testprovider"):
+                return domain
+
+        with provider_slot("testprovider"):
+            stage = _submit_fetch_stage("dns", "example.com", fetch)
+            started = time.monotonic()
+            with self.assertRaises(ProviderRateLimitTimeout):
+                stage.future.result(timeout=2)
+            self.assertLess(time.monotonic() - started, 1)
+
+
+class MonitorLeaseTests(MonitoringTestCase):
+    def setUp(self):
+        self.domains = [
+            MonitoredDomain.objects.create(value=f"lease{index}.com", company=self.company) for index in range(4)
+        ]
+
+    def get_lease(self, domain: MonitoredDomain) -> tuple[str, object]:
+        domain.refresh_from_db(fields=["lease_owner", "lease_expires_at"])
+        return domain.lease_owner, domain.lease_expires_at
+
+    def test_workers_claim_disjoint_batches(self):
+        due_domains = MonitoredDomain.objects.all()
+        first = claim_monitored_domains(due_domains, "worker-a", batch_size=3)
+        second = claim_monitored_domains(due_domains, "worker-b", batch_size=3)
+
+        self.assertEqual(first, [domain.pk for domain in self.domains[:3]])
+        self.assertEqual(second, [self.domains[3].pk])
+        self.assertEqual(claim_monitored_domains(due_domains, "worker-c"), [])
+        self.assertEqual(self.get_lease(self.domains[3])[0], "worker-b")
+
+    def test_expired_leases_are_claimed_again(self):
+        due_domains = MonitoredDomain.objects.filter(pk=self.domains[0].pk)
+        claim_monitored_domains(due_domains, "worker-a")
+        MonitoredDomain.objects.update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(claim_monitored_domains(due_domains, "worker-b"), [self.domains[0].pk])
+        self.assertEqual(self.get_lease(self.domains[0])[0], "worker-b")
+
+    def test_release_clears_the_lease_and_failures_wait_for_expiry(self):
+        due_domains = MonitoredDomain.objects.filter(pk__in=[self.domains[0].pk, self.domains[1].pk])
+        claim_monitored_domains(due_domains, "worker-a", lease_seconds=60)
+        release_monitored_domain_leases("worker-b", [self.domains[0].pk], succeeded=True)
+        self.assertEqual(self.get_lease(self.domains[0])[0], "worker-a")
+
+        release_monitored_domain_leases("worker-a", [self.domains[0].pk], succeeded=True)
+        release_monitored_domain_leases("worker-a", [self.domains[1].pk], succeeded=False)
+
+        self.assertEqual(self.get_lease(self.domains[0]), ("", None))
+        owner, expires_at = self.get_lease(self.domains[1])
+        self.assertEqual(owner, "")
+        self.assertGreater(expires_at, timezone.now())
+        self.assertEqual(claim_monitored_domains(due_domains, "worker-b"), [self.domains[0].pk])
+
+    def test_heartbeat_extends_only_the_workers_leases(self):
+        claim_monitored_domains(MonitoredDomain.objects.filter(pk=self.domains[0].pk), "worker-a", lease_seconds=1)
+        claim_monitored_domains(MonitoredDomain.objects.filter(pk=self.domains[1].pk), "worker-b", lease_seconds=1)
+        self.assertEqual(extend_monitored_domain_leases("worker-a", lease_seconds=600), 1)
+        self.assertGreater(self.get_lease(self.domains[0])[1], timezone.now() + timedelta(seconds=500))
+        self.assertLess(self.get_lease(self.domains[1])[1], timezone.now() + timedelta(seconds=2))
+
+        with (
+            mock.patch("domain_monitoring.services.monitor_leases.extend_monitored_domain_leases") as extend,
+            mock.patch("domain_monitoring.services.monitor_leases.connections"),
+            LeaseHeartbeat("worker-a", lease_seconds=3),
+        ):
+            deadline = time.monotonic() + 5
+            while not extend.called and time.monotonic() < deadline:
+                time.sleep(0.05)
+        extend.assert_called_with("worker-a", 3)
@@ -0,0 +1,74 @@
+import pathlib
+import tempfile
+from unittest import mock
+
+import cv2
+import numpy as np
+from django.test import SimpleTestCase
+
+from domain_monitoring.services import screenshot_compare, screenshot_features, screenshot_storage
+from domain_monitoring.services.screenshot_compare import are_screenshots_similar
+from domain_monitoring.services.screenshot_storage import save_screenshot_bytes
+
+
+def render_page(lines: list[str]) -> np.ndarray:
+    image = np.full((720, 1280, 3), 255, np.uint8)
+    cv2.rectangle(image, (0, 0), (1280, 70), (40, 90, 160), -1)
+    for index, line in enumerate(lines):
+        cv2.putText(image, line, (30, 110 + index * 26), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (30, 30, 30), 1, cv2.LINE_AA)
+    return image
+
+
+class ScreenshotSimilarityTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        for module in (screenshot_storage, screenshot_features, screenshot_compare):
+            patcher = mock.patch.object(module, "SCREENSHOT_DIRECTORY", pathlib.Path(directory.name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.lines = [f"line {index} of the parked page with some filler words" for index in range(20)]
+
+    def save(self, image: np.ndarray) -> str:
+        _, encoded = cv2.imencode(".png", image)
+        filename, _ = save_screenshot_bytes(encoded.tobytes())
+        return filename
+
+    def compare(self, image1: np.ndarray, image2: np.ndarray) -> tuple[bool, bool]:
+        """Whether the screenshots are similar and whether full resolution was needed to decide."""
+        filename1, filename2 = self.save(image1), self.save(image2)
+        with mock.patch.object(
+            screenshot_compare,
+            "_get_full_resolution_similarity",
+            wraps=screenshot_compare._get_full_resolution_similarity,
+        ) as full_resolution:
+            similar = are_screenshots_similar(filename1, filename2)
+        return similar, full_resolution.called
+
+    def test_clearly_similar_and_clearly_different_use_thumbnails(self):
+        page = render_page(self.lines)
+        self.assertEqual(self.compare(page, page.copy()), (True, False))
+
+        unrelated = np.full_like(page, 255)
+        cv2.rectangle(unrelated, (200, 200), (1000, 600), (0, 0, 0), -1)
+        self.assertEqual(self.compare(page, unrelated), (False, False))
+
+    def test_borderline_thumbnail_score_is_decided_at_full_resolution(self):
+        edited_lines = [*self.lines]
+        edited_lines[3:11] = ["this paragraph was rewritten with entirely new words"] * 8
+        page, edited = render_page(self.lines), render_page(edited_lines)
+        thumbnail_similarity = screenshot_compare._get_image_similarity(
+            screenshot_features.compute_image_features(page).thumbnail,
+            screenshot_features.compute_image_features(edited).thumbnail,
+        )
+        full_similarity = screenshot_compare._get_image_similarity(
+            cv2.cvtColor(page, cv2.COLOR_BGR2GRAY),
+            cv2.cvtColor(edited, cv2.COLOR_BGR2GRAY),
+        )
+        recheck_low, recheck_high = screenshot_compare.THUMBNAIL_SSIM_RECHECK_BAND
+        # The thumbnails alone would pass the full-resolution threshold; the full images do not.
+        self.assertTrue(recheck_low <= thumbnail_similarity < recheck_high, thumbnail_similarity)
+        self.assertGreaterEqual(thumbnail_similarity, screenshot_compare.SSIM_THRESHOLD)
+        self.assertLess(full_similarity, screenshot_compare.SSIM_THRESHOLD)
+
+        self.assertEqual(self.compare(page, edited), (False, True))
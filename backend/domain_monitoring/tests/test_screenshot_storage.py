@@ -0,0 +1,85 @@
+import os
+import pathlib
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db.models.signals import post_save
+from django.test import TestCase
+
+from domain_monitoring import signals
+from domain_monitoring.models import Company, MonitoredDomain
+from domain_monitoring.services import screenshot_features, screenshot_storage
+from domain_monitoring.services.screenshot_storage import collect_orphan_screenshots, save_screenshot_bytes
+
+DAY_SECONDS = 24 * 60 * 60
+
+
+class ScreenshotStorageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        post_save.disconnect(signals.trigger_monitoring_for_new_domain, sender=MonitoredDomain)
+
+    @classmethod
+    def tearDownClass(cls):
+        post_save.connect(signals.trigger_monitoring_for_new_domain, sender=MonitoredDomain)
+        super().tearDownClass()
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = pathlib.Path(directory.name)
+        for module in (screenshot_storage, screenshot_features):
+            patcher = mock.patch.object(module, "SCREENSHOT_DIRECTORY", self.directory)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def save(self, content: bytes, age_seconds: float = 0) -> pathlib.Path:
+        filename, _ = save_screenshot_bytes(content)
+        filepath = self.directory / filename
+        if age_seconds:
+            modified = time.time() - age_seconds
+            os.utime(filepath, (modified, modified))
+        return filepath
+
+    def test_dedup_hit_refreshes_modification_time(self):
+        filepath = self.save(b"screenshot", age_seconds=2 * DAY_SECONDS)
+
+        self.assertEqual(self.save(b"screenshot"), filepath)
+
+        self.assertGreater(filepath.stat().st_mtime, time.time() - 60)
+        self.assertEqual(collect_orphan_screenshots(), 0)
+        self.assertTrue(filepath.exists())
+
+    def test_collects_only_old_unreferenced_screenshots(self):
+        company = Company.objects.create(name="Example")
+        referenced = self.save(b"referenced", age_seconds=2 * DAY_SECONDS)
+        orphan = self.save(b"orphan", age_seconds=2 * DAY_SECONDS)
+        recent = self.save(b"recent")
+        MonitoredDomain.objects.create(
+            value="example.com",
+            company=company,
+            website_screenshot=referenced.relative_to(self.directory).as_posix(),
+        )
+
+        self.assertEqual(collect_orphan_screenshots(dry_run=True), 1)
+        self.assertTrue(orphan.exists())
+
+        self.assertEqual(collect_orphan_screenshots(), 1)
+        self.assertFalse(orphan.exists())
+        self.assertTrue(referenced.exists())
+        self.assertTrue(recent.exists())
+
+    def test_purge_command(self):
+        orphan = self.save(b"orphan", age_seconds=2 * 60 * 60)
+        stdout = StringIO()
+
+        call_command("purge_orphan_screenshots", stdout=stdout)
+        self.assertTrue(orphan.exists())
+
+        call_command("purge_orphan_screenshots", "--min-age-hours", "1", stdout=stdout)
+        self.assertFalse(orphan.exists())
+        self.assertIn("Deleted 1 unreferenced screenshot(s).", stdout.getvalue())
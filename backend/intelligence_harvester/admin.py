@@ -5,6 +5,7 @@ from .models import Source
 class SourceAdmin(admin.ModelAdmin):
     list_display = (
         "created",
+        "expires_at",
         "value",
         "value_type",
         "hashed_value",
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class IntelligenceHarvesterConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "intelligence_harvester"
+
+    def ready(self):
+        from scripts.utils.rate_limiter import warn_if_limits_are_process_local
+
+        warn_if_limits_are_process_local()
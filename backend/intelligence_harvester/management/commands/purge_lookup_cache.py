@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from intelligence_harvester.services.lookup_coalescing import purge_expired_claims
+from intelligence_harvester.services.lookups import PURGE_BATCH_SIZE, purge_expired_lookup_cache
+
+
+class Command(BaseCommand):
+    help = "Delete expired Intelligence Harvester lookup cache rows in bounded batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=PURGE_BATCH_SIZE,
+            help="Rows deleted per statement.",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=None,
+            help="Stop after this many batches; the next run continues with the oldest expired rows.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        deleted_count = purge_expired_lookup_cache(batch_size=batch_size, max_batches=options["max_batches"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted_count} expired lookup cache row(s)."))
+
+        deleted_claims = purge_expired_claims()
+        if deleted_claims:
+            self.stdout.write(f"Deleted {deleted_claims} expired coalesced lookup claim(s).")
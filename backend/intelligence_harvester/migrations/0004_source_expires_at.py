@@ -0,0 +1,32 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:40
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def backfill_expires_at(apps, schema_editor):
+    """Existing rows expire as they would have under the previous fixed 8-hour cache timeout."""
+    Source = apps.get_model('intelligence_harvester', 'Source')
+    Source.objects.update(expires_at=models.F('created') + timedelta(minutes=480))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('intelligence_harvester', '0003_migrate_existing_json_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='source',
+            name='expires_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(backfill_expires_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='source',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-19 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('intelligence_harvester', '0004_source_expires_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LookupInFlight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255)),
+                ('token', models.CharField(max_length=32, unique=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('published', models.BooleanField(default=False)),
+                ('result', models.JSONField(null=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('published', False)), fields=('key',), name='unique_unpublished_lookup_in_flight')],
+            },
+        ),
+    ]
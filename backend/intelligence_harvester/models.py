@@ -15,6 +15,8 @@ class Source(models.Model):
     ]
 
     created = models.DateTimeField(auto_now_add=True)
+    # When the row can no longer be served, even stale; expired rows are removed by purge_lookup_cache.
+    expires_at = models.DateTimeField(db_index=True)
     value = models.TextField(max_length=1000)
     value_type = models.CharField(max_length=255, choices=VALUE_TYPE_CHOICES)
     hashed_value = models.CharField(max_length=255)
@@ -24,3 +26,23 @@ class Source(models.Model):
 
     class Meta:
         unique_together = ("hashed_value", "source")
+
+
+class LookupInFlight(models.Model):
+    """A provider call claimed by one process for coalescing, and its result once published."""
+
+    key = models.CharField(max_length=255)
+    token = models.CharField(max_length=32, unique=True)
+    # Until then the claim holds, or once published the result stays readable for waiting callers.
+    expires_at = models.DateTimeField(db_index=True)
+    published = models.BooleanField(default=False)
+    result = models.JSONField(null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["key"],
+                condition=models.Q(published=False),
+                name="unique_unpublished_lookup_in_flight",
+            )
+        ]
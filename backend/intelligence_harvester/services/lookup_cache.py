@@ -0,0 +1,171 @@
+"""
+In-process and shared cache tiers in front of the Source table.
+
+Entries carry the wall-clock times their Source row turns stale and expires, so every tier
+ages a lookup exactly as the table would. The memory tier is per process and bounded by the
+approximate JSON size of its payloads; the shared tier uses Django's default cache and is
+only consulted when HARVESTER_SHARED_CACHE is enabled.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+MEMORY_CACHE_MAX_BYTES = int(os.getenv("HARVESTER_MEMORY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+SHARED_CACHE_ENABLED = os.getenv("HARVESTER_SHARED_CACHE", "False").lower() in ("true", "1", "yes")
+SHARED_CACHE_KEY_PREFIX = "harvester:lookup:v2"
+
+CacheKey = tuple[str, str]
+
+
+@dataclass(frozen=True)
+class CachedLookup:
+    data: dict
+    # Epoch seconds when the provider was called, after which the entry is served stale while
+    # it is refreshed, and after which it is not served at all.
+    cached_at: float
+    fresh_until: float
+    stale_until: float
+
+    @property
+    def is_stale(self) -> bool:
+        return time.time() >= self.fresh_until
+
+
+def _estimate_size(data: dict) -> int:
+    try:
+        return len(json.dumps(data, separators=(",", ":"), default=str))
+    except (TypeError, ValueError):
+        return MEMORY_CACHE_MAX_BYTES
+
+
+class LookupMemoryCache:
+    """Thread-safe LRU of lookup responses evicted by approximate payload bytes and expiry time."""
+
+    def __init__(self, max_bytes: int = MEMORY_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[CacheKey, tuple[int, CachedLookup]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, cache_key: CacheKey) -> CachedLookup | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                return None
+            size, cached = entry
+            if cached.stale_until <= now:
+                del self._entries[cache_key]
+                self._size -= size
+                return None
+            self._entries.move_to_end(cache_key)
+            return cached
+
+    def set(self, cache_key: CacheKey, cached: CachedLookup) -> None:
+        size = _estimate_size(cached.data)
+        # A payload that would take most of the budget would only evict everything else.
+        if self.max_bytes <= 0 or size > self.max_bytes // 4 or cached.stale_until <= time.time():
+            self.delete(cache_key)
+            return
+        with self._lock:
+            previous = self._entries.pop(cache_key, None)
+            if previous is not None:
+                self._size -= previous[0]
+            self._entries[cache_key] = (size, cached)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (evicted_size, _) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def delete(self, cache_key: CacheKey) -> None:
+        with self._lock:
+            entry = self._entries.pop(cache_key, None)
+            if entry is not None:
+                self._size -= entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+memory_cache = LookupMemoryCache()
+
+
+def _get_shared_cache_key(cache_key: CacheKey) -> str:
+    hashed_value, cache_source = cache_key
+    return f"{SHARED_CACHE_KEY_PREFIX}:{cache_source}:{hashed_value}"
+
+
+def get_many(cache_keys: set[CacheKey]) -> dict[CacheKey, CachedLookup]:
+    """Entries found in the memory tier, then the shared tier; shared hits are promoted to memory."""
+    found = {}
+    for cache_key in cache_keys:
+        cached = memory_cache.get(cache_key)
+        if cached is not None:
+            found[cache_key] = cached
+
+    missing = cache_keys - found.keys()
+    if not SHARED_CACHE_ENABLED or not missing:
+        return found
+
+    shared_keys = {_get_shared_cache_key(cache_key): cache_key for cache_key in missing}
+    try:
+        shared_entries = cache.get_many(list(shared_keys))
+    except Exception as exc:
+        logger.warning(f"Error reading shared lookup cache: {exc}")
+        return found
+
+    now = time.time()
+    for shared_key, (cached_at, fresh_until, stale_until, data) in shared_entries.items():
+        if stale_until <= now:
+            continue
+        cache_key = shared_keys[shared_key]
+        cached = CachedLookup(data=data, cached_at=cached_at, fresh_until=fresh_until, stale_until=stale_until)
+        memory_cache.set(cache_key, cached)
+        found[cache_key] = cached
+    return found
+
+
+def set_many(entries: dict[CacheKey, CachedLookup]) -> None:
+    """Store entries in every enabled tier."""
+    for cache_key, cached in entries.items():
+        memory_cache.set(cache_key, cached)
+
+    if not SHARED_CACHE_ENABLED or not entries:
+        return
+
+    # Entries share one timeout; get_many() skips any entry past its own expiry.
+    timeout = int(max(cached.stale_until for cached in entries.values()) - time.time())
+    if timeout <= 0:
+        return
+    try:
+        cache.set_many(
+            {
+                _get_shared_cache_key(cache_key): (
+                    cached.cached_at,
+                    cached.fresh_until,
+                    cached.stale_until,
+                    cached.data,
+                )
+                for cache_key, cached in entries.items()
+            },
+            timeout=timeout,
+        )
+    except Exception as exc:
+        logger.warning(f"Error writing shared lookup cache: {exc}")
@@ -0,0 +1,170 @@
+"""
+Single-flight execution of identical provider lookups.
+
+Within a process, concurrent callers with the same key share one Future. Across processes,
+the first caller claims the key with a LookupInFlight row holding a token for its call and
+publishes its result on that row, and callers in other processes poll the row of the call
+they found in flight instead of calling the provider. The claim relies on a unique
+constraint over unpublished rows, so it holds across gunicorn workers and hosts sharing the
+database whatever CACHE_BACKEND is. A result published by an earlier call is never returned.
+"""
+import logging
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from django.db import IntegrityError, transaction
+
+from intelligence_harvester.models import LookupInFlight
+
+logger = logging.getLogger(__name__)
+
+# How long a published result stays readable for callers still polling for it.
+RESULT_TTL_SECONDS = 60
+POLL_INTERVAL_SECONDS = 0.2
+
+_in_flight: dict[str, Future] = {}
+_in_flight_lock = threading.Lock()
+_missing = object()
+
+
+def _wait_for_published_result(key: str, deadline: float) -> tuple[bool, Any]:
+    """
+    Poll for the result of the call in flight when polling started, until it is published,
+    that call's claim disappears or expires, or the deadline passes.
+    """
+    try:
+        token = (
+            LookupInFlight.objects.filter(key=key, published=False, expires_at__gt=datetime.now(timezone.utc))
+            .values_list("token", flat=True)
+            .first()
+        )
+    except Exception as exc:
+        logger.warning(f"Error polling coalesced lookup {key}: {exc}")
+        return False, None
+    if token is None:
+        return False, None
+
+    while time.monotonic() < deadline:
+        try:
+            claim = LookupInFlight.objects.filter(token=token).values("published", "result", "expires_at").first()
+        except Exception as exc:
+            logger.warning(f"Error polling coalesced lookup {key}: {exc}")
+            return False, None
+        if claim is None:
+            # The call ended without a result worth sharing.
+            return False, None
+        if claim["published"]:
+            return True, claim["result"]
+        if claim["expires_at"] <= datetime.now(timezone.utc):
+            # The process making the call died or overran its timeout.
+            return False, None
+        time.sleep(POLL_INTERVAL_SECONDS)
+    return False, None
+
+
+def _claim(key: str, token: str, timeout: float) -> bool:
+    now = datetime.now(timezone.utc)
+    # Claims left by dead processes and results nobody is waiting for anymore.
+    LookupInFlight.objects.filter(key=key, expires_at__lte=now).delete()
+    try:
+        with transaction.atomic():
+            LookupInFlight.objects.create(key=key, token=token, expires_at=now + timedelta(seconds=timeout + 1))
+    except IntegrityError:
+        return False
+    return True
+
+
+def _release(key: str, token: str, result: Any, publish: bool) -> None:
+    claims = LookupInFlight.objects.filter(token=token)
+    try:
+        if publish:
+            try:
+                with transaction.atomic():
+                    claims.update(
+                        published=True,
+                        result=result,
+                        expires_at=datetime.now(timezone.utc) + timedelta(seconds=RESULT_TTL_SECONDS),
+                    )
+                return
+            except Exception as exc:
+                logger.warning(f"Error publishing coalesced lookup {key}: {exc}")
+        # Callers waiting on this claim see it disappear and call the provider themselves.
+        claims.delete()
+    except Exception as exc:
+        logger.warning(f"Error releasing coalesced lookup {key}: {exc}")
+
+
+def _run_across_processes(
+    key: str,
+    func: Callable[[], Any],
+    timeout: float,
+    should_publish: Callable[[Any], bool],
+) -> tuple[Any, bool]:
+    token = uuid.uuid4().hex
+    try:
+        claimed = _claim(key, token, timeout)
+    except Exception as exc:
+        logger.warning(f"Error claiming coalesced lookup {key}: {exc}")
+        claimed = False
+    else:
+        if not claimed:
+            published, result = _wait_for_published_result(key, time.monotonic() + timeout)
+            if published:
+                logger.debug(f"Reused result of concurrent lookup {key} from another process")
+                return result, False
+
+    result = _missing
+    try:
+        result = func()
+        return result, True
+    finally:
+        if claimed:
+            _release(key, token, result, result is not _missing and should_publish(result))
+
+
+def purge_expired_claims() -> int:
+    """Delete claims and published results that expired without the same key being looked up again."""
+    deleted, _ = LookupInFlight.objects.filter(expires_at__lte=datetime.now(timezone.utc)).delete()
+    return deleted
+
+
+def coalesce(
+    key: str,
+    func: Callable[[], Any],
+    timeout: float,
+    should_publish: Callable[[Any], bool] = lambda result: True,
+) -> tuple[Any, bool]:
+    """
+    Run `func` once for all concurrent callers with the same key.
+
+    Returns the result and whether this caller ran `func` itself. Callers waiting on another
+    caller raise TimeoutError after `timeout` seconds. Only results for which
+    `should_publish` is true are shared with other processes, which otherwise run `func`
+    themselves; shared results must be JSON-serializable and reach them as decoded JSON.
+    """
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _in_flight[key] = future
+
+    if not leader:
+        logger.debug(f"Waiting on in-flight lookup {key}")
+        return future.result(timeout=timeout), False
+
+    try:
+        result, ran = _run_across_processes(key, func, timeout, should_publish)
+        future.set_result(result)
+        return result, ran
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    finally:
+        with _in_flight_lock:
+            _in_flight.pop(key, None)
@@ -1,15 +1,28 @@
+import functools
 import logging
-from datetime import datetime, timezone
-
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from django.core.cache import cache
+from django.db import connections
 from django.utils.timezone import make_aware
 
 from intelligence_harvester.models import Source
 from scripts.aggregators import reputation
 from scripts.field_schema import categorize_fields
 from scripts.provider_config import LOOKUP_MODULES
+from scripts.providers.builtin_dns import prefetch_dns_records
 from scripts.utils.hashing import generate_sha256_hash
 from scripts.utils.identifier import get_indicator_type
+from scripts.utils.rate_limiter import get_provider_limit, provider_slot_deadline
 
+from . import lookup_cache, lookup_coalescing
 from .providers import is_lookup_applicable, is_provider_applicable
 
 
@@ -18,6 +31,97 @@ logger = logging.getLogger(__name__)
 # Cache timeout in minutes (8 hours)
 CACHE_TIMEOUT_MINUTES = 480
 
+# Fresh lifetime in minutes per lookup type, or per "<lookup_type>_<provider>" cache source;
+# anything not listed uses CACHE_TIMEOUT_MINUTES. HARVESTER_CACHE_TTLS overrides entries,
+# e.g. "reputation=30,whois_builtin_whois=720".
+DEFAULT_CACHE_TTL_MINUTES = {
+    "reputation": 60,
+    "web_scan": 60,
+    "screenshot": 60,
+    "web_redirects": 120,
+    "dns": 240,
+    "reverse_dns": 240,
+    "passive_dns": 720,
+    "subdomains": 1440,
+    "ip_info": 1440,
+    "whois": 1440,
+    "email_validator": 1440,
+    "whois_history": 10080,
+    "cve_details": 10080,
+}
+# Entries past their TTL are still served for this long while a background refresh runs,
+# keyed like DEFAULT_CACHE_TTL_MINUTES; anything not listed uses CACHE_STALE_MINUTES.
+# Fast-moving data such as reputation is not served long after it was fetched.
+# HARVESTER_CACHE_STALE_TTLS overrides entries in the same format as HARVESTER_CACHE_TTLS.
+DEFAULT_CACHE_STALE_MINUTES = {
+    "reputation": 360,
+    "web_scan": 360,
+    "screenshot": 1440,
+    "web_redirects": 1440,
+    "dns": 1440,
+    "reverse_dns": 1440,
+    "passive_dns": 4320,
+    "subdomains": 10080,
+    "ip_info": 10080,
+    "whois": 10080,
+    "email_validator": 10080,
+    "whois_history": 43200,
+    "cve_details": 43200,
+}
+CACHE_STALE_MINUTES = int(os.getenv("HARVESTER_CACHE_STALE_MINUTES", "1440"))
+REVALIDATION_MAX_WORKERS = int(os.getenv("HARVESTER_REVALIDATION_WORKERS", "4"))
+# A failed refresh is not retried for this long; the stale entry keeps being served meanwhile.
+REVALIDATION_RETRY_SECONDS = 300
+REVALIDATION_LOCK_PREFIX = "harvester:revalidate"
+PURGE_BATCH_SIZE = 5000
+
+# Batch lookups fan out over a shared thread pool. Each provider (or lookup type, for "auto"
+# lookups) gets at most its rate limiter in-flight budget, or LOOKUP_PROVIDER_CONCURRENCY,
+# across all batches in the process, and whatever has not finished by the deadline is
+# reported as timed out.
+LOOKUP_MAX_WORKERS = int(os.getenv("HARVESTER_LOOKUP_WORKERS", "16"))
+LOOKUP_PROVIDER_CONCURRENCY = int(os.getenv("HARVESTER_PROVIDER_CONCURRENCY", "4"))
+LOOKUP_DEADLINE_SECONDS = float(os.getenv("HARVESTER_LOOKUP_DEADLINE_SECONDS", "90"))
+LOOKUP_TIMEOUT_ERROR = "Lookup timed out"
+
+_lookup_executor: ThreadPoolExecutor | None = None
+_lookup_executor_lock = threading.Lock()
+_revalidation_executor: ThreadPoolExecutor | None = None
+_revalidation_executor_lock = threading.Lock()
+
+
+def _parse_ttl_overrides(env_name: str) -> dict[str, int]:
+    overrides = {}
+    for item in os.getenv(env_name, "").split(","):
+        if not item.strip():
+            continue
+        try:
+            cache_source, minutes = item.split("=", 1)
+            overrides[cache_source.strip()] = int(minutes)
+        except ValueError:
+            logger.warning(f"Ignoring invalid {env_name} entry: {item}")
+    return overrides
+
+
+CACHE_TTL_MINUTES = {**DEFAULT_CACHE_TTL_MINUTES, **_parse_ttl_overrides("HARVESTER_CACHE_TTLS")}
+CACHE_STALE_TTL_MINUTES = {**DEFAULT_CACHE_STALE_MINUTES, **_parse_ttl_overrides("HARVESTER_CACHE_STALE_TTLS")}
+
+
+@dataclass(frozen=True)
+class LookupTask:
+    lookup_type: str
+    indicator_value: str
+    indicator_type: str
+    provider: str | None
+
+    @property
+    def concurrency_key(self) -> str:
+        return self.provider or f"{self.lookup_type}_auto"
+
+    @property
+    def cache_key(self) -> tuple[str, str]:
+        return get_lookup_cache_key(self.lookup_type, self.indicator_value, self.provider)
+
 
 def is_cacheable_lookup_error(error_message: str | None) -> bool:
     if not error_message:
@@ -43,46 +147,151 @@ def _build_lookup_error(lookup_type: str, provider: str | None, error_message: s
     }
 
 
-def _get_cached_lookup_response(hashed_value: str, cache_source: str):
-    cached_entry = Source.objects.filter(
-        hashed_value=hashed_value,
-        source=cache_source,
-    ).first()
-    if not cached_entry:
-        return None
+def get_lookup_cache_key(lookup_type: str, indicator_value: str, provider: str | None) -> tuple[str, str]:
+    """(hashed_value, source) of the Source row caching a lookup."""
+    return generate_sha256_hash(indicator_value.lower()), f"{lookup_type}_{provider or 'auto'}"
 
-    entry_created = cached_entry.created
-    if entry_created.tzinfo is None:
-        entry_created = make_aware(entry_created, timezone=timezone.utc)
 
-    timestamp_now = datetime.now(timezone.utc)
-    time_elapsed = (timestamp_now - entry_created).total_seconds() // 60
+def _get_minutes_for_source(minutes_by_source: dict[str, int], cache_source: str, default: int) -> int:
+    """A cache source's own entry, else the longest lookup type it starts with, else the default."""
+    matches = [
+        key for key in minutes_by_source if cache_source == key or cache_source.startswith(f"{key}_")
+    ]
+    if not matches:
+        return default
+    return minutes_by_source[max(matches, key=len)]
 
-    if time_elapsed < CACHE_TIMEOUT_MINUTES:
-        return cached_entry.data
 
-    cached_entry.delete()
-    return None
+@functools.cache
+def get_cache_ttl_minutes(cache_source: str) -> int:
+    return _get_minutes_for_source(CACHE_TTL_MINUTES, cache_source, CACHE_TIMEOUT_MINUTES)
 
 
-def _cache_lookup_response(
-    hashed_value: str,
+@functools.cache
+def get_cache_stale_minutes(cache_source: str) -> int:
+    return _get_minutes_for_source(CACHE_STALE_TTL_MINUTES, cache_source, CACHE_STALE_MINUTES)
+
+
+def _as_utc(created: datetime) -> datetime:
+    return make_aware(created, timezone=timezone.utc) if created.tzinfo is None else created
+
+
+def _get_fresh_until(cache_source: str, created: datetime) -> datetime:
+    return _as_utc(created) + timedelta(minutes=get_cache_ttl_minutes(cache_source))
+
+
+def _get_expires_at(cache_source: str, created: datetime) -> datetime:
+    return _get_fresh_until(cache_source, created) + timedelta(minutes=get_cache_stale_minutes(cache_source))
+
+
+def _build_cached_lookup(
     cache_source: str,
-    normalized_value: str,
-    indicator_type: str,
-    response: dict,
-    log_message: str,
-):
-    Source.objects.update_or_create(
-        hashed_value=hashed_value,
-        source=cache_source,
-        defaults={
-            "value": normalized_value,
-            "value_type": indicator_type,
-            "data": response,
-        },
+    created: datetime,
+    expires_at: datetime,
+    data: dict,
+) -> lookup_cache.CachedLookup:
+    return lookup_cache.CachedLookup(
+        data=data,
+        cached_at=_as_utc(created).timestamp(),
+        fresh_until=_get_fresh_until(cache_source, created).timestamp(),
+        stale_until=expires_at.timestamp(),
     )
-    logger.debug(log_message)
+
+
+def _serve_cached_lookup(cached: lookup_cache.CachedLookup) -> dict:
+    """A cached response marked with when its provider was called and whether it is being refreshed."""
+    return {
+        **cached.data,
+        "_cached_at": datetime.fromtimestamp(cached.cached_at, timezone.utc).isoformat(),
+        "_stale": cached.is_stale,
+    }
+
+
+def get_cached_lookup_responses(
+    cache_keys: set[tuple[str, str]],
+) -> dict[tuple[str, str], lookup_cache.CachedLookup]:
+    """
+    Servable cached responses, fresh or stale, for a batch of (hashed_value, source) keys.
+
+    The in-process and shared tiers are checked first; remaining keys are read from the
+    Source table in one query and promoted to the faster tiers.
+    """
+    if not cache_keys:
+        return {}
+
+    cached_responses = lookup_cache.get_many(cache_keys)
+    missing = cache_keys - cached_responses.keys()
+    if not missing:
+        return cached_responses
+
+    # hashed_value IN (...) AND source IN (...) selects a superset of the requested pairs;
+    # the extra rows are dropped below.
+    cached_entries = Source.objects.filter(
+        hashed_value__in={hashed_value for hashed_value, _ in missing},
+        source__in={cache_source for _, cache_source in missing},
+        expires_at__gt=datetime.now(timezone.utc),
+    ).values_list("hashed_value", "source", "created", "expires_at", "data")
+    tier_entries = {}
+    for hashed_value, cache_source, created, expires_at, data in cached_entries:
+        cache_key = (hashed_value, cache_source)
+        if cache_key in missing:
+            cached = _build_cached_lookup(cache_source, created, expires_at, data)
+            cached_responses[cache_key] = cached
+            tier_entries[cache_key] = cached
+    lookup_cache.set_many(tier_entries)
+    return cached_responses
+
+
+def cache_lookup_responses(entries: list[tuple[LookupTask, dict]]) -> None:
+    """Write back a batch of lookup responses with one upsert; rewritten rows get a fresh created time."""
+    if not entries:
+        return
+
+    now = datetime.now(timezone.utc)
+    sources = {}
+    for task, response in entries:
+        hashed_value, cache_source = task.cache_key
+        sources[task.cache_key] = Source(
+            created=now,
+            expires_at=_get_expires_at(cache_source, now),
+            value=task.indicator_value.lower(),
+            value_type=task.indicator_type,
+            hashed_value=hashed_value,
+            source=cache_source,
+            data=response,
+        )
+    Source.objects.bulk_create(
+        list(sources.values()),
+        update_conflicts=True,
+        unique_fields=["hashed_value", "source"],
+        update_fields=["created", "expires_at", "value", "value_type", "data"],
+    )
+    lookup_cache.set_many(
+        {
+            cache_key: _build_cached_lookup(source.source, now, source.expires_at, source.data)
+            for cache_key, source in sources.items()
+        }
+    )
+    logger.debug(f"Cached {len(sources)} lookup result(s)")
+
+
+def purge_expired_lookup_cache(batch_size: int = PURGE_BATCH_SIZE, max_batches: int | None = None) -> int:
+    """Delete Source rows past expires_at in primary-key batches so no single delete holds locks for long."""
+    deleted_count = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        expired_ids = list(
+            Source.objects.filter(expires_at__lte=datetime.now(timezone.utc))
+            .order_by("expires_at")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not expired_ids:
+            break
+        deleted, _ = Source.objects.filter(pk__in=expired_ids).delete()
+        deleted_count += deleted
+        batches += 1
+        logger.debug(f"Purged {deleted} expired lookup cache row(s)")
+    return deleted_count
 
 
 def _run_lookup(lookup_type: str, indicator_value: str, indicator_type: str, provider: str | None):
@@ -102,37 +311,14 @@ def _run_lookup(lookup_type: str, indicator_value: str, indicator_type: str, pro
     return module.get(indicator_value, provider=provider)
 
 
-def execute_lookup(
+def _fetch_lookup(
     lookup_type: str,
     indicator_value: str,
     indicator_type: str,
-    provider=None,
-    force_refresh: bool = False,
-) -> dict:
-    """Execute a single lookup with cache support and normalized response shape."""
+    provider: str | None,
+) -> tuple[dict, bool]:
+    """Run a lookup against its provider; returns the normalized response and whether it may be cached."""
     try:
-        logger.debug(
-            f"Executing lookup: type={lookup_type}, provider={provider}, indicator_type={indicator_type}"
-        )
-
-        normalized_value = indicator_value.lower()
-        hashed_value = generate_sha256_hash(normalized_value)
-        cache_source = f"{lookup_type}_{provider or 'auto'}"
-
-        if not force_refresh:
-            try:
-                cached_data = _get_cached_lookup_response(hashed_value, cache_source)
-                if cached_data is not None:
-                    logger.debug(f"Cache hit for {lookup_type}/{provider} on {indicator_value}")
-                    return cached_data
-            except Exception as cache_error:
-                logger.warning(f"Error checking cache: {cache_error}")
-        else:
-            logger.debug(f"Force refresh enabled for {lookup_type}/{provider} on {indicator_value}")
-
-        logger.debug(
-            f"Cache miss for {lookup_type}/{provider} on {indicator_value}, performing fresh lookup"
-        )
         result = _run_lookup(lookup_type, indicator_value, indicator_type, provider)
 
         if not isinstance(result, dict):
@@ -152,42 +338,77 @@ def execute_lookup(
                 logger.warning(f"Lookup error for {lookup_type}/{provider}: {error_message}")
 
             response = _build_lookup_error(lookup_type, provider, result["error"])
+            return response, is_cacheable_lookup_error(error_message)
+
+        logger.debug(f"Lookup completed successfully: {lookup_type}/{provider}")
+        return _build_lookup_response(lookup_type, provider, result), True
+
+    except Exception as exc:
+        logger.error(f"Error in lookup {lookup_type}/{provider}: {exc}", exc_info=True)
+        return _build_lookup_error(lookup_type, provider, str(exc)), False
 
-            if is_cacheable_lookup_error(error_message):
-                try:
-                    _cache_lookup_response(
-                        hashed_value=hashed_value,
-                        cache_source=cache_source,
-                        normalized_value=normalized_value,
-                        indicator_type=indicator_type,
-                        response=response,
-                        log_message=f"Cached no-data result for {lookup_type}/{provider} on {indicator_value}",
-                    )
-                except Exception as cache_error:
-                    logger.warning(f"Error storing cache: {cache_error}")
 
-            return response
+def _fetch_lookup_coalesced(task: LookupTask, timeout: float = LOOKUP_DEADLINE_SECONDS) -> tuple[dict, bool]:
+    """
+    Fetch a lookup, sharing one provider call among concurrent callers for the same lookup.
+
+    Only the caller that made the call reports the response as cacheable, so the others do
+    not write the same row again. Responses that may not be cached, such as provider errors,
+    are not shared with other processes either; their callers retry the provider.
+    """
+    hashed_value, cache_source = task.cache_key
+    try:
+        (response, cacheable), ran = lookup_coalescing.coalesce(
+            f"{cache_source}:{hashed_value}",
+            lambda: _fetch_lookup(task.lookup_type, task.indicator_value, task.indicator_type, task.provider),
+            timeout=timeout,
+            should_publish=lambda fetched: fetched[1],
+        )
+    except TimeoutError:
+        logger.warning(f"Timed out waiting on concurrent {task.lookup_type}/{task.provider} lookup")
+        return _build_lookup_error(task.lookup_type, task.provider, LOOKUP_TIMEOUT_ERROR), False
+    return response, cacheable and ran
 
-        response = _build_lookup_response(lookup_type, provider, result)
 
+def execute_lookup(
+    lookup_type: str,
+    indicator_value: str,
+    indicator_type: str,
+    provider=None,
+    force_refresh: bool = False,
+) -> dict:
+    """Execute a single lookup with cache support and normalized response shape."""
+    logger.debug(
+        f"Executing lookup: type={lookup_type}, provider={provider}, indicator_type={indicator_type}"
+    )
+
+    task = LookupTask(lookup_type, indicator_value, indicator_type, provider)
+
+    if not force_refresh:
         try:
-            _cache_lookup_response(
-                hashed_value=hashed_value,
-                cache_source=cache_source,
-                normalized_value=normalized_value,
-                indicator_type=indicator_type,
-                response=response,
-                log_message=f"Cached result for {lookup_type}/{provider} on {indicator_value}",
-            )
+            cached = get_cached_lookup_responses({task.cache_key}).get(task.cache_key)
+            if cached is not None:
+                logger.debug(f"Cache hit for {lookup_type}/{provider} on {indicator_value}")
+                if cached.is_stale:
+                    schedule_revalidation(task)
+                return _serve_cached_lookup(cached)
         except Exception as cache_error:
-            logger.warning(f"Error storing cache: {cache_error}")
+            logger.warning(f"Error checking cache: {cache_error}")
+    else:
+        logger.debug(f"Force refresh enabled for {lookup_type}/{provider} on {indicator_value}")
 
-        logger.debug(f"Lookup completed successfully: {lookup_type}/{provider}")
-        return response
+    logger.debug(
+        f"Cache miss for {lookup_type}/{provider} on {indicator_value}, performing fresh lookup"
+    )
+    response, cacheable = _fetch_lookup_coalesced(task)
 
-    except Exception as exc:
-        logger.error(f"Error in lookup {lookup_type}/{provider}: {exc}", exc_info=True)
-        return _build_lookup_error(lookup_type, provider, str(exc))
+    if cacheable:
+        try:
+            cache_lookup_responses([(task, response)])
+        except Exception as cache_error:
+            logger.warning(f"Error storing cache: {cache_error}")
+
+    return response
 
 
 def detect_indicator_types(indicators: list[str]) -> dict[str, str]:
@@ -195,15 +416,24 @@ def detect_indicator_types(indicators: list[str]) -> dict[str, str]:
     return {item["value"]: item["type"] for item in detected}
 
 
-def build_indicator_results(
+def get_lookup_executor() -> ThreadPoolExecutor:
+    global _lookup_executor
+    with _lookup_executor_lock:
+        if _lookup_executor is None:
+            _lookup_executor = ThreadPoolExecutor(
+                max_workers=max(1, LOOKUP_MAX_WORKERS),
+                thread_name_prefix="harvester-lookup",
+            )
+        return _lookup_executor
+
+
+def plan_indicator_lookups(
     indicator_value: str,
     indicator_type: str,
     lookup_types: list[str],
     providers_by_type: dict[str, list[str]],
-    force_refresh: bool = False,
-) -> dict:
-    indicator_results = []
-
+) -> list[LookupTask]:
+    tasks = []
     for lookup_type in lookup_types:
         if not is_lookup_applicable(lookup_type, indicator_type):
             continue
@@ -212,41 +442,385 @@ def build_indicator_results(
         for provider in providers:
             if not is_provider_applicable(lookup_type, provider, indicator_type):
                 continue
-            result = execute_lookup(
-                lookup_type,
-                indicator_value,
-                indicator_type,
-                provider,
-                force_refresh=force_refresh,
+            tasks.append(LookupTask(lookup_type, indicator_value, indicator_type, provider))
+    return tasks
+
+
+def _get_provider_concurrency(concurrency_key: str) -> int:
+    limit = get_provider_limit(concurrency_key)
+    if limit is not None:
+        return min(limit.max_in_flight, max(1, LOOKUP_PROVIDER_CONCURRENCY))
+    return max(1, LOOKUP_PROVIDER_CONCURRENCY)
+
+
+class ProviderConcurrency:
+    """
+    Process-wide count of lookups submitted per concurrency key.
+
+    Batches take a slot before submitting a lookup and the slot is released when the lookup's
+    future finishes or is cancelled, so concurrent batches share one cap per provider and
+    abandoned lookups keep counting until they actually return.
+    """
+
+    def __init__(self):
+        self._in_flight: dict[str, int] = defaultdict(int)
+        self._releases = 0
+        self._condition = threading.Condition()
+
+    @property
+    def releases(self) -> int:
+        return self._releases
+
+    def in_flight(self, concurrency_key: str) -> int:
+        with self._condition:
+            return self._in_flight[concurrency_key]
+
+    def try_acquire(self, concurrency_key: str) -> bool:
+        with self._condition:
+            if self._in_flight[concurrency_key] >= _get_provider_concurrency(concurrency_key):
+                return False
+            self._in_flight[concurrency_key] += 1
+            return True
+
+    def release(self, concurrency_key: str) -> None:
+        with self._condition:
+            self._in_flight[concurrency_key] -= 1
+            self._releases += 1
+            self._condition.notify_all()
+
+    def wait_for_release(self, releases: int, timeout: float) -> None:
+        """Wait until a slot has been released since `releases` was read, or for `timeout` seconds."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._releases != releases, timeout=timeout)
+
+
+provider_concurrency = ProviderConcurrency()
+
+
+def get_revalidation_executor() -> ThreadPoolExecutor:
+    global _revalidation_executor
+    with _revalidation_executor_lock:
+        if _revalidation_executor is None:
+            _revalidation_executor = ThreadPoolExecutor(
+                max_workers=max(1, REVALIDATION_MAX_WORKERS),
+                thread_name_prefix="harvester-revalidate",
             )
-            indicator_results.append(result)
+        return _revalidation_executor
+
+
+def _get_revalidation_lock_key(task: LookupTask) -> str:
+    hashed_value, cache_source = task.cache_key
+    return f"{REVALIDATION_LOCK_PREFIX}:{cache_source}:{hashed_value}"
+
+
+def _hold_revalidation_lock(task: LookupTask, fresh_until: float) -> None:
+    """
+    Keep the revalidation lock until the refreshed entry goes stale, so processes still
+    serving the stale entry from memory do not refresh it again.
+    """
+    cache.set(_get_revalidation_lock_key(task), True, timeout=max(fresh_until - time.time(), 1))
+
+
+def _get_fresh_cached_lookup(task: LookupTask) -> lookup_cache.CachedLookup | None:
+    hashed_value, cache_source = task.cache_key
+    row = (
+        Source.objects.filter(hashed_value=hashed_value, source=cache_source)
+        .values_list("created", "expires_at", "data")
+        .first()
+    )
+    if row is None:
+        return None
+    cached = _build_cached_lookup(cache_source, *row)
+    return None if cached.is_stale else cached
+
+
+def _revalidate_lookup(task: LookupTask) -> None:
+    try:
+        cached = _get_fresh_cached_lookup(task)
+        if cached is not None:
+            # Another process already refreshed the row; only this process's tiers held the stale entry.
+            lookup_cache.set_many({task.cache_key: cached})
+            _hold_revalidation_lock(task, cached.fresh_until)
+            logger.debug(f"Reused revalidated {task.lookup_type}/{task.provider} on {task.indicator_value}")
+            return
+
+        response, cacheable = _fetch_lookup(
+            task.lookup_type,
+            task.indicator_value,
+            task.indicator_type,
+            task.provider,
+        )
+        if not cacheable:
+            logger.debug(f"Keeping stale {task.lookup_type}/{task.provider} result for {task.indicator_value}")
+            return
+        cache_lookup_responses([(task, response)])
+        _hold_revalidation_lock(task, time.time() + get_cache_ttl_minutes(task.cache_key[1]) * 60)
+        logger.debug(f"Revalidated {task.lookup_type}/{task.provider} on {task.indicator_value}")
+    except Exception as exc:
+        logger.warning(f"Error revalidating {task.lookup_type}/{task.provider} on {task.indicator_value}: {exc}")
+    finally:
+        connections.close_all()
+
+
+def schedule_revalidation(task: LookupTask) -> bool:
+    """
+    Refresh a stale lookup in the background, at most once at a time per cache key.
+
+    The lock lives in Django's cache, so the refresh is deduplicated across every process
+    sharing the cache backend; after a failed refresh it expires on its own, and after a
+    successful one it is held until the new entry goes stale. A process that still gets the
+    lock, such as one with a local cache, serves the Source row another process refreshed
+    instead of calling the provider again.
+    """
+    try:
+        if not cache.add(_get_revalidation_lock_key(task), True, timeout=REVALIDATION_RETRY_SECONDS):
+            return False
+    except Exception as exc:
+        logger.warning(f"Error acquiring revalidation lock: {exc}")
+        return False
+    get_revalidation_executor().submit(_revalidate_lookup, task)
+    return True
+
+
+def _run_lookup_task(task: LookupTask, deadline: float) -> tuple[dict, bool]:
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return _build_lookup_error(task.lookup_type, task.provider, LOOKUP_TIMEOUT_ERROR), False
+    try:
+        # Waiting for a rate limiter slot past the batch deadline would only hold a worker.
+        with provider_slot_deadline(deadline):
+            return _fetch_lookup_coalesced(task, timeout=remaining)
+    finally:
+        connections.close_all()
+
+
+def iter_lookup_task_results(
+    tasks: list[LookupTask],
+    force_refresh: bool = False,
+    deadline_seconds: float = LOOKUP_DEADLINE_SECONDS,
+    before_fetch: Callable[[list[LookupTask]], None] | None = None,
+) -> Iterator[tuple[int, dict]]:
+    """
+    Run a batch of lookups and yield (task index, result) pairs as they finish.
+
+    Cached responses for the whole batch are read with one query and yielded first. Then
+    `before_fetch` gets one task per missed lookup, and the misses run concurrently within
+    per-provider caps, once per cache key, until `deadline_seconds` after that. Cacheable
+    results are written back with one upsert when the batch ends or the consumer stops
+    iterating.
+    """
+    indexes_by_key: dict[tuple[str, str], list[int]] = defaultdict(list)
+    for index, task in enumerate(tasks):
+        indexes_by_key[task.cache_key].append(index)
+
+    cached_responses = {}
+    if not force_refresh:
+        try:
+            cached_responses = get_cached_lookup_responses(set(indexes_by_key))
+        except Exception as cache_error:
+            logger.warning(f"Error checking cache: {cache_error}")
+    logger.debug(
+        f"Lookup cache: {len(cached_responses)} hit(s), {len(indexes_by_key) - len(cached_responses)} miss(es)"
+    )
+
+    queued: dict[str, deque[tuple[str, str]]] = defaultdict(deque)
+    running: dict[Future, tuple[str, str]] = {}
+    cacheable_responses: list[tuple[LookupTask, dict]] = []
+    executor = get_lookup_executor()
+
+    def submit_ready():
+        for concurrency_key, cache_keys in queued.items():
+            while cache_keys and provider_concurrency.try_acquire(concurrency_key):
+                cache_key = cache_keys.popleft()
+                future = executor.submit(_run_lookup_task, tasks[indexes_by_key[cache_key][0]], deadline)
+                future.add_done_callback(lambda _future, key=concurrency_key: provider_concurrency.release(key))
+                running[future] = cache_key
+
+    try:
+        for cache_key, cached in cached_responses.items():
+            indexes = indexes_by_key[cache_key]
+            if cached.is_stale:
+                schedule_revalidation(tasks[indexes[0]])
+            response = _serve_cached_lookup(cached)
+            for index in indexes:
+                yield index, response
+
+        missed_keys = [cache_key for cache_key in indexes_by_key if cache_key not in cached_responses]
+        if missed_keys and before_fetch is not None:
+            before_fetch([tasks[indexes_by_key[cache_key][0]] for cache_key in missed_keys])
+        deadline = time.monotonic() + deadline_seconds
+        for cache_key in missed_keys:
+            queued[tasks[indexes_by_key[cache_key][0]].concurrency_key].append(cache_key)
+        submit_ready()
+
+        while running or any(queued.values()):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # Every finished lookup releases its slot, ours or another batch's, so one wait
+            # covers both our results and slots freed for our queued lookups.
+            releases = provider_concurrency.releases
+            done = [future for future in running if future.done()]
+            if not done:
+                provider_concurrency.wait_for_release(releases, remaining)
+            for future in done:
+                cache_key = running.pop(future)
+                task = tasks[indexes_by_key[cache_key][0]]
+                try:
+                    response, cacheable = future.result()
+                except Exception as exc:
+                    logger.error(f"Error in lookup {task.lookup_type}/{task.provider}: {exc}", exc_info=True)
+                    response, cacheable = _build_lookup_error(task.lookup_type, task.provider, str(exc)), False
+                if cacheable:
+                    cacheable_responses.append((task, response))
+                for index in indexes_by_key[cache_key]:
+                    yield index, response
+            submit_ready()
+
+        unfinished = [*running.values(), *(cache_key for cache_keys in queued.values() for cache_key in cache_keys)]
+        for cache_key in unfinished:
+            for index in indexes_by_key[cache_key]:
+                task = tasks[index]
+                logger.warning(
+                    f"Lookup {task.lookup_type}/{task.provider} on {task.indicator_value} "
+                    f"did not finish within {deadline_seconds}s"
+                )
+                yield index, _build_lookup_error(task.lookup_type, task.provider, LOOKUP_TIMEOUT_ERROR)
+    finally:
+        # Lookups still running keep their worker until they return; their results are discarded.
+        for future in running:
+            future.cancel()
 
+        try:
+            cache_lookup_responses(cacheable_responses)
+        except Exception as cache_error:
+            logger.warning(f"Error storing cache: {cache_error}")
+
+
+def execute_lookup_tasks(
+    tasks: list[LookupTask],
+    force_refresh: bool = False,
+    deadline_seconds: float = LOOKUP_DEADLINE_SECONDS,
+    before_fetch: Callable[[list[LookupTask]], None] | None = None,
+) -> list[dict]:
+    """Run a batch of lookups; results are returned in task order."""
+    results: list[dict | None] = [None] * len(tasks)
+    for index, result in iter_lookup_task_results(tasks, force_refresh, deadline_seconds, before_fetch):
+        results[index] = result
+    return results
+
+
+def build_indicator_results(
+    indicator_value: str,
+    indicator_type: str,
+    lookup_types: list[str],
+    providers_by_type: dict[str, list[str]],
+    force_refresh: bool = False,
+) -> dict:
+    tasks = plan_indicator_lookups(indicator_value, indicator_type, lookup_types, providers_by_type)
     return {
         "indicator": indicator_value,
         "indicator_type": indicator_type,
-        "results": indicator_results,
+        "results": execute_lookup_tasks(tasks, force_refresh=force_refresh),
     }
 
 
-def execute_batch_lookups(
+def _prefetch_builtin_dns(tasks: list[LookupTask]) -> None:
+    """Warm the shared resolver cache for every domain with a built-in DNS lookup about to run."""
+    domains = sorted(
+        {
+            task.indicator_value
+            for task in tasks
+            if task.lookup_type == "dns" and task.indicator_type == "domain" and task.provider in (None, "builtin_dns")
+        }
+    )
+    if len(domains) < 2:
+        return
+    try:
+        prefetch_dns_records(domains)
+    except Exception as exc:
+        logger.warning(f"Error prefetching DNS records: {exc}")
+
+
+def _plan_batch_lookups(
     indicators: list[str],
     providers_by_type: dict[str, list[str]],
-    force_refresh: bool = False,
-) -> dict:
+) -> tuple[dict[str, str], list[tuple[str, str, int]], list[LookupTask]]:
+    """
+    Detect indicator types and plan every lookup of the batch.
+
+    Returns the indicator types, (indicator, indicator type, lookup count) per indicator in
+    request order, and the lookups of all indicators in that same order.
+    """
     lookup_types = list(providers_by_type.keys())
     indicator_types = detect_indicator_types(indicators)
-    results = []
 
+    planned = []
+    tasks = []
     for indicator_value in indicators:
         indicator_type = indicator_types.get(indicator_value, "unknown")
-        results.append(
-            build_indicator_results(
-                indicator_value=indicator_value,
-                indicator_type=indicator_type,
-                lookup_types=lookup_types,
-                providers_by_type=providers_by_type,
-                force_refresh=force_refresh,
-            )
-        )
+        indicator_tasks = plan_indicator_lookups(indicator_value, indicator_type, lookup_types, providers_by_type)
+        planned.append((indicator_value, indicator_type, len(indicator_tasks)))
+        tasks.extend(indicator_tasks)
+    return indicator_types, planned, tasks
+
+
+def execute_batch_lookups(
+    indicators: list[str],
+    providers_by_type: dict[str, list[str]],
+    force_refresh: bool = False,
+) -> dict:
+    indicator_types, planned, tasks = _plan_batch_lookups(indicators, providers_by_type)
+
+    # Every lookup of the batch shares one fan-out, so the batch takes about as long as its
+    # slowest lookup rather than the sum of them.
+    task_results = iter(
+        execute_lookup_tasks(tasks, force_refresh=force_refresh, before_fetch=_prefetch_builtin_dns)
+    )
+    results = [
+        {
+            "indicator": indicator_value,
+            "indicator_type": indicator_type,
+            "results": [next(task_results) for _ in range(task_count)],
+        }
+        for indicator_value, indicator_type, task_count in planned
+    ]
 
     return {"results": results, "indicator_types": indicator_types}
+
+
+def stream_batch_lookups(
+    indicators: list[str],
+    providers_by_type: dict[str, list[str]],
+    force_refresh: bool = False,
+) -> Iterator[dict]:
+    """
+    Batch lookups as a stream of events, one per lookup result in completion order.
+
+    A "start" event carries the planned lookup count, each "result" event carries the
+    indicator's position in the request and the result's position among that indicator's
+    results (matching execute_batch_lookups), and a final "summary" event carries
+    indicator_types.
+    """
+    indicator_types, planned, tasks = _plan_batch_lookups(indicators, providers_by_type)
+    positions = [
+        (indicator_index, result_index)
+        for indicator_index, (_, _, task_count) in enumerate(planned)
+        for result_index in range(task_count)
+    ]
+    yield {"event": "start", "indicators": len(indicators), "lookups": len(tasks)}
+
+    # The start event and cached results go out before the DNS prefetch for the misses.
+    task_results = iter_lookup_task_results(tasks, force_refresh=force_refresh, before_fetch=_prefetch_builtin_dns)
+    for index, result in task_results:
+        indicator_index, result_index = positions[index]
+        yield {
+            "event": "result",
+            "indicator_index": indicator_index,
+            "result_index": result_index,
+            "indicator": tasks[index].indicator_value,
+            "indicator_type": tasks[index].indicator_type,
+            "result": result,
+        }
+
+    yield {"event": "summary", "lookups": len(tasks), "indicator_types": indicator_types}
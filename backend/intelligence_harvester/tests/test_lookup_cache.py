@@ -0,0 +1,180 @@
+import time
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+
+from intelligence_harvester.models import Source
+from intelligence_harvester.services import lookup_cache, lookups
+from intelligence_harvester.services.lookup_cache import CachedLookup, LookupMemoryCache, _estimate_size
+from intelligence_harvester.services.lookups import LookupTask, cache_lookup_responses, execute_lookup_tasks
+
+
+def build_cached(data: dict, fresh_for: float = 60, stale_for: float = 120) -> CachedLookup:
+    now = time.time()
+    return CachedLookup(data=data, cached_at=now, fresh_until=now + fresh_for, stale_until=now + stale_for)
+
+
+class LookupMemoryCacheTests(SimpleTestCase):
+    def test_size_tracks_replaced_and_deleted_entries(self):
+        memory_cache = LookupMemoryCache(max_bytes=10_000)
+        first, second = {"value": "a" * 100}, {"value": "b" * 300}
+
+        memory_cache.set(("a", "dns_auto"), build_cached(first))
+        memory_cache.set(("b", "dns_auto"), build_cached(first))
+        memory_cache.set(("a", "dns_auto"), build_cached(second))
+        self.assertEqual(memory_cache.size, _estimate_size(first) + _estimate_size(second))
+
+        memory_cache.delete(("a", "dns_auto"))
+        memory_cache.delete(("missing", "dns_auto"))
+        self.assertEqual(memory_cache.size, _estimate_size(first))
+        self.assertEqual(len(memory_cache), 1)
+
+    def test_evicts_least_recently_used_entries_past_the_byte_budget(self):
+        data = {"value": "x" * 200}
+        entry_size = _estimate_size(data)
+        memory_cache = LookupMemoryCache(max_bytes=entry_size * 4)
+        for key in "abcd":
+            memory_cache.set((key, "dns_auto"), build_cached(data))
+
+        memory_cache.get(("a", "dns_auto"))
+        memory_cache.set(("e", "dns_auto"), build_cached(data))
+
+        self.assertIsNone(memory_cache.get(("b", "dns_auto")))
+        self.assertIsNotNone(memory_cache.get(("a", "dns_auto")))
+        self.assertEqual(memory_cache.size, entry_size * 4)
+
+    def test_skips_oversized_and_expired_entries(self):
+        memory_cache = LookupMemoryCache(max_bytes=1000)
+        memory_cache.set(("big", "dns_auto"), build_cached({"value": "x" * 400}))
+        memory_cache.set(("expired", "dns_auto"), build_cached({"value": "x"}, fresh_for=-2, stale_for=-1))
+        self.assertEqual((len(memory_cache), memory_cache.size), (0, 0))
+
+        memory_cache.set(("aging", "dns_auto"), build_cached({"value": "x"}, fresh_for=0, stale_for=0.05))
+        time.sleep(0.1)
+        self.assertIsNone(memory_cache.get(("aging", "dns_auto")))
+        self.assertEqual((len(memory_cache), memory_cache.size), (0, 0))
+
+
+class LookupCacheTableTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        lookup_cache.memory_cache.clear()
+
+    def test_upsert_rewrites_one_row_per_lookup(self):
+        task = LookupTask("whois", "Example.com", "domain", None)
+        cache_lookup_responses([(task, {"essential": {"registrar": "old"}})])
+        Source.objects.update(created=datetime.now(timezone.utc) - timedelta(days=2))
+
+        new_response = {"essential": {"registrar": "new"}}
+        cache_lookup_responses([(task, new_response), (task, new_response)])
+
+        row = Source.objects.get()
+        self.assertEqual((row.value, row.source), ("example.com", "whois_auto"))
+        self.assertEqual(row.data, {"essential": {"registrar": "new"}})
+        self.assertGreater(row.created, datetime.now(timezone.utc) - timedelta(minutes=1))
+
+    def test_stale_window_depends_on_lookup_type(self):
+        reputation = LookupTask("reputation", "1.2.3.4", "ipv4", "virustotal")
+        cve_details = LookupTask("cve_details", "CVE-2024-0001", "cve", None)
+        cache_lookup_responses([(reputation, {"essential": {}}), (cve_details, {"essential": {}})])
+
+        lifetimes = {row.source: row.expires_at - row.created for row in Source.objects.all()}
+        tolerance = timedelta(seconds=1)
+        self.assertAlmostEqual(lifetimes["reputation_virustotal"], timedelta(minutes=60 + 360), delta=tolerance)
+        self.assertAlmostEqual(lifetimes["cve_details_auto"], timedelta(minutes=10080 + 43200), delta=tolerance)
+
+    def test_stale_row_is_served_marked_and_refreshed(self):
+        task = LookupTask("dns", "example.com", "domain", "builtin_dns")
+        cache_lookup_responses([(task, {"essential": {"a": ["192.0.2.1"]}})])
+        fetched = datetime.now(timezone.utc) - timedelta(minutes=300)
+        Source.objects.update(created=fetched)
+        lookup_cache.memory_cache.clear()
+
+        with (
+            mock.patch.object(lookups, "_fetch_lookup") as fetch_lookup,
+            mock.patch.object(lookups, "schedule_revalidation") as schedule_revalidation,
+        ):
+            [result] = execute_lookup_tasks([task])
+
+        fetch_lookup.assert_not_called()
+        schedule_revalidation.assert_called_once_with(task)
+        self.assertEqual(result["essential"], {"a": ["192.0.2.1"]})
+        self.assertTrue(result["_stale"])
+        self.assertEqual(datetime.fromisoformat(result["_cached_at"]), fetched)
+
+    def make_stale(self, task: LookupTask) -> None:
+        cache_lookup_responses([(task, {"essential": {"a": ["192.0.2.1"]}})])
+        stale = datetime.now(timezone.utc) - timedelta(minutes=300)
+        Source.objects.update(created=stale)
+        lookup_cache.memory_cache.clear()
+        cache.clear()
+        self.assertTrue(lookups.get_cached_lookup_responses({task.cache_key})[task.cache_key].is_stale)
+
+    def test_revalidation_lock_is_held_until_the_refreshed_entry_goes_stale(self):
+        task = LookupTask("dns", "example.com", "domain", "builtin_dns")
+        self.make_stale(task)
+        refreshed = {"essential": {"a": ["192.0.2.2"]}}
+
+        with (
+            mock.patch.object(lookups, "connections"),
+            mock.patch.object(lookups, "_fetch_lookup", return_value=(refreshed, True)),
+            mock.patch.object(lookups.cache, "set", wraps=lookups.cache.set) as cache_set,
+        ):
+            lookups._revalidate_lookup(task)
+
+        lock_key = lookups._get_revalidation_lock_key(task)
+        [lock_call] = [call for call in cache_set.call_args_list if call.args[0] == lock_key]
+        ttl_seconds = lookups.get_cache_ttl_minutes(task.cache_key[1]) * 60
+        self.assertAlmostEqual(lock_call.kwargs["timeout"], ttl_seconds, delta=5)
+        with mock.patch.object(lookups, "get_revalidation_executor") as get_executor:
+            self.assertFalse(lookups.schedule_revalidation(task))
+        get_executor.assert_not_called()
+
+    def test_revalidation_reuses_a_row_refreshed_by_another_process(self):
+        task = LookupTask("dns", "example.com", "domain", "builtin_dns")
+        self.make_stale(task)
+        # Another process refreshed the row while this one kept the stale entry in memory.
+        Source.objects.update(created=datetime.now(timezone.utc), data={"essential": {"a": ["192.0.2.2"]}})
+
+        with (
+            mock.patch.object(lookups, "connections"),
+            mock.patch.object(lookups, "_fetch_lookup") as fetch_lookup,
+        ):
+            lookups._revalidate_lookup(task)
+
+        fetch_lookup.assert_not_called()
+        cached = lookup_cache.memory_cache.get(task.cache_key)
+        self.assertFalse(cached.is_stale)
+        self.assertEqual(cached.data, {"essential": {"a": ["192.0.2.2"]}})
+
+
+class PurgeLookupCacheCommandTests(TestCase):
+    def create_row(self, hashed_value: str, expires_in: timedelta) -> None:
+        Source.objects.create(
+            expires_at=datetime.now(timezone.utc) + expires_in,
+            value=hashed_value,
+            value_type="domain",
+            hashed_value=hashed_value,
+            source="dns_auto",
+            data={},
+        )
+
+    def test_deletes_only_expired_rows_in_batches(self):
+        for index in range(3):
+            self.create_row(f"expired{index}", timedelta(minutes=-1))
+        self.create_row("live", timedelta(hours=1))
+
+        output = StringIO()
+        call_command("purge_lookup_cache", "--batch-size", "2", "--max-batches", "1", stdout=output)
+        self.assertIn("Deleted 2 expired", output.getvalue())
+
+        call_command("purge_lookup_cache", stdout=StringIO())
+        self.assertEqual(list(Source.objects.values_list("hashed_value", flat=True)), ["live"])
+
+    def test_rejects_empty_batches(self):
+        with self.assertRaises(CommandError):
+            call_command("purge_lookup_cache", "--batch-size", "0")
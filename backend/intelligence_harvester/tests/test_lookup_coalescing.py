@@ -0,0 +1,141 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from django.test import TestCase
+
+from intelligence_harvester.models import LookupInFlight
+from intelligence_harvester.services import lookup_coalescing
+from intelligence_harvester.services.lookup_coalescing import coalesce, purge_expired_claims
+
+KEY = "passive_dns_securitytrails:abc"
+
+
+class CallCounter:
+    def __init__(self, result="fresh", delay: float = 0):
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return self.result
+
+
+class CoalesceTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(lookup_coalescing, "POLL_INTERVAL_SECONDS", 0.01)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def claim_in_other_process(self, token: str = "other", expires_in: float = 60) -> LookupInFlight:
+        return LookupInFlight.objects.create(
+            key=KEY,
+            token=token,
+            expires_at=datetime.now(timezone.utc) + timedelta(seconds=expires_in),
+        )
+
+    def while_polling(self, other_process):
+        """Run `other_process` in place of the first poll sleep, as another process would meanwhile."""
+        sleep = time.sleep
+
+        def poll_sleep(seconds):
+            if not poll_sleep.ran:
+                poll_sleep.ran = True
+                other_process()
+            sleep(seconds)
+
+        poll_sleep.ran = False
+        return mock.patch.object(lookup_coalescing.time, "sleep", poll_sleep)
+
+    def test_concurrent_callers_in_one_process_share_one_call(self):
+        func = CallCounter(delay=0.2)
+        results = []
+
+        def run():
+            results.append(coalesce(KEY, func, timeout=5))
+
+        # Only the in-process Future is under test; the threads have no access to the test transaction.
+        with mock.patch.object(lookup_coalescing, "_run_across_processes", lambda key, func, *args: (func(), True)):
+            threads = [threading.Thread(target=run) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=5)
+
+        self.assertEqual(func.calls, 1)
+        self.assertEqual(sorted(ran for _, ran in results), [False, False, False, True])
+        self.assertTrue(all(result == "fresh" for result, _ in results))
+
+    def test_waits_for_the_result_of_the_call_in_flight(self):
+        claim = self.claim_in_other_process()
+        func = CallCounter()
+
+        def finish_other_call():
+            LookupInFlight.objects.filter(pk=claim.pk).update(published=True, result={"value": "shared"})
+
+        with self.while_polling(finish_other_call):
+            self.assertEqual(coalesce(KEY, func, timeout=5), ({"value": "shared"}, False))
+        self.assertEqual(func.calls, 0)
+
+    def test_result_of_an_earlier_call_is_not_reused(self):
+        LookupInFlight.objects.create(
+            key=KEY,
+            token="earlier",
+            expires_at=datetime.now(timezone.utc) + timedelta(seconds=60),
+            published=True,
+            result="stale",
+        )
+        claim = self.claim_in_other_process()
+        func = CallCounter()
+
+        with self.while_polling(claim.delete):
+            self.assertEqual(coalesce(KEY, func, timeout=5), ("fresh", True))
+        self.assertEqual(func.calls, 1)
+
+    def test_result_published_by_a_finished_call_is_not_reused(self):
+        func = CallCounter(result="first")
+        coalesce(KEY, func, timeout=5)
+        func.result = "second"
+
+        self.assertEqual(coalesce(KEY, func, timeout=5), ("second", True))
+        self.assertEqual(func.calls, 2)
+
+    def test_unpublishable_result_is_not_shared_across_processes(self):
+        coalesce(KEY, CallCounter(result="error"), timeout=5, should_publish=lambda result: result != "error")
+        self.assertFalse(LookupInFlight.objects.exists())
+
+        coalesce(KEY, CallCounter(result="data"), timeout=5, should_publish=lambda result: result != "error")
+        self.assertEqual(list(LookupInFlight.objects.values_list("published", "result")), [(True, "data")])
+
+    def test_claim_of_a_dead_process_is_taken_over(self):
+        self.claim_in_other_process(expires_in=-1)
+        func = CallCounter()
+
+        self.assertEqual(coalesce(KEY, func, timeout=5), ("fresh", True))
+        self.assertEqual(func.calls, 1)
+        self.assertEqual(LookupInFlight.objects.get().result, "fresh")
+
+    def test_waiter_times_out_on_a_call_that_never_finishes(self):
+        self.claim_in_other_process()
+        func = CallCounter()
+
+        started = time.monotonic()
+        self.assertEqual(coalesce(KEY, func, timeout=0.2), ("fresh", True))
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(func.calls, 1)
+
+    def test_purge_deletes_only_expired_claims(self):
+        LookupInFlight.objects.create(
+            key="other:key",
+            token="dead",
+            expires_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+        )
+        self.claim_in_other_process(token="live")
+
+        self.assertEqual(purge_expired_claims(), 1)
+        self.assertEqual(list(LookupInFlight.objects.values_list("token", flat=True)), ["live"])
@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import Counter
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from intelligence_harvester.services import lookup_cache, lookups
+from intelligence_harvester.services.lookups import (
+    LOOKUP_TIMEOUT_ERROR,
+    LookupTask,
+    cache_lookup_responses,
+    execute_lookup_tasks,
+    stream_batch_lookups,
+)
+
+
+def build_tasks(prefix: str, count: int) -> list[LookupTask]:
+    return [
+        LookupTask("passive_dns", f"{prefix}{index}.example.com", "domain", "securitytrails")
+        for index in range(count)
+    ]
+
+
+class ConcurrencyRecorder:
+    """Stand-in for _fetch_lookup that records the peak number of concurrent calls per provider."""
+
+    def __init__(self, duration: float = 0.05):
+        self.duration = duration
+        self.running: Counter[str] = Counter()
+        self.peak: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, lookup_type, indicator_value, indicator_type, provider):
+        with self._lock:
+            self.running[provider] += 1
+            self.peak[provider] = max(self.peak[provider], self.running[provider])
+        time.sleep(self.duration)
+        with self._lock:
+            self.running[provider] -= 1
+        return {"value": indicator_value, "_provider": provider}, False
+
+
+class LookupFanOutTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        lookup_cache.memory_cache.clear()
+
+    def test_provider_cap_is_shared_by_concurrent_batches(self):
+        recorder = ConcurrencyRecorder()
+        batches = [build_tasks(f"batch{batch}-", 6) for batch in range(3)]
+        results = {}
+
+        def run(batch_index):
+            results[batch_index] = execute_lookup_tasks(batches[batch_index], deadline_seconds=10)
+
+        with mock.patch.object(lookups, "_fetch_lookup", recorder):
+            threads = [threading.Thread(target=run, args=(batch_index,)) for batch_index in range(len(batches))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=15)
+
+        self.assertEqual(recorder.peak["securitytrails"], lookups._get_provider_concurrency("securitytrails"))
+        for batch_index, tasks in enumerate(batches):
+            self.assertEqual(
+                [result["value"] for result in results[batch_index]],
+                [task.indicator_value for task in tasks],
+            )
+        self.assertEqual(lookups.provider_concurrency.in_flight("securitytrails"), 0)
+
+    def test_unfinished_lookups_time_out_and_release_their_slots(self):
+        recorder = ConcurrencyRecorder(duration=0.5)
+        tasks = build_tasks("host", 4)
+
+        with mock.patch.object(lookups, "_fetch_lookup", recorder):
+            started = time.monotonic()
+            results = execute_lookup_tasks(tasks, deadline_seconds=0.2)
+            self.assertLess(time.monotonic() - started, 0.45)
+
+            self.assertEqual([result.get("error") for result in results], [LOOKUP_TIMEOUT_ERROR] * 4)
+            deadline = time.monotonic() + 2
+            while lookups.provider_concurrency.in_flight("securitytrails") and time.monotonic() < deadline:
+                time.sleep(0.05)
+        self.assertEqual(lookups.provider_concurrency.in_flight("securitytrails"), 0)
+
+
+class StreamBatchLookupsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        lookup_cache.memory_cache.clear()
+
+    def test_start_and_cached_results_are_streamed_before_the_dns_prefetch(self):
+        cached_task = LookupTask("dns", "cached.example.com", "domain", None)
+        cache_lookup_responses([(cached_task, {"essential": {"A": "192.0.2.1"}})])
+        indicators = ["cached.example.com", "first.example.com", "second.example.com"]
+        events = []
+
+        with (
+            mock.patch.object(lookups, "prefetch_dns_records", lambda domains: events.append(("prefetch", domains))),
+            mock.patch.object(lookups, "_fetch_lookup", return_value=({"essential": {}}, False)),
+        ):
+            for event in stream_batch_lookups(indicators, {"dns": []}):
+                events.append((event["event"], event.get("indicator")))
+
+        self.assertEqual(
+            events[:3],
+            [
+                ("start", None),
+                ("result", "cached.example.com"),
+                ("prefetch", ["first.example.com", "second.example.com"]),
+            ],
+        )
+        self.assertEqual(sorted(events[3:5]), [("result", "first.example.com"), ("result", "second.example.com")])
+        self.assertEqual(events[5:], [("summary", None)])
@@ -0,0 +1,81 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from scripts.utils import rate_limiter
+from scripts.utils.rate_limiter import ProviderLimit, ProviderRateLimitTimeout, provider_slot, provider_slot_deadline
+
+
+class ProviderSlotTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.dict(
+            rate_limiter.PROVIDER_LIMITS,
+            {"testprovider": ProviderLimit(requests_per_second=100, max_in_flight=1)},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_in_flight_slot_is_released(self):
+        with provider_slot("testprovider"):
+            pass
+        with provider_slot("testprovider", timeout=0.5):
+            pass
+
+    def test_wait_is_bounded_by_timeout(self):
+        with provider_slot("testprovider"):
+            started = time.monotonic()
+            with self.assertRaises(ProviderRateLimitTimeout):
+                with provider_slot("testprovider", timeout=0.2):
+                    pass
+            self.assertLess(time.monotonic() - started, 1)
+
+    def test_wait_is_bounded_by_enclosing_deadline(self):
+        with provider_slot("testprovider"):
+            started = time.monotonic()
+            with provider_slot_deadline(started + 0.2), self.assertRaises(ProviderRateLimitTimeout):
+                with provider_slot("testprovider"):
+                    pass
+            self.assertLess(time.monotonic() - started, 1)
+
+    def test_unlimited_provider_is_not_throttled(self):
+        with provider_slot("unknown"), provider_slot("unknown"):
+            pass
+
+
+class InFlightLeaseTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.dict(
+            rate_limiter.PROVIDER_LIMITS,
+            {"testprovider": ProviderLimit(requests_per_second=100, max_in_flight=2)},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_each_acquire_renews_the_in_flight_lease(self):
+        with mock.patch.object(cache, "touch", wraps=cache.touch) as touch:
+            with provider_slot("testprovider"), provider_slot("testprovider"):
+                pass
+
+        in_flight_calls = [call for call in touch.call_args_list if call.args[0].endswith(":in-flight")]
+        self.assertEqual(len(in_flight_calls), 2)
+        for call in in_flight_calls:
+            self.assertEqual(call.kwargs["timeout"], rate_limiter.IN_FLIGHT_LEASE_SECONDS)
+
+
+class ProcessLocalCacheWarningTests(SimpleTestCase):
+    def test_warns_when_limits_use_a_process_local_cache(self):
+        with self.assertLogs(rate_limiter.logger, "WARNING") as logs:
+            self.assertTrue(rate_limiter.warn_if_limits_are_process_local())
+        self.assertIn("CACHE_BACKEND", logs.output[0])
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}})
+    def test_shared_cache_is_not_reported(self):
+        self.assertFalse(rate_limiter.warn_if_limits_are_process_local())
+
+    def test_no_active_limits_is_not_reported(self):
+        with mock.patch.dict(rate_limiter.PROVIDER_LIMITS, clear=True):
+            self.assertFalse(rate_limiter.warn_if_limits_are_process_local())
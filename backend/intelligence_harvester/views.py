@@ -1,7 +1,11 @@
 import openpyxl
 import io
+import json
 import logging
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.renderers import BaseRenderer, JSONRenderer
 
@@ -10,7 +14,7 @@ from scripts.utils.excel_export import generate_excel
 from scripts.utils.identifier import get_indicator_type
 
 from .serializers import BatchIndicatorLookupSerializer, IndicatorSerializer
-from .services.lookups import execute_batch_lookups
+from .services.lookups import execute_batch_lookups, stream_batch_lookups
 from .services.providers import build_providers_payload
 
 
@@ -75,6 +79,35 @@ class ExcelRenderer(BaseRenderer):
         return output.read()
 
 
+class NDJSONRenderer(BaseRenderer):
+    """One JSON document per line; used for streamed lookup events and their errors"""
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(self, data, media_type=None, renderer_context=None):
+        return (json.dumps(data, cls=DjangoJSONEncoder) + "\n").encode("utf-8")
+
+    def render_event(self, event):
+        return self.render(event)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Server-sent events named by each lookup event's "event" key"""
+    media_type = "text/event-stream"
+    format = "sse"
+
+    def render(self, data, media_type=None, renderer_context=None):
+        # Only errors are rendered through DRF; results are streamed by render_event.
+        if not isinstance(data, dict):
+            data = {"detail": data}
+        return self.render_event({"event": "error", **data})
+
+    def render_event(self, event):
+        event = dict(event)
+        name = event.pop("event", "message")
+        return f"event: {name}\ndata: {json.dumps(event, cls=DjangoJSONEncoder)}\n\n".encode("utf-8")
+
+
 class IndicatorLookupViewSet(viewsets.ViewSet):
     """Perform batch indicator lookups across multiple types and providers"""
     serializer_class = BatchIndicatorLookupSerializer
@@ -135,6 +168,61 @@ class IndicatorLookupViewSet(viewsets.ViewSet):
                 status_code=500,
             )
 
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="stream",
+        renderer_classes=[NDJSONRenderer, EventStreamRenderer],
+    )
+    def stream(self, request):
+        """
+        Execute indicator lookups and stream each result as soon as it finishes.
+
+        Takes the same payload as create. Responds with NDJSON by default, or server-sent
+        events for "Accept: text/event-stream" or ?format=sse. Events are "start", one
+        "result" per (indicator, lookup type, provider), and a final "summary" carrying
+        indicator_types.
+        """
+        serializer = BatchIndicatorLookupSerializer(data=request.data)
+        if not serializer.is_valid():
+            logger.warning(f"Invalid batch lookup payload: {serializer.errors}")
+            return error(
+                "Invalid batch lookup payload",
+                code="validation_error",
+                details=serializer.errors,
+                status_code=400,
+            )
+
+        indicators = serializer.validated_data["indicators"]
+        providers_by_type = serializer.validated_data["providers_by_type"]
+        force_refresh = serializer.validated_data["force_refresh"]
+        if not providers_by_type:
+            logger.warning("No lookup types requested")
+            return error(
+                "No lookup types requested",
+                code="validation_error",
+                status_code=400,
+            )
+        logger.info(f"Streaming batch lookup request: {len(indicators)} indicators")
+
+        renderer = request.accepted_renderer
+
+        def render_events():
+            try:
+                for event in stream_batch_lookups(indicators, providers_by_type, force_refresh=force_refresh):
+                    yield renderer.render_event(event)
+            except Exception as e:
+                logger.error(f"Error in streaming indicator lookup: {e}", exc_info=True)
+                yield renderer.render_event(
+                    {"event": "error", "message": "Failed to process lookup", "code": "processing_error"}
+                )
+
+        response = StreamingHttpResponse(render_events(), content_type=renderer.media_type)
+        response["Cache-Control"] = "no-cache"
+        # Keep reverse proxies from buffering the stream.
+        response["X-Accel-Buffering"] = "no"
+        return response
+
 
 class AllProvidersView(viewsets.ViewSet):
     """Get all providers organized by type - unified endpoint"""
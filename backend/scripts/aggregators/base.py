@@ -4,6 +4,8 @@ Base utilities for aggregators - common error handling and helpers
 import logging
 from typing import Dict, Any, Callable
 
+from ..utils.rate_limiter import ProviderRateLimitTimeout, provider_slot
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,3 +32,29 @@ def call_provider(
     except Exception as e:
         logger.error(f"{provider_name} failed: {e}")
         return {'error': str(e)}
+
+
+def call_rate_limited(
+    provider_name: str,
+    provider_func: Callable,
+    *args,
+    **kwargs
+) -> Dict[str, Any]:
+    """
+    Call a provider function inside its shared rate-limit and concurrency slot
+    
+    Args:
+        provider_name: Provider id used to look up the configured limit
+        provider_func: The provider function to call
+        *args: Positional arguments to pass to the function
+        **kwargs: Keyword arguments to pass to the function
+    
+    Returns:
+        dict: Provider result or {'error': str} if no slot became available
+    """
+    try:
+        with provider_slot(provider_name):
+            return provider_func(*args, **kwargs)
+    except ProviderRateLimitTimeout as e:
+        logger.warning(str(e))
+        return {'error': str(e)}
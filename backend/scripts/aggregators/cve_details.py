@@ -6,6 +6,7 @@ from typing import Optional, Dict, Any
 
 from ..providers.nvd import nvd as nvd_lookup
 from ..providers.ibm import ibm_cve
+from .base import call_rate_limited
 
 logger = logging.getLogger(__name__)
 
@@ -26,13 +27,13 @@ def get(cve: str, provider: Optional[str] = None) -> Dict[str, Any]:
     if provider is not None:
         if provider not in PROVIDERS:
             return {'error': f'Provider {provider} not available'}
-        result = PROVIDERS[provider](cve)
+        result = call_rate_limited(provider, PROVIDERS[provider], cve)
         if not result.get('error'):
             result['_provider'] = provider
         return result
 
     for prov_id, func in PROVIDERS.items():
-        result = func(cve)
+        result = call_rate_limited(prov_id, func, cve)
         if result and not result.get('error'):
             result['_provider'] = prov_id
             return result
@@ -8,6 +8,7 @@ from ..providers.builtin_dns import dns_records as builtin_dns_records
 from ..providers.securitytrails import get_dns_records as securitytrails_dns_records
 from ..providers.apininjas import dns_lookup as apininjas_dns_lookup
 from ..providers.cloudflare import dns_query as cloudflare_dns_query
+from .base import call_rate_limited
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +32,7 @@ def get(domain: str, provider: Optional[str] = None) -> Dict[str, Any]:
     if prov_id not in PROVIDERS:
         return {'error': f'Provider {prov_id} not available'}
 
-    result = PROVIDERS[prov_id](domain)
+    result = call_rate_limited(prov_id, PROVIDERS[prov_id], domain)
     if not result.get('error'):
         result['_provider'] = prov_id
     return result
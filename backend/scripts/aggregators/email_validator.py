@@ -10,6 +10,7 @@ from ..providers.apilayer import emailvalidator as apilayer_validator
 from ..providers.builtin_smtp import smtp_validate
 from ..providers.hunterio import verify_email as hunterio_verify
 from ..providers.whoisxmlapi import emailverification as whoisxml_emailverification
+from .base import call_rate_limited
 
 logger = logging.getLogger(__name__)
 
@@ -48,13 +49,13 @@ def get(email: str, provider: Optional[str] = None) -> Dict[str, Any]:
     if provider is not None:
         if provider not in PROVIDERS:
             return {'error': f'Provider {provider} not available'}
-        result = PROVIDERS[provider](email)
+        result = call_rate_limited(provider, PROVIDERS[provider], email)
         if not result.get('error'):
             result['_provider'] = provider
         return result
 
     for prov_id, func in PROVIDERS.items():
-        result = func(email)
+        result = call_rate_limited(prov_id, func, email)
         if result and not result.get('error'):
             result['_provider'] = prov_id
             return result
@@ -10,6 +10,7 @@ from ..providers.builtin_ipinfo import ip_to_asn as builtin_ipinfo_lookup
 from ..providers.ipapi import get_geolocation as ipapi_lookup
 from ..providers.ipinfoio import get_ip_info as ipinfoio_lookup
 from ..providers.whoisxmlapi import iplocation as whoisxml_iplocation
+from .base import call_rate_limited
 
 logger = logging.getLogger(__name__)
 
@@ -48,13 +49,13 @@ def get(ip: str, provider: Optional[str] = None) -> Dict[str, Any]:
     if provider is not None:
         if provider not in PROVIDERS:
             return {'error': f'Provider {provider} not available'}
-        result = PROVIDERS[provider](ip)
+        result = call_rate_limited(provider, PROVIDERS[provider], ip)
         if not result.get('error'):
             result['_provider'] = provider
         return result
 
     for prov_id, func in PROVIDERS.items():
-        result = func(ip)
+        result = call_rate_limited(prov_id, func, ip)
         if result and not result.get('error'):
             result['_provider'] = prov_id
             return result
@@ -8,6 +8,7 @@ from ..providers.virustotal import ip_address as vt_ip, domain as vt_domain, fil
 from ..providers.abuseipdb import abuseipdb
 from ..providers.ibm import ibm_ip, ibm_url, ibm_hash
 from ..providers.hybrid_analysis import hybridanalysis
+from .base import call_rate_limited
 
 logger = logging.getLogger(__name__)
 
@@ -33,13 +34,13 @@ def _dispatch(value: str, providers: dict, provider: Optional[str]) -> Dict[str,
     if provider is not None:
         if provider not in providers:
             return {'error': f'Provider {provider} not available'}
-        result = providers[provider](value)
+        result = call_rate_limited(provider, providers[provider], value)
         if result and not result.get('error'):
             result['_provider'] = provider
         return result or {'error': f'Provider {provider} returned no data'}
 
     for prov_id, func in providers.items():
-        result = func(value)
+        result = call_rate_limited(prov_id, func, value)
         if result and not result.get('error'):
             result['_provider'] = prov_id
             return result
@@ -6,6 +6,7 @@ from typing import Optional, Dict, Any
 
 from ..providers.builtin_dns import ip_to_hostname
 from ..providers.securitytrails import get_reverse_dns as securitytrails_reverse_dns
+from .base import call_rate_limited
 
 logger = logging.getLogger(__name__)
 
@@ -27,13 +28,13 @@ def get(ip: str, provider: Optional[str] = None) -> Dict[str, Any]:
     if provider is not None:
         if provider not in PROVIDERS:
             return {'error': f'Provider {provider} not available'}
-        result = PROVIDERS[provider](ip)
+        result = call_rate_limited(provider, PROVIDERS[provider], ip)
         if not result.get('error'):
             result['_provider'] = provider
         return result
 
     for prov_id, func in PROVIDERS.items():
-        result = func(ip)
+        result = call_rate_limited(prov_id, func, ip)
         if result and not result.get('error'):
             result['_provider'] = prov_id
             return result
@@ -6,6 +6,7 @@ from typing import Optional, Dict, Any
 
 from ..providers.screenshotlayer import screenshot as screenshotlayer_screenshot, fullpage_screenshot
 from ..providers.screenshotmachine import get_website_screenshot
+from .base import call_rate_limited
 
 logger = logging.getLogger(__name__)
 
@@ -27,10 +28,10 @@ def get(url: str, provider: Optional[str] = None, fullpage: bool = False) -> Dic
     if provider is not None:
         if provider not in PROVIDERS:
             return {'error': f'Provider {provider} not available'}
-        return PROVIDERS[provider](url)
+        return call_rate_limited(provider, PROVIDERS[provider], url)
 
     for prov_id, func in PROVIDERS.items():
-        result = func(url)
+        result = call_rate_limited(prov_id, func, url)
         if 'error' not in result:
             return result
 
@@ -6,6 +6,7 @@ from typing import Optional, Dict, Any
 
 from ..providers.redirect_checker import redirect_checker
 from ..providers.geekflare import get_web_redirects
+from .base import call_rate_limited
 
 logger = logging.getLogger(__name__)
 
@@ -27,13 +28,13 @@ def get(url: str, provider: Optional[str] = None) -> Dict[str, Any]:
     if provider is not None:
         if provider not in PROVIDERS:
             return {'error': f'Provider {provider} not available'}
-        result = PROVIDERS[provider](url)
+        result = call_rate_limited(provider, PROVIDERS[provider], url)
         if not result.get('error'):
             result['_provider'] = provider
         return result
 
     for prov_id, func in PROVIDERS.items():
-        result = func(url)
+        result = call_rate_limited(prov_id, func, url)
         if result and not result.get('error'):
             result['_provider'] = prov_id
             return result
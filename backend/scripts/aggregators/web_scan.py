@@ -6,6 +6,7 @@ import re
 from typing import Optional, Dict, Any
 
 from ..providers.urlscan import urlscan as urlscan_lookup
+from .base import call_rate_limited
 
 logger = logging.getLogger(__name__)
 
@@ -34,13 +35,13 @@ def get(url: str, provider: Optional[str] = None) -> Dict[str, Any]:
     if provider is not None:
         if provider not in PROVIDERS:
             return {"error": f"Provider {provider} not available"}
-        result = PROVIDERS[provider](url)
+        result = call_rate_limited(provider, PROVIDERS[provider], url)
         if not result.get("error"):
             result["_provider"] = provider
         return result
 
     for prov_id, func in PROVIDERS.items():
-        result = func(url)
+        result = call_rate_limited(prov_id, func, url)
         if result and not result.get("error"):
             result["_provider"] = prov_id
             return result
@@ -9,6 +9,7 @@ from ..utils.api_helpers import check_api_key
 from ..providers.builtin_whois import get_whois as builtin_whois_lookup
 from ..providers.whoisxmlapi import whois as whoisxml_lookup
 from ..providers.securitytrails import get_whois as securitytrails_whois
+from .base import call_rate_limited
 
 logger = logging.getLogger(__name__)
 
@@ -46,14 +47,14 @@ def get(domain: str, provider: Optional[str] = None) -> Dict[str, Any]:
     if provider is not None:
         if provider not in PROVIDERS:
             return {'error': f'Provider {provider} not available'}
-        result = PROVIDERS[provider](domain)
+        result = call_rate_limited(provider, PROVIDERS[provider], domain)
         if not result.get('error'):
             result['_provider'] = provider
         return result
 
     for prov_id, func in PROVIDERS.items():
         try:
-            result = func(domain)
+            result = call_rate_limited(prov_id, func, domain)
             if result and not result.get('error'):
                 result['_provider'] = prov_id
                 return result
@@ -70,7 +71,7 @@ def get_all(domain: str) -> Dict[str, Dict[str, Any]]:
     results = {}
     for prov_id, func in PROVIDERS.items():
         try:
-            result = func(domain)
+            result = call_rate_limited(prov_id, func, domain)
             result['_provider'] = prov_id
             results[prov_id] = result
         except Exception as e:
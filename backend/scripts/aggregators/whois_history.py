@@ -6,6 +6,7 @@ from typing import Optional, Dict, Any
 
 from ..providers.whoisxmlapi import get_whois_history as whoisxml_whois_history
 from ..providers.securitytrails import get_whois_history as securitytrails_whois_history
+from .base import call_rate_limited
 
 logger = logging.getLogger(__name__)
 
@@ -26,13 +27,13 @@ def get(domain: str, provider: Optional[str] = None) -> Dict[str, Any]:
     if provider is not None:
         if provider not in PROVIDERS:
             return {'error': f'Provider {provider} not available'}
-        result = PROVIDERS[provider](domain)
+        result = call_rate_limited(provider, PROVIDERS[provider], domain)
         if not result.get('error'):
             result['_provider'] = provider
         return result
 
     for prov_id, func in PROVIDERS.items():
-        result = func(domain)
+        result = call_rate_limited(prov_id, func, domain)
         if result and not result.get('error'):
             result['_provider'] = prov_id
             return result
@@ -1,36 +1,38 @@
-import dns.resolver
-import dns.reversename
 import sys
 
+from scripts.utils.dns_resolver import get_dns_resolver
 
-def get_dns_records(domain):
-    results = {"a": [], "mx": [], "spf": ""}
 
-    dns_records = ["a", "mx", "txt"]
+NAMESERVERS = ["1.1.1.1", "1.0.0.1"]
+DNS_RECORDS = ["a", "mx", "txt"]
 
-    resolver = dns.resolver.Resolver()
-    resolver.nameservers = ["1.1.1.1", "1.0.0.1"]
 
-    for record in dns_records:
-        try:
-            answers = resolver.resolve(domain, record)
-            if record == "mx":
-                results[record] = [rdata.to_text().split(" ")[1][:-1] for rdata in answers]
-            elif record == "txt":
-                results["spf"] = [
-                    rdata.to_text().replace('"', "").replace("  ", " ")
-                    for rdata in answers
-                    if "v=spf" in rdata.to_text()
-                ][0]
-            else:
-                results[record] = [rdata.to_text() for rdata in answers]
+def _parse_dns_records(answers):
+    results = {"a": [], "mx": [], "spf": ""}
 
-        except Exception as e:
-            print(e)
+    results["a"] = list(answers["a"] or [])
+    results["mx"] = [text.split(" ")[1][:-1] for text in answers["mx"] or []]
+    spf_records = [
+        text.replace('"', "").replace("  ", " ")
+        for text in answers["txt"] or []
+        if "v=spf" in text
+    ]
+    if spf_records:
+        results["spf"] = spf_records[0]
 
     return results
 
 
+def get_dns_records(domain):
+    return _parse_dns_records(get_dns_resolver(NAMESERVERS).resolve_name(domain, DNS_RECORDS))
+
+
+def get_bulk_dns_records(domains):
+    """Resolve A, MX and TXT for many domains with bounded parallelism, keyed by domain."""
+    answers = get_dns_resolver(NAMESERVERS).resolve_bulk(domains, DNS_RECORDS)
+    return {domain: _parse_dns_records(domain_answers) for domain, domain_answers in answers.items()}
+
+
 if __name__ == "__main__":
     query = sys.argv[1]
     print(get_dns_records(query))
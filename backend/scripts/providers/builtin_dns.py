@@ -2,40 +2,47 @@
 Built-in DNS lookup using the system resolver (dnspython).
 No API key required.
 """
-import dns.resolver
 import dns.reversename
-import dns.exception
 import logging
+from typing import Iterable, List, Tuple
+
+from ..utils.dns_resolver import get_dns_resolver
 
 logger = logging.getLogger(__name__)
 
 DNS_RECORDS = ["A", "NS", "CNAME", "SOA", "MX", "TXT"]
 
 
+def _build_queries(domain: str) -> List[Tuple[str, str]]:
+    return [(domain, record) for record in DNS_RECORDS] + [("_dmarc." + domain, "TXT")]
+
+
+def _join_record_texts(texts: List[str]):
+    value = texts[0]
+    for text in texts[1:]:
+        value = value.replace('"', "") + "," + text.replace('"', "")
+    if "," in value:
+        return value.split(",")
+    return value
+
+
+def prefetch_dns_records(domains: Iterable[str]) -> None:
+    """Resolve record types for many domains in one bounded-parallel pass so dns_records hits the cache."""
+    get_dns_resolver().resolve_queries(query for domain in domains for query in _build_queries(domain))
+
+
 def dns_records(domain: str) -> dict:
     """Resolve common DNS record types for a domain using the system resolver."""
     dns_data = {}
+    answers = get_dns_resolver().resolve_queries(_build_queries(domain))
 
     for record in DNS_RECORDS:
-        try:
-            answers = dns.resolver.resolve(domain, record)
-            for rdata in answers:
-                if record in dns_data:
-                    dns_data[record] = dns_data[record].replace('"', "") + "," + rdata.to_text().replace('"', "")
-                else:
-                    dns_data[record] = rdata.to_text()
-            if "," in dns_data[record]:
-                dns_data[record] = dns_data[record].split(",")
-        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.exception.Timeout, dns.resolver.NoNameservers):
-            dns_data[record] = "Not Found"
+        texts = answers[(domain, record)]
+        dns_data[record] = _join_record_texts(texts) if texts else "Not Found"
 
     # DMARC record
-    try:
-        answers = dns.resolver.resolve("_dmarc." + domain, "TXT")
-        for rdata in answers:
-            dns_data["DMARC"] = rdata.to_text().replace('"', "")
-    except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.exception.Timeout, dns.resolver.NoNameservers):
-        dns_data["DMARC"] = "Not Found"
+    dmarc_texts = answers[("_dmarc." + domain, "TXT")]
+    dns_data["DMARC"] = dmarc_texts[-1].replace('"', "") if dmarc_texts else "Not Found"
 
     # Strip trailing dot from NS records
     try:
@@ -84,15 +91,7 @@ def dns_records(domain: str) -> dict:
 def ip_to_hostname(ip: str) -> dict:
     """Resolve a PTR record for an IP using the system resolver."""
     query = dns.reversename.from_address(ip)
-    try:
-        answers = dns.resolver.resolve(query, "PTR")
-        return {"hostname": answers.rrset[0].to_text()[:-1]}
-    except (
-        dns.resolver.NXDOMAIN,
-        dns.resolver.NoAnswer,
-        dns.exception.Timeout,
-        dns.resolver.NoNameservers,
-        AttributeError,
-        IndexError,
-    ):
+    hostnames = get_dns_resolver().resolve(query.to_text(), "PTR")
+    if not hostnames:
         return {"hostname": ""}
+    return {"hostname": hostnames[0][:-1]}
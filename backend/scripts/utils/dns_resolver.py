@@ -0,0 +1,155 @@
+"""
+Shared DNS resolver with a TTL-respecting answer cache.
+
+Queries run concurrently on dnspython's asyncio resolver. Positive answers are cached for
+their record TTL, NXDOMAIN and empty answers for NEGATIVE_CACHE_TTL_SECONDS; timeouts and
+other failures are not cached.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import dns.asyncresolver
+import dns.exception
+import dns.resolver
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BULK_CONCURRENCY = 200
+QUERY_LIFETIME_SECONDS = 5.0
+NEGATIVE_CACHE_TTL_SECONDS = 300
+MIN_CACHE_TTL_SECONDS = 30
+MAX_CACHE_TTL_SECONDS = 86400
+CACHE_MAX_ENTRIES = 100_000
+
+DNSQuery = Tuple[str, str]
+
+
+def _normalize_query(name: str, rdtype: str) -> DNSQuery:
+    return name.strip().lower().rstrip('.'), rdtype.upper()
+
+
+class DNSResolverService:
+    """Resolver shared across threads; each call runs its queries on a short-lived event loop."""
+
+    def __init__(
+        self,
+        nameservers: Optional[Sequence[str]] = None,
+        lifetime: float = QUERY_LIFETIME_SECONDS,
+        max_entries: int = CACHE_MAX_ENTRIES,
+    ):
+        self._resolver = dns.asyncresolver.Resolver(configure=not nameservers)
+        if nameservers:
+            self._resolver.nameservers = list(nameservers)
+        self._resolver.lifetime = lifetime
+        self._max_entries = max_entries
+        self._cache: "OrderedDict[DNSQuery, Tuple[float, Optional[List[str]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_cached(self, query: DNSQuery) -> Tuple[bool, Optional[List[str]]]:
+        with self._lock:
+            entry = self._cache.get(query)
+            if entry is None:
+                return False, None
+            expires_at, records = entry
+            if expires_at <= time.monotonic():
+                del self._cache[query]
+                return False, None
+            self._cache.move_to_end(query)
+            return True, records
+
+    def _store(self, query: DNSQuery, records: Optional[List[str]], ttl: float) -> None:
+        ttl = min(MAX_CACHE_TTL_SECONDS, max(MIN_CACHE_TTL_SECONDS, ttl))
+        with self._lock:
+            self._cache[query] = (time.monotonic() + ttl, records)
+            self._cache.move_to_end(query)
+            while len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+
+    async def _query(self, query: DNSQuery) -> Optional[List[str]]:
+        name, rdtype = query
+        try:
+            answer = await self._resolver.resolve(name, rdtype)
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+            self._store(query, None, NEGATIVE_CACHE_TTL_SECONDS)
+            return None
+        except dns.exception.DNSException as e:
+            logger.debug(f"DNS query {rdtype} {name} failed: {e}")
+            return None
+
+        records = [rdata.to_text() for rdata in answer]
+        self._store(query, records, answer.rrset.ttl if answer.rrset is not None else 0)
+        return records
+
+    async def _query_all(self, queries: List[DNSQuery], concurrency: int) -> List[Optional[List[str]]]:
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def bounded_query(query: DNSQuery) -> Optional[List[str]]:
+            async with semaphore:
+                return await self._query(query)
+
+        return await asyncio.gather(*(bounded_query(query) for query in queries))
+
+    def resolve_queries(
+        self,
+        queries: Iterable[DNSQuery],
+        concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> Dict[DNSQuery, Optional[List[str]]]:
+        """
+        Resolve (name, record type) pairs with at most `concurrency` queries in flight.
+
+        Returns records as presentation text keyed by the pairs as given; None means the name
+        or record does not exist or the query failed.
+        """
+        normalized = {query: _normalize_query(*query) for query in queries}
+        answers: Dict[DNSQuery, Optional[List[str]]] = {}
+        misses: List[DNSQuery] = []
+        for query in dict.fromkeys(normalized.values()):
+            hit, records = self._get_cached(query)
+            if hit:
+                answers[query] = records
+            else:
+                misses.append(query)
+
+        if misses:
+            answers.update(zip(misses, asyncio.run(self._query_all(misses, concurrency))))
+        return {query: answers[normalized_query] for query, normalized_query in normalized.items()}
+
+    def resolve_name(self, name: str, rdtypes: Sequence[str]) -> Dict[str, Optional[List[str]]]:
+        """Resolve several record types for one name concurrently, keyed by record type as given."""
+        answers = self.resolve_queries((name, rdtype) for rdtype in rdtypes)
+        return {rdtype: answers[(name, rdtype)] for rdtype in rdtypes}
+
+    def resolve(self, name: str, rdtype: str) -> Optional[List[str]]:
+        return self.resolve_name(name, [rdtype])[rdtype]
+
+    def resolve_bulk(
+        self,
+        names: Iterable[str],
+        rdtypes: Sequence[str],
+        concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> Dict[str, Dict[str, Optional[List[str]]]]:
+        """Resolve the same record types for many names, keyed by name and record type as given."""
+        names = list(dict.fromkeys(names))
+        answers = self.resolve_queries(((name, rdtype) for name in names for rdtype in rdtypes), concurrency)
+        return {name: {rdtype: answers[(name, rdtype)] for rdtype in rdtypes} for name in names}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+_resolvers: Dict[Tuple[str, ...], DNSResolverService] = {}
+_resolvers_lock = threading.Lock()
+
+
+def get_dns_resolver(nameservers: Optional[Sequence[str]] = None) -> DNSResolverService:
+    """Return the process-wide resolver for a nameserver set (the system resolver when omitted)."""
+    key = tuple(nameservers or ())
+    with _resolvers_lock:
+        if key not in _resolvers:
+            _resolvers[key] = DNSResolverService(nameservers)
+        return _resolvers[key]
@@ -0,0 +1,193 @@
+"""
+Provider request limiter shared by the domain monitor, its signal threads and the Intelligence Harvester.
+
+Limits are keyed by provider and a fingerprint of the configured API key and are tracked in
+Django's default cache, so every process using the same cache backend shares one budget. With
+a process-local backend such as the default LocMemCache each process gets its own budget;
+warn_if_limits_are_process_local() reports that at startup.
+"""
+import logging
+import math
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .hashing import generate_sha256_hash
+
+logger = logging.getLogger(__name__)
+
+ACQUIRE_TIMEOUT_SECONDS = 120
+POLL_INTERVAL_SECONDS = 0.05
+# In-flight counters expire this long after the last acquire, so slots leaked by a killed
+# process (e.g. a gunicorn worker timeout) come back within minutes. Each acquire renews the
+# lease, so a provider in use keeps its count.
+IN_FLIGHT_LEASE_SECONDS = 180
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+# time.monotonic() deadline set by callers that must give up by a fixed time, such as a batch
+# lookup or a monitor fetch stage; provider_slot() never waits past it.
+_acquire_deadline: ContextVar[Optional[float]] = ContextVar('provider_acquire_deadline', default=None)
+
+
+class ProviderRateLimitTimeout(Exception):
+    """Raised when a provider slot could not be acquired before the timeout."""
+
+
+@dataclass(frozen=True)
+class ProviderLimit:
+    requests_per_second: float
+    max_in_flight: int
+
+    @property
+    def window_seconds(self) -> float:
+        return 1.0 if self.requests_per_second >= 1 else 1.0 / self.requests_per_second
+
+    @property
+    def window_budget(self) -> int:
+        return max(1, math.floor(self.requests_per_second * self.window_seconds))
+
+
+DEFAULT_PROVIDER_LIMITS: Dict[str, ProviderLimit] = {
+    'geekflare': ProviderLimit(requests_per_second=5, max_in_flight=5),
+    'securitytrails': ProviderLimit(requests_per_second=1, max_in_flight=2),
+    'virustotal': ProviderLimit(requests_per_second=4 / 60, max_in_flight=4),
+    'screenshotmachine': ProviderLimit(requests_per_second=2, max_in_flight=4),
+}
+
+PROVIDER_API_KEY_ENV = {
+    'geekflare': 'GEEKFLARE',
+    'securitytrails': 'SECURITYTRAILS',
+    'virustotal': 'VIRUSTOTAL',
+    'screenshotmachine': 'SCREENSHOTMACHINE',
+}
+
+
+def _parse_limit_overrides(raw_value: str) -> Dict[str, ProviderLimit]:
+    """Parse PROVIDER_RATE_LIMITS, e.g. "virustotal=0.5/4,geekflare=10/10" (requests per second / in-flight)."""
+    overrides = {}
+    for item in raw_value.split(','):
+        if not item.strip():
+            continue
+        try:
+            provider, limit = item.split('=', 1)
+            requests_per_second, max_in_flight = limit.split('/', 1)
+            overrides[provider.strip()] = ProviderLimit(
+                requests_per_second=float(requests_per_second),
+                max_in_flight=int(max_in_flight),
+            )
+        except ValueError:
+            logger.warning(f"Ignoring invalid PROVIDER_RATE_LIMITS entry: {item}")
+    return overrides
+
+
+PROVIDER_LIMITS = {**DEFAULT_PROVIDER_LIMITS, **_parse_limit_overrides(os.getenv('PROVIDER_RATE_LIMITS', ''))}
+
+
+def get_provider_limit(provider: str) -> Optional[ProviderLimit]:
+    limit = PROVIDER_LIMITS.get(provider)
+    if limit is None or limit.requests_per_second <= 0 or limit.max_in_flight <= 0:
+        return None
+    return limit
+
+
+def warn_if_limits_are_process_local() -> bool:
+    """Log a warning when provider limits are tracked in a per-process cache; returns whether they are."""
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in PROCESS_LOCAL_CACHE_BACKENDS or not any(map(get_provider_limit, PROVIDER_LIMITS)):
+        return False
+    logger.warning(
+        f"Provider rate limits are tracked in {backend.rsplit('.', 1)[-1]}, so every process enforces "
+        "them separately and N processes can send N times the configured rate; set CACHE_BACKEND "
+        "to a shared backend such as django.core.cache.backends.redis.RedisCache"
+    )
+    return True
+
+
+def _get_key_fingerprint(provider: str) -> str:
+    raw_keys = os.getenv(PROVIDER_API_KEY_ENV.get(provider, ''), '')
+    api_key = raw_keys.split(',')[0].strip()
+    return generate_sha256_hash(api_key)[:12] if api_key else 'default'
+
+
+@contextmanager
+def provider_slot_deadline(deadline: float) -> Iterator[None]:
+    """Bound every provider_slot() wait in the block by a time.monotonic() deadline."""
+    token = _acquire_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _acquire_deadline.reset(token)
+
+
+def _increment(key: str, timeout: float, renew: bool = False) -> int:
+    """Increment a counter created with `timeout`; `renew` also restarts the timeout of an existing one."""
+    cache.add(key, 0, timeout=timeout)
+    try:
+        value = cache.incr(key)
+    except ValueError:
+        # Expired between add and incr.
+        cache.add(key, 0, timeout=timeout)
+        value = cache.incr(key)
+    if renew:
+        cache.touch(key, timeout=timeout)
+    return value
+
+
+def _decrement(key: str) -> None:
+    try:
+        if cache.decr(key) < 0:
+            cache.set(key, 0, timeout=IN_FLIGHT_LEASE_SECONDS)
+    except ValueError:
+        pass
+
+
+@contextmanager
+def provider_slot(provider: str, timeout: float = ACQUIRE_TIMEOUT_SECONDS) -> Iterator[None]:
+    """
+    Hold one in-flight slot and one request token for a provider while the block runs.
+
+    Providers without a configured limit are not throttled. The wait ends at `timeout` or at
+    the deadline of an enclosing provider_slot_deadline(), whichever comes first.
+    """
+    limit = get_provider_limit(provider)
+    if limit is None:
+        yield
+        return
+
+    key_prefix = f"provider-limit:{provider}:{_get_key_fingerprint(provider)}"
+    in_flight_key = f"{key_prefix}:in-flight"
+    deadline = time.monotonic() + timeout
+    enclosing_deadline = _acquire_deadline.get()
+    if enclosing_deadline is not None:
+        deadline = min(deadline, enclosing_deadline)
+
+    while True:
+        if time.monotonic() > deadline:
+            raise ProviderRateLimitTimeout(f"Timed out waiting for a {provider} request slot")
+
+        if _increment(in_flight_key, IN_FLIGHT_LEASE_SECONDS, renew=True) > limit.max_in_flight:
+            _decrement(in_flight_key)
+            time.sleep(POLL_INTERVAL_SECONDS)
+            continue
+
+        now = time.time()
+        window = int(now // limit.window_seconds)
+        if _increment(f"{key_prefix}:window:{window}", limit.window_seconds * 2) > limit.window_budget:
+            _decrement(in_flight_key)
+            time.sleep(max(POLL_INTERVAL_SECONDS, (window + 1) * limit.window_seconds - now))
+            continue
+        break
+
+    try:
+        yield
+    finally:
+        _decrement(in_flight_key)
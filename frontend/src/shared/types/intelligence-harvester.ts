@@ -46,6 +46,10 @@ export type LookupResult = {
   additional?: Record<string, unknown>
   _provider?: string
   _lookup_type?: LookupType
+  /** When a cached result was fetched from its provider (ISO 8601); absent on fresh results */
+  _cached_at?: string
+  /** Cached result past its TTL, served while it is refreshed in the background */
+  _stale?: boolean
   error?: string
 }
 